@@ -0,0 +1 @@
+"""Benchmarks for centra_py_client. Run a benchmark with `python -m benchmarks.<name>`."""
@@ -0,0 +1,127 @@
+"""
+Measure the throughput and latency of the client against a local stub Centra server, at several concurrency levels.
+
+    python -m benchmarks.bench_client --latency 0.005 --concurrency 1 4 16 --requests 500
+
+Every benchmark prints the operations per second and the request latency percentiles seen by the session, which
+serves as a regression baseline for performance changes.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from centra_py_client.centra_py_client import CentraClient
+from centra_py_client.centra_session import CentraSession
+from centra_py_client.metrics import RequestEvent
+
+from benchmarks.stub_server import StubCentraServer
+
+
+class Benchmark:
+    def __init__(self, name: str, operations: int, run: Callable[[CentraClient, int], None],
+                 setup: Optional[Callable[[CentraClient], None]] = None):
+        """
+        :param name: The name to report the benchmark under
+        :param operations: The number of operations `run` performs, for the throughput calculation
+        :param run: Runs the benchmark with a client and a concurrency level
+        :param setup: Prepares the server state `run` needs, outside of the measurement
+        """
+        self.name = name
+        self.operations = operations
+        self.run = run
+        self.setup = setup
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def make_benchmarks(args) -> List[Benchmark]:
+    def json_query(client: CentraClient, concurrency: int):
+        session = client.centra_session
+        uri = session.urljoin_api('system-notifications')
+        # Distinct params, so the requests are not coalesced
+        results = session.map([{"uri": uri, "params": {"request": i}} for i in range(args.requests)],
+                              max_workers=concurrency)
+        assert all(result.ok for result in results)
+
+    def list_assets(client: CentraClient, concurrency: int):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            listings = list(executor.map(lambda _: len(client.list_assets(page_size=args.page_size)),
+                                         range(args.listings)))
+        assert listings == [args.assets] * args.listings
+
+    def bulk_labeling(client: CentraClient, concurrency: int):
+        asset_ids = [f"asset-{i}" for i in range(args.labeled_assets)]
+        labels = {("Benchmark", f"Value{i}"): asset_ids for i in range(args.labels)}
+        result = client.bulk_add_labels_to_assets(labels, chunk_size=args.chunk_size, max_workers=concurrency)
+        assert not result.failed_chunks
+
+    def create_obsolete_labels(client: CentraClient):
+        for i in range(args.labels):
+            client.add_label_to_assets([], "Obsolete", f"Value{i}")
+
+    def label_deletion(client: CentraClient, concurrency: int):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda i: client.delete_label_by_key_value("Obsolete", f"Value{i}"),
+                              range(args.labels)))
+
+    chunks_per_label = -(-args.labeled_assets // args.chunk_size)
+    return [
+        Benchmark("json_query", args.requests, json_query),
+        Benchmark("list_assets", args.listings, list_assets),
+        Benchmark("bulk labeling (chunks)", args.labels * chunks_per_label, bulk_labeling),
+        Benchmark("label deletion", args.labels, label_deletion, setup=create_obsolete_labels),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.005, help="Server latency per request, in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help="Fraction of requests failing with 504")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--requests', type=int, default=500, help="json_query requests per run")
+    parser.add_argument('--assets', type=int, default=5000, help="Assets served by the stub")
+    parser.add_argument('--asset-padding', type=int, default=0, help="Extra bytes per asset")
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--listings', type=int, default=8, help="Full asset listings per run")
+    parser.add_argument('--labels', type=int, default=50, help="Labels to add and delete per run")
+    parser.add_argument('--labeled-assets', type=int, default=2000, help="Assets to add every label to")
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--max-retries', type=int, default=0)
+    parser.add_argument('--only', nargs='+', help="Only run the benchmarks whose names start with these")
+    args = parser.parse_args()
+
+    benchmarks = [benchmark for benchmark in make_benchmarks(args)
+                  if not args.only or any(benchmark.name.startswith(name) for name in args.only)]
+    with StubCentraServer(asset_count=args.assets, asset_padding=args.asset_padding, latency=args.latency,
+                          error_rate=args.error_rate, timeout_rate=args.timeout_rate) as server:
+        print(f"{'benchmark':<25}{'workers':>8}{'ops':>8}{'seconds':>10}{'ops/s':>10}"
+              f"{'requests':>10}{'p50 ms':>9}{'p99 ms':>9}")
+        for benchmark in benchmarks:
+            for concurrency in args.concurrency:
+                session = CentraSession(server.address, "user", "password", pool_maxsize=max(concurrency, 2) * 2,
+                                        max_retries=args.max_retries, retry_backoff=0.01)
+                client = CentraClient(session)
+                if benchmark.setup is not None:
+                    benchmark.setup(client)
+                events: List[RequestEvent] = []
+                session.add_observer(events.append)
+
+                start = time.perf_counter()
+                benchmark.run(client, concurrency)
+                elapsed = time.perf_counter() - start
+
+                latencies = [event.latency for event in events]
+                print(f"{benchmark.name:<25}{concurrency:>8}{benchmark.operations:>8}{elapsed:>10.2f}"
+                      f"{benchmark.operations / elapsed:>10.1f}{len(events):>10}"
+                      f"{percentile(latencies, 0.5) * 1000:>9.1f}{percentile(latencies, 0.99) * 1000:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
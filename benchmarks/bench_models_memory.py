@@ -0,0 +1,71 @@
+"""
+Compare the memory taken by assets kept as dicts, projected dicts and compact Asset models.
+
+    python -m benchmarks.bench_models_memory --assets 100000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+import uuid
+
+from centra_py_client.models import Asset, project
+
+
+def make_asset(i: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "_id": str(uuid.uuid4()),
+        "name": f"server-{i:06d}",
+        "status": "on",
+        "first_seen": 1600000000000 + i,
+        "last_seen": 1700000000000 + i,
+        "ip_addresses": [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"],
+        "nics": [{"vif_id": str(i), "mac_address": "00:50:56:aa:bb:cc",
+                  "ip_addresses": [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"],
+                  "network_id": "net-1", "network_name": "Production"}],
+        "labels": [{"id": str(uuid.uuid4()), "key": "Environment", "value": "Production",
+                    "name": "Environment: Production", "color_index": 3},
+                   {"id": str(uuid.uuid4()), "key": "App", "value": f"App{i % 50}",
+                    "name": f"App: App{i % 50}", "color_index": 1}],
+        "orchestration_details": [{"orchestration_id": "orch-1", "orchestration_name": "vCenter",
+                                   "orchestration_type": "vSphere", "orchestration_obj_id": f"vm-{i}"}],
+        "metadata": [{"key": "os", "value": "Ubuntu 20.04"}],
+        "comments": "",
+    }
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = build()  # noqa: F841 - kept alive while measuring
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--assets', type=int, default=100000)
+    args = parser.parse_args()
+
+    # Every representation is decoded from the encoded assets, the way it would be read from the API responses
+    encoded_assets = [json.dumps(make_asset(i)).encode('utf-8') for i in range(args.assets)]
+    fields = ["id", "name", "ip_addresses", "labels"]
+    representations = [
+        ("dict", lambda: [json.loads(asset) for asset in encoded_assets]),
+        ("projected dict", lambda: [project(json.loads(asset), fields) for asset in encoded_assets]),
+        ("Asset", lambda: [Asset(json.loads(asset)) for asset in encoded_assets]),
+        ("projected Asset", lambda: [Asset(project(json.loads(asset), fields)) for asset in encoded_assets]),
+    ]
+
+    baseline = None
+    print(f"{'representation':<20}{'MiB':>10}{'bytes/asset':>14}{'vs dict':>10}")
+    for name, build in representations:
+        size = measure(build)
+        baseline = baseline or size
+        print(f"{name:<20}{size / 2 ** 20:>10.1f}{size / args.assets:>14.0f}{size / baseline:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Compare the per-request overhead and the throughput of the CentraSession transports against a local stub server.
+
+    python -m benchmarks.bench_transport --requests 2000 --concurrency 1 8
+
+The stub answers without delay, so the time per request is mostly the overhead of the client and the transport.
+"""
+import argparse
+import time
+
+from centra_py_client.centra_session import CentraSession
+
+from benchmarks.stub_server import StubCentraServer
+
+TRANSPORTS = ('requests', 'urllib3')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help="Requests per run")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--assets', type=int, default=10, help="Assets per response")
+    args = parser.parse_args()
+
+    with StubCentraServer(asset_count=args.assets) as server:
+        print(f"{'transport':<12}{'workers':>8}{'seconds':>10}{'requests/s':>12}{'us/request':>12}")
+        for concurrency in args.concurrency:
+            for transport in TRANSPORTS:
+                session = CentraSession(server.address, "user", "password", transport=transport,
+                                        pool_maxsize=max(concurrency, 2))
+                uri = session.urljoin_api('assets')
+                # Distinct params, so the requests are not coalesced
+                queries = [{"uri": uri, "params": {"request": i}} for i in range(args.requests)]
+                session.map(queries[:concurrency * 10], max_workers=concurrency)  # warm up the connections
+
+                start = time.perf_counter()
+                results = session.map(queries, max_workers=concurrency)
+                elapsed = time.perf_counter() - start
+
+                assert all(result.ok for result in results)
+                print(f"{transport:<12}{concurrency:>8}{elapsed:>10.2f}{args.requests / elapsed:>12.1f}"
+                      f"{elapsed / args.requests * concurrency * 1e6:>12.0f}")
+                session.transport.close()
+
+
+if __name__ == '__main__':
+    main()
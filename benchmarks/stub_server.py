@@ -0,0 +1,267 @@
+"""
+A local stub of the Centra management REST API, for benchmarks and end-to-end tests.
+
+    with StubCentraServer(asset_count=10000, latency=0.005) as server:
+        session = CentraSession(server.address, "user", "password")
+
+It serves plain HTTP/1.1 with keep-alive and ETags, and emulates the endpoints used by the client: authenticate,
+logout, assets (with offset/limit pagination and an asset_id filter of comma separated ids),
+assets/labels/{key}/{value} (add and remove, keeping the labels of the assets in sync), visibility/labels (list and
+delete) and system-notifications, plus an "uploads" endpoint which describes the body posted to it.
+"""
+import base64
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+API_PREFIX = '/api/v3.0/'
+GATEWAY_TIMEOUT_BODY = b"<html><body><h1>504 Gateway Time-out</h1></body></html>"
+
+
+def make_token(ttl: float) -> str:
+    def encode(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).rstrip(b'=').decode()
+    return f"{encode({'alg': 'none'})}.{encode({'exp': time.time() + ttl, 'jti': str(uuid.uuid4())})}.stub"
+
+
+def make_asset(index: int, padding: int = 0) -> dict:
+    asset_id = str(uuid.UUID(int=index))
+    return {
+        "id": asset_id,
+        "_id": asset_id,
+        "name": f"asset-{index:06d}",
+        "status": "on",
+        "last_seen": 1700000000000 + index,
+        "ip_addresses": [f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"],
+        "labels": [{"id": "env-prod", "key": "Environment", "value": "Production",
+                    "name": "Environment: Production"}],
+        "comments": "x" * padding,
+    }
+
+
+class StubCentraServer:
+    def __init__(self, asset_count: int = 1000, asset_padding: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, timeout_rate: float = 0.0, token_ttl: float = 3600,
+                 host: str = '127.0.0.1', port: int = 0):
+        """
+        :param asset_count: The number of assets served by the assets endpoint
+        :param asset_padding: Extra bytes added to every asset, to control the payload size
+        :param latency: Seconds every request is delayed by
+        :param error_rate: The fraction of requests answered with a 500 error
+        :param timeout_rate: The fraction of requests answered with a 504 Gateway Time-out
+        :param token_ttl: The lifetime in seconds of the JWTs the server hands out
+        :param port: The port to listen on, 0 picks a free port
+        """
+        self.assets = [make_asset(index, asset_padding) for index in range(asset_count)]
+        self.latency = latency
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.token_ttl = token_ttl
+        self.labels = {}  # label id -> label
+        self.asset_id_filter = True  # whether the asset_id filter is supported, or ignored like an unknown filter
+        self.valid_tokens = set()
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+                                        name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def revoke_tokens(self):
+        """
+        Make every token handed out so far invalid, as if they expired.
+        """
+        with self._lock:
+            self.valid_tokens.clear()
+
+    def add_label(self, key: str, value: str) -> dict:
+        with self._lock:
+            for label in self.labels.values():
+                if label['key'] == key and label['value'] == value:
+                    return label
+            label = {"id": str(uuid.uuid4()), "key": key, "value": value, "name": f"{key}: {value}", "vms": []}
+            self.labels[label['id']] = label
+            return label
+
+    def set_asset_labels(self, key: str, value: str, asset_ids, add: bool):
+        """
+        Add a label to assets, replacing their label with the same key, or remove it from them.
+        """
+        asset_ids = set(asset_ids)
+        label = self.add_label(key, value) if add else None
+        with self._lock:
+            for asset in self.assets:
+                if asset['id'] not in asset_ids:
+                    continue
+                asset['labels'] = [asset_label for asset_label in asset['labels']
+                                   if asset_label['key'] != key or (not add and asset_label['value'] != value)]
+                if add:
+                    asset['labels'].append({name: label[name] for name in ('id', 'key', 'value', 'name')})
+            for other in self.labels.values():
+                if other['key'] == key and (add or other['value'] == value):
+                    other['vms'] = sorted(set(other['vms']) - asset_ids)
+            if add:
+                label['vms'] = sorted(set(label['vms']) | asset_ids)
+        return label
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # headers and body are written separately
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body, content_type: str = 'application/json'):
+                content = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+                etag = None
+                if self.command == 'GET' and status == 200:
+                    etag = '"%s"' % hashlib.md5(content).hexdigest()
+                    if self.headers.get('If-None-Match') == etag:
+                        status, content = 304, b''
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                if etag is not None:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def _read_raw_body(self) -> bytes:
+                if self.headers.get('Transfer-Encoding') == 'chunked':
+                    chunks = []
+                    while True:
+                        size = int(self.rfile.readline().split(b';')[0], 16)
+                        chunks.append(self.rfile.read(size))
+                        self.rfile.readline()
+                        if not size:
+                            return b''.join(chunks)
+                length = int(self.headers.get('Content-Length') or 0)
+                content = self.rfile.read(length) if length else b''
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    content = gzip.decompress(content)
+                return content
+
+            def _read_body(self):
+                content = self._read_raw_body()
+                if not self.headers.get('Content-Type', '').startswith('application/json'):
+                    return content
+                return json.loads(content) if content else None
+
+            def _handle(self, method: str):
+                url = urlsplit(self.path)
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                body = self._read_body() if method in ('POST', 'PUT', 'PATCH', 'DELETE') else None
+                with stub._lock:
+                    stub.request_count += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if not url.path.startswith(API_PREFIX):
+                    return self._send(404, {"error": "Not found", "description": url.path})
+                endpoint = url.path[len(API_PREFIX):].rstrip('/')
+
+                if endpoint == 'authenticate' and method == 'POST':
+                    token = make_token(stub.token_ttl)
+                    with stub._lock:
+                        stub.valid_tokens.add(token)
+                    return self._send(200, {"access_token": token})
+
+                authorization = self.headers.get('Authorization', '')
+                with stub._lock:
+                    authorized = authorization[len('Bearer '):] in stub.valid_tokens
+                if not authorized:
+                    return self._send(403, {"error": "Unauthorized", "description": "Invalid or expired token"})
+
+                injected_failure = random.random()
+                if injected_failure < stub.timeout_rate:
+                    return self._send(504, GATEWAY_TIMEOUT_BODY, 'text/html')
+                if injected_failure < stub.timeout_rate + stub.error_rate:
+                    return self._send(500, {"code": 1, "message": "Injected error"})
+
+                return self._route(method, endpoint, query, body)
+
+            def _route(self, method, endpoint, query, body):
+                offset = int(query.get('offset', 0))
+                limit = int(query.get('limit', 1000))
+                if endpoint == 'logout' and method == 'POST':
+                    return self._send(200, b'')
+                if endpoint == 'uploads' and method == 'POST':
+                    return self._send(200, {"size": len(body), "md5": hashlib.md5(body).hexdigest(),
+                                            "content_type": self.headers.get('Content-Type')})
+                if endpoint == 'system-notifications' and method == 'GET':
+                    return self._send(200, {"total_count": 0, "new_count": 0, "items": []})
+                if endpoint == 'assets' and method == 'GET':
+                    assets = stub.assets
+                    if 'asset_id' in query and stub.asset_id_filter:
+                        asset_ids = set(query['asset_id'].split(','))
+                        assets = [asset for asset in assets if asset['id'] in asset_ids]
+                    return self._send(200, {"objects": assets[offset:offset + limit], "total_count": len(assets)})
+                match = re.match(r'^assets/labels/([^/]+)/([^/]+)$', endpoint)
+                if match and method in ('POST', 'DELETE'):
+                    label = stub.set_asset_labels(unquote(match.group(1)), unquote(match.group(2)),
+                                                  (body or {}).get('vms', []), add=method == 'POST')
+                    if label is None:
+                        return self._send(200, {})
+                    return self._send(200, {key: label[key] for key in ('id', 'key', 'value', 'name')})
+                if endpoint == 'visibility/labels' and method == 'GET':
+                    with stub._lock:
+                        labels = [{key: label[key] for key in ('id', 'key', 'value', 'name')}
+                                  for label in stub.labels.values()
+                                  if query.get('key', label['key']) == label['key']
+                                  and query.get('value', label['value']) == label['value']]
+                    return self._send(200, {"objects": labels[offset:offset + limit], "total_count": len(labels)})
+                match = re.match(r'^visibility/labels/([^/]+)$', endpoint)
+                if match and method == 'DELETE':
+                    with stub._lock:
+                        label = stub.labels.pop(match.group(1), None)
+                    if label is None:
+                        return self._send(404, {"code": 1, "message": "Label not found"})
+                    return self._send(200, label['id'])
+                return self._send(404, {"error": "Not found", "description": endpoint})
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def do_PUT(self):
+                self._handle('PUT')
+
+            def do_PATCH(self):
+                self._handle('PATCH')
+
+            def do_DELETE(self):
+                self._handle('DELETE')
+
+        return Handler
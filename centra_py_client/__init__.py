@@ -8,6 +8,8 @@ import logging
 
 from .centra_py_client import CentraClient as CentraClient  # noqa: F401
 from .centra_py_client import CentraSession as CentraSession  # noqa: F401
+from .async_centra_py_client import AsyncCentraClient as AsyncCentraClient  # noqa: F401
+from .async_centra_session import AsyncCentraSession as AsyncCentraSession  # noqa: F401
 
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -0,0 +1,271 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+IP_INDEX = 'ip'
+HOSTNAME_INDEX = 'hostname'
+LABEL_INDEX = 'label'
+
+
+def get_asset_id(asset: Dict) -> str:
+    return asset.get('id') or asset['_id']
+
+
+def fingerprint(obj) -> bytes:
+    """
+    A compact digest of a JSON object, used to detect changes without keeping the previous object around.
+    """
+    return hashlib.blake2b(json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8'),
+                           digest_size=16).digest()
+
+
+def _index_entries(asset: Dict) -> Set[Tuple[str, str]]:
+    """
+    :return: The (index, value) pairs an asset can be looked up by
+    """
+    entries = set()
+    ip_addresses = list(asset.get('ip_addresses') or [])
+    for nic in asset.get('nics') or []:
+        ip_addresses.extend(nic.get('ip_addresses') or [])
+    entries.update((IP_INDEX, ip_address) for ip_address in ip_addresses)
+    for hostname_field in ('hostname', 'name'):
+        if asset.get(hostname_field):
+            entries.add((HOSTNAME_INDEX, asset[hostname_field].lower()))
+    for label in asset.get('labels') or []:
+        entries.add((LABEL_INDEX, label.get('name') or f"{label['key']}: {label['value']}"))
+    return entries
+
+
+class SyncResult(NamedTuple):
+    added: int
+    updated: int
+    removed: int
+
+
+class MemoryAssetStore:
+    """Keeps the inventory in dictionaries."""
+
+    def __init__(self):
+        self._assets = {}
+        self._fingerprints = {}
+        self._index_entries = {}
+        self._index = {}
+        self._metadata = {}
+
+    def get(self, asset_id: str) -> Optional[Dict]:
+        return self._assets.get(asset_id)
+
+    def get_fingerprint(self, asset_id: str) -> Optional[bytes]:
+        return self._fingerprints.get(asset_id)
+
+    def find(self, index: str, value: str) -> List[Dict]:
+        return [self._assets[asset_id] for asset_id in self._index.get((index, value), ())]
+
+    def asset_ids(self) -> Set[str]:
+        return set(self._assets)
+
+    def upsert(self, asset: Dict, asset_fingerprint: bytes):
+        asset_id = get_asset_id(asset)
+        self.remove(asset_id)
+        self._assets[asset_id] = asset
+        self._fingerprints[asset_id] = asset_fingerprint
+        self._index_entries[asset_id] = _index_entries(asset)
+        for entry in self._index_entries[asset_id]:
+            self._index.setdefault(entry, set()).add(asset_id)
+
+    def remove(self, asset_id: str):
+        if self._assets.pop(asset_id, None) is None:
+            return
+        del self._fingerprints[asset_id]
+        for entry in self._index_entries.pop(asset_id):
+            self._index[entry].discard(asset_id)
+            if not self._index[entry]:
+                del self._index[entry]
+
+    def get_metadata(self, key: str) -> Optional[str]:
+        return self._metadata.get(key)
+
+    def set_metadata(self, key: str, value: str):
+        self._metadata[key] = value
+
+    def commit(self):
+        pass
+
+
+class SQLiteAssetStore:
+    """Keeps the inventory in an SQLite file, so it survives process restarts."""
+
+    def __init__(self, path: str):
+        """
+        :param path: The SQLite database file, or ":memory:"
+        """
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS assets (id TEXT PRIMARY KEY, fingerprint BLOB NOT NULL, body TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS asset_index (kind TEXT NOT NULL, value TEXT NOT NULL, asset_id TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS asset_index_lookup ON asset_index (kind, value);
+            CREATE INDEX IF NOT EXISTS asset_index_asset ON asset_index (asset_id);
+            CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        ''')
+
+    def get(self, asset_id: str) -> Optional[Dict]:
+        row = self._connection.execute('SELECT body FROM assets WHERE id = ?', (asset_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def get_fingerprint(self, asset_id: str) -> Optional[bytes]:
+        row = self._connection.execute('SELECT fingerprint FROM assets WHERE id = ?', (asset_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def find(self, index: str, value: str) -> List[Dict]:
+        rows = self._connection.execute(
+            'SELECT assets.body FROM asset_index JOIN assets ON assets.id = asset_index.asset_id '
+            'WHERE asset_index.kind = ? AND asset_index.value = ?', (index, value))
+        return [json.loads(body) for body, in rows]
+
+    def asset_ids(self) -> Set[str]:
+        return {asset_id for asset_id, in self._connection.execute('SELECT id FROM assets')}
+
+    def upsert(self, asset: Dict, asset_fingerprint: bytes):
+        asset_id = get_asset_id(asset)
+        self.remove(asset_id)
+        self._connection.execute('INSERT INTO assets (id, fingerprint, body) VALUES (?, ?, ?)',
+                                 (asset_id, asset_fingerprint, json.dumps(asset)))
+        self._connection.executemany('INSERT INTO asset_index (kind, value, asset_id) VALUES (?, ?, ?)',
+                                     ((kind, value, asset_id) for kind, value in _index_entries(asset)))
+
+    def remove(self, asset_id: str):
+        self._connection.execute('DELETE FROM assets WHERE id = ?', (asset_id,))
+        self._connection.execute('DELETE FROM asset_index WHERE asset_id = ?', (asset_id,))
+
+    def get_metadata(self, key: str) -> Optional[str]:
+        row = self._connection.execute('SELECT value FROM metadata WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def set_metadata(self, key: str, value: str):
+        self._connection.execute('INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)', (key, value))
+
+    def commit(self):
+        self._connection.commit()
+
+
+class AssetInventory:
+    """
+    A local index of the assets in Centra, answering lookups by id, IP address, hostname and label without querying
+    the API. Call `sync` to bring it up to date.
+    """
+    LAST_SYNC_METADATA_KEY = 'last_sync'
+
+    def __init__(self, client, path: Optional[str] = None, delta_filter_param: Optional[str] = None,
+                 page_size: Optional[int] = None, **filt):
+        """
+        :param client: The CentraClient used to list the assets
+        :param path: An SQLite file to keep the inventory in. If not given, the inventory is kept in memory.
+        :param delta_filter_param: The assets API filter which selects assets changed since a unix time in
+                                   milliseconds. If given, syncs after the first one only fetch the changed assets.
+                                   Otherwise every sync lists all the assets and only stores the ones which changed.
+        :param page_size: The number of assets to request per page
+        :param filt: Filters selecting the assets to keep in the inventory, e.g. status="on"
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.client = client
+        self.store = MemoryAssetStore() if path is None else SQLiteAssetStore(path)
+        self.delta_filter_param = delta_filter_param
+        self.page_size = page_size
+        self.filt = filt
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+
+    @property
+    def last_sync(self) -> Optional[int]:
+        """
+        The time the last sync started, as a unix time in milliseconds.
+        """
+        with self._lock:
+            last_sync = self.store.get_metadata(self.LAST_SYNC_METADATA_KEY)
+        return None if last_sync is None else int(last_sync)
+
+    def sync(self, full: bool = False) -> SyncResult:
+        """
+        Bring the inventory up to date.
+        A full sync lists all the assets and removes the ones which no longer exist. A delta sync (the default when
+        delta_filter_param is set and the inventory was synced before) only fetches the assets changed since the
+        last sync, and therefore does not detect removed assets.
+        :param full: Force a full sync
+        """
+        with self._sync_lock:
+            return self._sync(full)
+
+    def _sync(self, full: bool) -> SyncResult:
+        sync_start = int(time.time() * 1000)
+        last_sync = self.last_sync
+        is_delta = not full and last_sync is not None and self.delta_filter_param is not None
+        filt = dict(self.filt)
+        if is_delta:
+            filt[self.delta_filter_param] = last_sync
+        page_kwargs = {} if self.page_size is None else {'page_size': self.page_size}
+
+        added = updated = 0
+        seen_asset_ids = set()
+        # The lock is only held while writing, so lookups are answered from the current state during the sync
+        for asset in self.client.iter_assets(**page_kwargs, **filt):
+            asset_id = get_asset_id(asset)
+            seen_asset_ids.add(asset_id)
+            asset_fingerprint = fingerprint(asset)
+            with self._lock:
+                previous_fingerprint = self.store.get_fingerprint(asset_id)
+                if previous_fingerprint == asset_fingerprint:
+                    continue
+                self.store.upsert(asset, asset_fingerprint)
+            if previous_fingerprint is None:
+                added += 1
+            else:
+                updated += 1
+
+        with self._lock:
+            removed_asset_ids = set() if is_delta else self.store.asset_ids() - seen_asset_ids
+            for asset_id in removed_asset_ids:
+                self.store.remove(asset_id)
+            self.store.set_metadata(self.LAST_SYNC_METADATA_KEY, str(sync_start))
+            self.store.commit()
+
+        result = SyncResult(added, updated, len(removed_asset_ids))
+        self.logger.debug(f"{'Delta' if is_delta else 'Full'} sync done: {result}")
+        return result
+
+    def get(self, asset_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self.store.get(asset_id)
+
+    def find_by_ip(self, ip_address: str) -> List[Dict]:
+        with self._lock:
+            return self.store.find(IP_INDEX, ip_address)
+
+    def find_by_hostname(self, hostname: str) -> List[Dict]:
+        with self._lock:
+            return self.store.find(HOSTNAME_INDEX, hostname.lower())
+
+    def find_by_label(self, label_key: str, label_value: str) -> List[Dict]:
+        return self.find_by_label_name(f"{label_key}: {label_value}")
+
+    def find_by_label_name(self, label_name: str) -> List[Dict]:
+        """
+        :param label_name: The label name, e.g. "Environment: Production"
+        """
+        with self._lock:
+            return self.store.find(LABEL_INDEX, label_name)
+
+    def __len__(self):
+        with self._lock:
+            return len(self.store.asset_ids())
+
+    def __iter__(self) -> Iterator[Dict]:
+        with self._lock:
+            asset_ids = self.store.asset_ids()
+        for asset_id in asset_ids:
+            asset = self.get(asset_id)
+            if asset is not None:
+                yield asset
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List
+
+from centra_py_client.async_centra_session import AsyncCentraSession
+from centra_py_client.centra_py_client import DEFAULT_PAGE_SIZE
+from centra_py_client.exceptions import ManagementAPIError
+
+
+class AsyncCentraClient:
+    def __init__(self, centra_session: AsyncCentraSession):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.centra_session = centra_session
+
+    async def list_assets(self, **filt) -> List[Dict]:
+        """
+        List all the assets matching the filter.
+        If `limit` or `offset` are part of the filter, only that single page is fetched.
+        """
+        if 'limit' in filt or 'offset' in filt:
+            response = await self.centra_session.json_query(self.centra_session.urljoin_api('assets'), params=filt)
+            return response['objects']
+        return [asset async for asset in self.iter_assets(**filt)]
+
+    async def iter_assets(self, *, page_size: int = DEFAULT_PAGE_SIZE, **filt) -> AsyncIterator[Dict]:
+        """
+        Iterate over the assets matching the filter, prefetching the next page while the current one is consumed.
+        :param page_size: The number of assets to request per page
+        :param filt: Filters passed as query parameters to the assets API, e.g. status="on"
+        """
+        uri = self.centra_session.urljoin_api('assets')
+
+        def fetch_page(page_offset):
+            return asyncio.ensure_future(
+                self.centra_session.json_query(uri, params=dict(filt, offset=page_offset, limit=page_size)))
+
+        offset = 0
+        task = fetch_page(offset)
+        try:
+            while task is not None:
+                response = await task
+                objects = response['objects']
+                next_offset = offset + len(objects)
+                total_count = response.get('total_count')
+                if total_count is None:
+                    has_more = len(objects) >= page_size
+                else:
+                    has_more = 0 < len(objects) and next_offset < total_count
+                task = fetch_page(next_offset) if has_more else None
+                for asset in objects:
+                    yield asset
+                offset = next_offset
+        finally:
+            if task is not None:
+                task.cancel()
+
+    async def add_label_to_assets(self, asset_ids: List[str], label_key: str, label_value: str) -> str:
+        """
+        Add a label to assets.
+        Note - If the assets are already labeled with a label that has the provided label_key, they will be
+        automatically removed from their current label and added to the new provided label.
+        :param asset_ids: A list of asset ids to add the label to
+        :param label_key: The label key, e.g. "Environment"
+        :param label_value: The label key, e.g. "Production"
+        :return: The id of the label with the provided label_key and label_value
+        """
+        endpoint = f'assets/labels/{label_key}/{label_value}'
+        label_summary_object = await self.centra_session.json_query(self.centra_session.urljoin_api(endpoint),
+                                                                    method='POST', data={"vms": asset_ids})
+        return label_summary_object['id']
+
+    async def delete_label_by_name(self, label_name: str):
+        """
+        Delete a label by its name.
+        :param label_name: The label name as a string, e.g. "App: Accounting" or "Environment: Production"
+        """
+        key, value = label_name.split(":")
+        await self.delete_label_by_key_value(key.strip(), value.strip())
+
+    async def delete_label_by_key_value(self, label_key, label_value):
+        """
+        Delete a label. Labels sharing the key and value are deleted concurrently.
+        :param label_key: The label key, e.g. "Environment"
+        :param label_value: The label value, e.g. "Production"
+        """
+        async def delete_label(label_id):
+            self.logger.debug(f"Trying to delete {label_id}")
+            endpoint = f'visibility/labels/{label_id}'
+            deleted_id = await self.centra_session.json_query(self.centra_session.urljoin_api(endpoint),
+                                                              method='DELETE')
+            assert deleted_id == label_id
+
+        label_ids = await self.get_labels_ids(label_key, label_value)
+        await asyncio.gather(*(delete_label(label_id) for label_id in label_ids))
+
+    async def get_labels_ids(self, label_key, label_value):
+        """
+        :param label_key: The label key, e.g. "Environment", "Role".
+        :param label_value: The label's value, e.g. "Prod", "DB".
+        :return: A list of label IDs (can be used for other API such as deleting labels by ID)
+        """
+        params = {
+            "key": label_key,
+            "value": label_value
+        }
+        response = await self.centra_session.json_query(
+            self.centra_session.urljoin_api("visibility/labels"),
+            method='GET',
+            params=params
+        )
+        list_of_matching_label_ids = [x['id'] for x in response['objects']]
+        self.logger.debug(f"Found {len(list_of_matching_label_ids)} matching labels")
+        return list_of_matching_label_ids
+
+    async def get_system_notifications(self):
+        return await self.centra_session.json_query(
+            self.centra_session.urljoin_api('system-notifications')
+        )
+
+    async def is_connected(self) -> bool:
+        """
+        Use this to test for connectivity.
+        :return: True if Centra is connected and answering the API.
+        """
+        try:
+            return await self.get_system_notifications() is not None
+        except ManagementAPIError as e:
+            self.logger.debug(f"Error which checking connectivity: {e}")
+            return False
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Optional, Union
+from urllib.parse import urljoin
+
+from centra_py_client.centra_session import (AUTHENTICATION_ERROR_HTTP_STATUS_CODE, DEFAULT_TOKEN_REFRESH_MARGIN,
+                                             REST_API_BASE_PATH_V3, decode_json_response, get_http_server_root,
+                                             get_jwt_expiration, get_query_key, raise_for_status)
+from centra_py_client.codec import JSONCodec, get_default_codec
+from centra_py_client.exceptions import ManagementAPIConnectionError, ManagementAPIError
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - aiohttp is an optional dependency
+    aiohttp = None
+
+DEFAULT_CONCURRENCY_LIMIT = 100
+DEFAULT_KEEPALIVE_TIMEOUT = 15
+
+
+class _BufferedResponse:
+    """A fully read response, exposing the parts of requests.Response used by raise_for_status."""
+
+    def __init__(self, status_code: int, content: bytes):
+        self.status_code = status_code
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncCentraSession:
+    def __init__(
+        self,
+        management_address: str,
+        auth_username: str,
+        auth_password: str,
+        base_api_path=REST_API_BASE_PATH_V3,
+        verify_certificate: bool = True,
+        concurrency_limit: int = DEFAULT_CONCURRENCY_LIMIT,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        token_refresh_margin: float = DEFAULT_TOKEN_REFRESH_MARGIN,
+        json_codec: Optional[JSONCodec] = None,
+        coalesce_requests: bool = True
+    ):
+        """
+        An asyncio counterpart of CentraSession, backed by aiohttp.
+        Use it as an async context manager, or call `connect` and `close` explicitly:
+
+            async with AsyncCentraSession("my.centra.address", "username", "password") as session:
+                ...
+
+        :param management_address:
+        :param auth_username:
+        :param auth_password:
+        :param concurrency_limit: The maximal number of requests in flight, which is also the connection pool size
+        :param keepalive_timeout: Seconds an idle keep-alive connection is kept open for reuse
+        :param token_refresh_margin: Seconds before the JWT expires in which the session re-authenticates
+        :param json_codec: Encodes request bodies and decodes responses, defaults to the fastest codec installed
+        :param coalesce_requests: Whether identical GET requests made concurrently through json_query share a single
+                                  request, and its result or error
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncCentraSession requires aiohttp, install it with "
+                              "`pip install centra_py_client[async]`")
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.management_address = management_address
+        self.auth_username = auth_username
+        self.auth_password = auth_password
+
+        self.http_server_root = get_http_server_root(management_address)
+        self.verify_certificate = verify_certificate
+        self.concurrency_limit = concurrency_limit
+        self.keepalive_timeout = keepalive_timeout
+        # The aiohttp session, the semaphore and the lock are bound to the running event loop, so they are created
+        # lazily
+        self._http_session = None
+        self._semaphore = None
+        self._reauthentication_lock = None
+
+        self.json_codec = json_codec if json_codec is not None else get_default_codec()
+        self.coalesce_requests = coalesce_requests
+        self._in_flight = {}  # query key -> task of the response
+        self.rest_auth_enabled = True
+        self.token = None
+        self.token_expiration = None
+        self.token_refresh_margin = token_refresh_margin
+
+        self.set_base_api_path(base_api_path)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def set_base_api_path(self, base_api_path):
+        self.base_api_path = base_api_path
+
+    def urljoin_api(self, endpoint_path: str):
+        return urljoin(self.base_api_path, endpoint_path)
+
+    async def rest_authenticate(self, rest_username, rest_password):
+        """
+        Perform JWT authentication through management REST API with username/password
+        :param rest_username:
+        :param rest_password:
+        """
+        self.logger.debug("REST Authenticating")
+        response = await self.json_query(uri=self.urljoin_api('authenticate'),
+                                         method='POST',
+                                         data={'username': rest_username, 'password': rest_password},
+                                         authenticate=False)
+        if 'access_token' in response:
+            self.set_token(response['access_token'])
+        self.logger.debug("REST token obtained and set")
+
+    async def json_query(self,
+                         uri,
+                         method="GET",
+                         data=None,
+                         return_json=True,
+                         params=None,
+                         authenticate=True,
+                         convert_data_to_json=True) -> Union[bytes, Dict, str, None]:
+        if data is not None and convert_data_to_json:
+            data = self.json_codec.encode(data)
+        if self.coalesce_requests and method == "GET":
+            response = await self._single_flight((authenticate,) + get_query_key(uri, params),
+                                                 lambda: self._query(uri=uri, params=params, authenticate=authenticate))
+        else:
+            response = await self._query(uri=uri, method=method, data=data, params=params,
+                                         authenticate=authenticate)
+        if not return_json:
+            return response.content
+        return decode_json_response(response.content, self.json_codec)
+
+    async def _single_flight(self, key, query):
+        """
+        Run the query, unless another task is already running the same one, in which case wait for its result.
+        The query runs in a task of its own, so a cancelled caller does not cancel it for the others.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(query())
+            self._in_flight[key] = task
+
+            def remove_task(_):
+                if self._in_flight.get(key) is task:
+                    del self._in_flight[key]
+            task.add_done_callback(remove_task)
+        return await asyncio.shield(task)
+
+    def _get_http_session(self):
+        if self._http_session is None or self._http_session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency_limit,
+                                             keepalive_timeout=self.keepalive_timeout,
+                                             ssl=None if self.verify_certificate else False)
+            self._http_session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.concurrency_limit)
+            self._reauthentication_lock = asyncio.Lock()
+        return self._http_session
+
+    @staticmethod
+    def _normalize_params(params: Dict) -> Dict:
+        # aiohttp only accepts str, int and float query values, while requests formats anything with str()
+        return {key: value if isinstance(value, (str, int, float)) and not isinstance(value, bool) else str(value)
+                for key, value in params.items()}
+
+    async def _query(self, uri, method="GET", data=None, params=None, authenticate=True):
+        if params is None:
+            params = {}
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s %s%s", method, uri, ('' if not params
+                                                       else '?' + '&'.join("%s=%s" % (key, value)
+                                                                           for key, value in params.items())))
+
+        use_token = authenticate and self.rest_auth_enabled
+        if use_token and self._token_needs_refresh():
+            await self._reauthenticate(self.token)
+
+        http_session = self._get_http_session()
+
+        async def send():
+            token = self.token
+            headers = {'content-type': 'application/json'}
+            if use_token:
+                if token is None:
+                    raise ManagementAPIError("REST Token not set!")
+                headers['Authorization'] = 'Bearer ' + token
+            try:
+                async with self._semaphore:
+                    async with http_session.request(method, urljoin(self.http_server_root, uri), data=data,
+                                                    headers=headers, params=self._normalize_params(params)) as r:
+                        return token, _BufferedResponse(r.status, await r.read())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise ManagementAPIConnectionError("Error while handling %s request for uri %s: %s" % (method, uri, e))
+
+        sent_token, response = await send()
+        if use_token and AUTHENTICATION_ERROR_HTTP_STATUS_CODE == response.status_code:
+            self.logger.debug("%s %s was refused, re-authenticating and replaying it", method, uri)
+            await self._reauthenticate(sent_token)
+            _, response = await send()
+
+        raise_for_status(response)
+        return response
+
+    def _token_needs_refresh(self) -> bool:
+        return self.token_expiration is not None and time.time() >= self.token_expiration - self.token_refresh_margin
+
+    async def _reauthenticate(self, stale_token):
+        """
+        Re-authenticate, unless another task already replaced the stale token while we waited for the lock.
+        """
+        self._get_http_session()  # makes sure the lock was created within the running event loop
+        async with self._reauthentication_lock:
+            if self.token != stale_token:
+                return
+            await self.connect()
+
+    async def connect(self):
+        await self.rest_authenticate(self.auth_username, self.auth_password)
+        self.logger.debug(f"Connected to Centra successfully on {self.management_address}.")
+
+    async def disconnect(self):
+        await self.json_query(self.urljoin_api('logout'), method='POST', return_json=False)
+
+    async def close(self):
+        """
+        Close the pooled connections.
+        """
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+
+    def set_token(self, token):
+        """
+        Set JWT token, used for authentication with REST API
+        :param token:
+        """
+        self.logger.debug("Setting REST token")
+        self.token = token
+        self.token_expiration = get_jwt_expiration(token)
@@ -1,17 +1,281 @@
+import copy
+import fnmatch
 import logging
-from typing import List
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
 
-from centra_py_client.exceptions import ManagementAPIError
+from centra_py_client.asset_inventory import get_asset_id
+from centra_py_client.exceptions import ManagementAPIError, ManagementAPITimeoutError
 from centra_py_client.centra_session import CentraSession
+from centra_py_client.label_catalog import LABELS_ENDPOINT, LabelCatalog
+from centra_py_client.models import Asset, Label, project
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_LABEL_CHUNK_SIZE = 1000
+MIN_LABEL_CHUNK_SIZE = 50
+FIELDS_PARAM = 'fields'
+ASSET_ID_FILTER_PARAM = 'asset_id'  # selects assets by a comma separated list of ids
+DEFAULT_ASSET_ID_BATCH_SIZE = 100  # ids per request, keeping the URL well below common length limits
+DEFAULT_ASSET_CACHE_SIZE = 10000  # assets
+
+
+class LabelChunk(NamedTuple):
+    """A part of the assets to label, sent in a single request."""
+    label_key: str
+    label_value: str
+    asset_ids: List[str]
+    error: Optional[ManagementAPIError] = None
+
+
+class BulkLabelResult(NamedTuple):
+    label_ids: Dict[Tuple[str, str], str]
+    failed_chunks: List[LabelChunk]
+
+    def failed_assets(self) -> Dict[Tuple[str, str], List[str]]:
+        """
+        :return: The assets which were not labeled, in the format accepted by bulk_add_labels_to_assets
+        """
+        failed = {}
+        for chunk in self.failed_chunks:
+            failed.setdefault((chunk.label_key, chunk.label_value), []).extend(chunk.asset_ids)
+        return failed
+
+
+class LabelDeletion(NamedTuple):
+    label: Dict
+    error: Optional[ManagementAPIError] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BulkLabelDeletionResult(NamedTuple):
+    deletions: List[LabelDeletion]  # one per matching label
+
+    @property
+    def deleted(self) -> List[Dict]:
+        return [deletion.label for deletion in self.deletions if deletion.ok]
+
+    @property
+    def failed(self) -> List[LabelDeletion]:
+        return [deletion for deletion in self.deletions if not deletion.ok]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+LabelPattern = Union[str, re.Pattern, Tuple[Union[str, re.Pattern], Union[str, re.Pattern]]]
+
+
+def _compile_pattern(pattern: Union[str, re.Pattern]) -> re.Pattern:
+    return pattern if isinstance(pattern, re.Pattern) else re.compile(fnmatch.translate(pattern))
+
+
+def _label_matcher(names: Iterable[str], keys: Iterable[str], patterns: Iterable[LabelPattern]):
+    """
+    :return: A function telling whether a label matches any of the names, keys or patterns
+    """
+    key_values = {tuple(part.strip() for part in name.split(':', 1)) for name in names}
+    keys = set(keys)
+    name_patterns, key_value_patterns = [], []
+    for pattern in patterns:
+        if isinstance(pattern, tuple):
+            key_value_patterns.append((_compile_pattern(pattern[0]), _compile_pattern(pattern[1])))
+        else:
+            name_patterns.append(_compile_pattern(pattern))
+
+    def matches(label: Dict) -> bool:
+        name = f"{label['key']}: {label['value']}"
+        return (label['key'] in keys or (label['key'], label['value']) in key_values
+                or any(pattern.fullmatch(name) for pattern in name_patterns)
+                or any(key_pattern.fullmatch(label['key']) and value_pattern.fullmatch(label['value'])
+                       for key_pattern, value_pattern in key_value_patterns))
+    return matches
 
 
 class CentraClient:
-    def __init__(self, centra_session: CentraSession):
+    def __init__(self, centra_session: CentraSession, label_catalog_ttl: Optional[float] = None,
+                 asset_cache_size: int = DEFAULT_ASSET_CACHE_SIZE):
+        """
+        :param centra_session: A connected CentraSession
+        :param label_catalog_ttl: If set, label lookups are served from a LabelCatalog which is reloaded after this
+                                  many seconds
+        :param asset_cache_size: The maximal number of assets kept by get_assets_by_ids, 0 disables the cache
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.centra_session = centra_session
+        self.label_catalog = LabelCatalog(self, ttl=label_catalog_ttl) if label_catalog_ttl is not None else None
+        self.asset_cache_size = asset_cache_size
+        self._asset_cache = OrderedDict()  # asset id -> asset, least recently used first
+        self._asset_cache_lock = threading.Lock()
+
+    def list_assets(self, fields: Optional[Sequence[str]] = None, as_models: bool = False,
+                    **filt) -> List[Union[Dict, Asset]]:
+        """
+        List all the assets matching the filter.
+        If `limit` or `offset` are part of the filter, only that single page is fetched.
+        See iter_assets for the other parameters.
+        """
+        if 'limit' in filt or 'offset' in filt:
+            assets = self.centra_session.json_query(self.centra_session.urljoin_api('assets'),
+                                                    params=self._with_fields_param(filt, fields))['objects']
+            return [self._to_result(asset, Asset, fields, as_models) for asset in assets]
+        return list(self.iter_assets(fields=fields, as_models=as_models, **filt))
+
+    def iter_assets(self, *, page_size: int = DEFAULT_PAGE_SIZE, fields: Optional[Sequence[str]] = None,
+                    as_models: bool = False, **filt) -> Iterator[Union[Dict, Asset]]:
+        """
+        Iterate over the assets matching the filter, one page at a time.
+        The next page is fetched in the background while the current page is being consumed, so at most two pages
+        are held in memory.
+        :param page_size: The number of assets to request per page
+        :param fields: If given, only these top-level fields of every asset are requested and kept
+        :param as_models: Whether to return compact Asset objects instead of dicts
+        :param filt: Filters passed as query parameters to the assets API, e.g. status="on"
+        """
+        for _, assets in self._iter_pages('assets', page_size=page_size, **self._with_fields_param(filt, fields)):
+            for asset in assets:
+                yield self._to_result(asset, Asset, fields, as_models)
 
-    def list_assets(self, **filt):
-        return self.centra_session.json_query(self.centra_session.urljoin_api('assets'), params=filt)['objects']
+    def get_assets_by_ids(self, asset_ids: Iterable[str], fields: Optional[Sequence[str]] = None,
+                          as_models: bool = False, batch_size: int = DEFAULT_ASSET_ID_BATCH_SIZE,
+                          max_workers: Optional[int] = None) -> Dict[str, Union[Dict, Asset]]:
+        """
+        Resolve many asset ids at once. The ids are deduplicated, and those which are not cached are fetched in batches
+        of batch_size ids per request, sent concurrently. Fetched assets are kept in a bounded LRU cache, so resolving
+        them again is free; assets labeled through this client are dropped from the cache.
+        :param fields: If given, only these top-level fields of every asset are returned. Assets fetched with a subset
+                       of their fields are not cached.
+        :param max_workers: The maximal number of concurrent requests, defaults to the session's connection pool size
+        :return: The assets by id. Ids which do not exist are missing from it.
+        :raise ManagementAPIError: If a batch failed, after the assets of the other batches were cached
+        """
+        assets = {}
+        missing_ids = []
+        with self._asset_cache_lock:
+            for asset_id in dict.fromkeys(asset_ids):
+                asset = self._asset_cache.get(asset_id)
+                if asset is None:
+                    missing_ids.append(asset_id)
+                else:
+                    self._asset_cache.move_to_end(asset_id)
+                    assets[asset_id] = copy.deepcopy(asset)  # the caller may modify the assets it gets
+        self.logger.debug(f"Resolving {len(assets)} assets from the cache and {len(missing_ids)} from the API")
+
+        batches = [missing_ids[i:i + batch_size] for i in range(0, len(missing_ids), batch_size)]
+        # The ids are always requested, to match the returned assets to the batch
+        query_fields = None if fields is None else list(dict.fromkeys(['id', '_id'] + list(fields)))
+        results = self.centra_session.map(
+            [{"uri": self.centra_session.urljoin_api('assets'),
+              "params": self._with_fields_param({ASSET_ID_FILTER_PARAM: ','.join(batch), 'limit': len(batch)},
+                                                query_fields)}
+             for batch in batches],
+            max_workers=max_workers)
+        errors = []
+        for batch, result in zip(batches, results):
+            if not result.ok:
+                errors.append(result.error)
+                continue
+            batch_ids = set(batch)
+            for asset in result.value['objects']:
+                asset_id = get_asset_id(asset)
+                if asset_id not in batch_ids:  # e.g. when the server ignores the id filter
+                    continue
+                assets[asset_id] = asset
+                if fields is None:
+                    self._cache_asset(asset_id, asset)
+        if errors:
+            raise errors[0]
+        return {asset_id: self._to_result(asset, Asset, fields, as_models) for asset_id, asset in assets.items()}
+
+    def _cache_asset(self, asset_id: str, asset: Dict):
+        if self.asset_cache_size <= 0:
+            return
+        asset = copy.deepcopy(asset)  # the returned asset may be modified by the caller
+        with self._asset_cache_lock:
+            self._asset_cache[asset_id] = asset
+            self._asset_cache.move_to_end(asset_id)
+            while len(self._asset_cache) > self.asset_cache_size:
+                self._asset_cache.popitem(last=False)
+
+    def invalidate_assets(self, asset_ids: Optional[Iterable[str]] = None):
+        """
+        Drop assets from the cache of get_assets_by_ids.
+        :param asset_ids: The assets to drop, defaults to all of them
+        """
+        with self._asset_cache_lock:
+            if asset_ids is None:
+                self._asset_cache.clear()
+            for asset_id in asset_ids or ():
+                self._asset_cache.pop(asset_id, None)
+
+    def get_labels(self, fields: Optional[Sequence[str]] = None, as_models: bool = False,
+                   **filt) -> List[Union[Dict, Label]]:
+        """
+        List all the labels matching the filter. See iter_labels for the parameters.
+        """
+        return list(self.iter_labels(fields=fields, as_models=as_models, **filt))
+
+    def iter_labels(self, *, page_size: int = DEFAULT_PAGE_SIZE, fields: Optional[Sequence[str]] = None,
+                    as_models: bool = False, **filt) -> Iterator[Union[Dict, Label]]:
+        """
+        Iterate over the labels matching the filter, prefetching the next page while the current one is consumed.
+        :param page_size: The number of labels to request per page
+        :param fields: If given, only these top-level fields of every label are requested and kept
+        :param as_models: Whether to return compact Label objects instead of dicts
+        :param filt: Filters passed as query parameters to the labels API, e.g. key="Environment"
+        """
+        for _, labels in self._iter_pages(LABELS_ENDPOINT, page_size=page_size,
+                                          **self._with_fields_param(filt, fields)):
+            for label in labels:
+                yield self._to_result(label, Label, fields, as_models)
+
+    @staticmethod
+    def _with_fields_param(params: Dict, fields: Optional[Sequence[str]]) -> Dict:
+        # Servers which do not support projection ignore the parameter, and the fields are projected locally
+        return params if fields is None else dict(params, **{FIELDS_PARAM: ','.join(fields)})
+
+    def _to_result(self, obj: Dict, model_class, fields: Optional[Sequence[str]], as_models: bool):
+        obj = project(obj, fields)
+        return model_class(obj, self.centra_session.json_codec) if as_models else obj
+
+    def _iter_pages(self, endpoint: str, *, page_size: int = DEFAULT_PAGE_SIZE, start_offset: int = 0,
+                    **params) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Walk an offset/limit paginated endpoint, prefetching page N+1 while page N is yielded.
+        :return: An iterator of (offset, objects) tuples
+        """
+        uri = self.centra_session.urljoin_api(endpoint)
+
+        def fetch_page(page_offset):
+            page_params = dict(params, offset=page_offset, limit=page_size)
+            return self.centra_session.json_query(uri, params=page_params)
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.__class__.__name__}-prefetch")
+        offset = start_offset
+        future = executor.submit(fetch_page, offset)
+        try:
+            while future is not None:
+                response = future.result()
+                objects = response['objects']
+                next_offset = offset + len(objects)
+                total_count = response.get('total_count')
+                if total_count is None:
+                    has_more = len(objects) >= page_size
+                else:
+                    has_more = 0 < len(objects) and next_offset < total_count
+                future = executor.submit(fetch_page, next_offset) if has_more else None
+                yield offset, objects
+                offset = next_offset
+        finally:
+            if future is not None:
+                future.cancel()
+            executor.shutdown(wait=False)
 
     def add_label_to_assets(self, asset_ids: List[str], label_key: str, label_value: str) -> str:
         """
@@ -26,8 +290,114 @@ class CentraClient:
         endpoint = f'assets/labels/{label_key}/{label_value}'
         label_summary_object = self.centra_session.json_query(self.centra_session.urljoin_api(endpoint),
                                                               method='POST', data={"vms": asset_ids})
+        self.invalidate_assets(asset_ids)
+        self._add_to_label_catalog(label_summary_object, label_key, label_value)
         return label_summary_object['id']
 
+    def remove_label_from_assets(self, asset_ids: List[str], label_key: str, label_value: str):
+        """
+        Remove a label from assets, without deleting the label.
+        :param asset_ids: A list of asset ids to remove the label from
+        :param label_key: The label key, e.g. "Environment"
+        :param label_value: The label value, e.g. "Production"
+        """
+        endpoint = f'assets/labels/{label_key}/{label_value}'
+        response = self.centra_session.json_query(self.centra_session.urljoin_api(endpoint),
+                                                  method='DELETE', data={"vms": asset_ids})
+        self.invalidate_assets(asset_ids)
+        return response
+
+    def _add_to_label_catalog(self, label_summary_object: Dict, label_key: str, label_value: str):
+        if self.label_catalog is not None:
+            self.label_catalog.add(dict(label_summary_object, key=label_key, value=label_value))
+
+    def bulk_add_labels_to_assets(self, labels: Mapping[Tuple[str, str], Iterable[str]],
+                                  chunk_size: int = DEFAULT_LABEL_CHUNK_SIZE,
+                                  max_workers: Optional[int] = None) -> BulkLabelResult:
+        """
+        Add many labels to many assets, splitting the assets of every label to chunks which are sent concurrently.
+        Chunks which time out are split in half and resent, down to MIN_LABEL_CHUNK_SIZE assets.
+        See add_label_to_assets for the semantics of adding a label.
+        :param labels: A mapping of (label_key, label_value) to the ids of the assets to label
+        :param chunk_size: The maximal number of assets to label in a single request
+        :param max_workers: The maximal number of concurrent requests, defaults to the session's connection pool size
+        :return: The ids of the labels, and the chunks which failed. Pass `result.failed_assets()` to this method to
+                 retry only the failed chunks.
+        """
+        return self._bulk_label_request('POST', labels, chunk_size, max_workers)
+
+    def bulk_remove_labels_from_assets(self, labels: Mapping[Tuple[str, str], Iterable[str]],
+                                       chunk_size: int = DEFAULT_LABEL_CHUNK_SIZE,
+                                       max_workers: Optional[int] = None) -> BulkLabelResult:
+        """
+        Remove many labels from many assets, in concurrent chunks. The labels themselves are not deleted.
+        See bulk_add_labels_to_assets for the parameters and the result.
+        """
+        return self._bulk_label_request('DELETE', labels, chunk_size, max_workers)
+
+    def _bulk_label_request(self, method: str, labels: Mapping[Tuple[str, str], Iterable[str]], chunk_size: int,
+                            max_workers: Optional[int]) -> BulkLabelResult:
+        pending_chunks = []
+        for (label_key, label_value), asset_ids in labels.items():
+            asset_ids = list(asset_ids)
+            pending_chunks.extend(LabelChunk(label_key, label_value, asset_ids[i:i + chunk_size])
+                                  for i in range(0, len(asset_ids), chunk_size))
+
+        labeled_asset_ids = [asset_id for chunk in pending_chunks for asset_id in chunk.asset_ids]
+        label_ids = {}
+        failed_chunks = []
+        while pending_chunks:
+            sent_chunks, deferred_chunks = self._next_label_chunks(method, pending_chunks, label_ids)
+            results = self.centra_session.map(
+                [{"uri": self.centra_session.urljoin_api(f'assets/labels/{chunk.label_key}/{chunk.label_value}'),
+                  "method": method,
+                  "data": {"vms": chunk.asset_ids}}
+                 for chunk in sent_chunks],
+                max_workers=max_workers)
+            split_chunks = []
+            for chunk, result in zip(sent_chunks, results):
+                if result.ok:
+                    if isinstance(result.value, dict) and 'id' in result.value:  # removals may not return the label
+                        label_ids[(chunk.label_key, chunk.label_value)] = result.value['id']
+                        if method == 'POST':
+                            self._add_to_label_catalog(result.value, chunk.label_key, chunk.label_value)
+                elif isinstance(result.error, ManagementAPITimeoutError) and \
+                        len(chunk.asset_ids) >= 2 * MIN_LABEL_CHUNK_SIZE:
+                    middle = len(chunk.asset_ids) // 2
+                    self.logger.debug(f"{method} of a label for {len(chunk.asset_ids)} assets timed out, splitting "
+                                      f"the chunk")
+                    split_chunks.append(chunk._replace(asset_ids=chunk.asset_ids[:middle]))
+                    split_chunks.append(chunk._replace(asset_ids=chunk.asset_ids[middle:]))
+                else:
+                    failed_chunks.append(chunk._replace(error=result.error))
+            pending_chunks = split_chunks + deferred_chunks
+
+        self.invalidate_assets(labeled_asset_ids)
+        return BulkLabelResult(label_ids, failed_chunks)
+
+    @staticmethod
+    def _next_label_chunks(method: str, pending_chunks: List[LabelChunk],
+                           label_ids: Dict[Tuple[str, str], str]) -> Tuple[List[LabelChunk], List[LabelChunk]]:
+        """
+        Adding assets to a label creates it if it does not exist, so concurrent additions to a new label could each
+        create it. Until a request to a label succeeded, only a single chunk of it is sent at a time.
+        :return: The chunks to send now, and the chunks to send in the next rounds
+        """
+        if method != 'POST':
+            return pending_chunks, []
+        sent_chunks, deferred_chunks = [], []
+        unconfirmed_labels = set()
+        for chunk in pending_chunks:
+            label = (chunk.label_key, chunk.label_value)
+            if label in label_ids:
+                sent_chunks.append(chunk)
+            elif label in unconfirmed_labels:
+                deferred_chunks.append(chunk)
+            else:
+                unconfirmed_labels.add(label)
+                sent_chunks.append(chunk)
+        return sent_chunks, deferred_chunks
+
     def delete_label_by_name(self, label_name: str):
         """
         Delete a label by its name.
@@ -50,6 +420,44 @@ class CentraClient:
                 self.centra_session.urljoin_api(endpoint),
                 method='DELETE')
             assert deleted_id == label_id
+            if self.label_catalog is not None:
+                self.label_catalog.remove(label_id)
+
+    def bulk_delete_labels(self, names: Iterable[str] = (), keys: Iterable[str] = (),
+                           patterns: Iterable[LabelPattern] = (), max_workers: Optional[int] = None,
+                           dry_run: bool = False) -> BulkLabelDeletionResult:
+        """
+        Delete all the labels matching any of the names, keys or patterns. The labels are resolved with a single
+        listing (or from the label catalog), and deleted concurrently. A failed deletion does not stop the others.
+        :param names: Label names, e.g. "Environment: Production"
+        :param keys: Label keys, all of whose labels are deleted
+        :param patterns: Glob patterns (str) or compiled regular expressions matched against the whole label name, or
+                         (key pattern, value pattern) tuples, e.g. "App: legacy-*", re.compile(r"Owner: .*@old\\.com")
+                         or ("Temp*", "*")
+        :param max_workers: The maximal number of concurrent requests, defaults to the session's connection pool size
+        :param dry_run: Only report the matching labels, as successful deletions
+        :return: The deletion of every matching label
+        """
+        matches = _label_matcher(names, keys, patterns)
+        labels = self.label_catalog.find() if self.label_catalog is not None else self.iter_labels()
+        labels = [label for label in labels if matches(label)]
+        self.logger.debug(f"Deleting {len(labels)} matching labels")
+        if dry_run:
+            return BulkLabelDeletionResult([LabelDeletion(label) for label in labels])
+
+        results = self.centra_session.map(
+            [{"uri": self.centra_session.urljoin_api(f"{LABELS_ENDPOINT}/{label['id']}"), "method": "DELETE"}
+             for label in labels],
+            max_workers=max_workers)
+        deletions = []
+        for label, result in zip(labels, results):
+            error = result.error
+            if result.ok and result.value != label['id']:
+                error = ManagementAPIError(f"Deleting label {label['id']} returned {result.value!r}")
+            if error is None and self.label_catalog is not None:
+                self.label_catalog.remove(label['id'])
+            deletions.append(LabelDeletion(label, error))
+        return BulkLabelDeletionResult(deletions)
 
     # TODO change signature to accept filt
     def get_labels_ids(self, label_key, label_value):
@@ -58,6 +466,8 @@ class CentraClient:
         :param label_value: The label's value, e.g. "Prod", "DB".
         :return: A list of label IDs (can be used for other API such as deleting labels by ID)
         """
+        if self.label_catalog is not None:
+            return self.label_catalog.get_labels_ids(label_key, label_value)
         endpoint = f"visibility/labels"
         params = {
             "key": label_key,
@@ -73,15 +483,17 @@ class CentraClient:
         self.logger.debug(f"Found {len(list_of_matching_label_ids)} matching labels")
         return list_of_matching_label_ids
 
-    def get_system_notifications(self):
-        return self.centra_session.json_query(
-            self.centra_session.urljoin_api('system-notifications')
-        )
+    def get_system_notifications(self, **params):
+        uri = self.centra_session.urljoin_api('system-notifications')
+        if params:
+            return self.centra_session.json_query(uri, params=params)
+        return self.centra_session.json_query(uri)
 
     @property
     def is_connected(self) -> bool:
         """
-        Use this to test for connectivity.
+        Use this to test for connectivity. It fetches all the system notifications on every call; prefer a
+        health.HealthMonitor for frequent health checks.
         :return: True if Centra is connected and answering the API.
         """
         try:
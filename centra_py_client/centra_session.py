@@ -1,41 +1,131 @@
-import datetime
+import base64
+import gzip
+import itertools
 import json
 import logging
-from typing import Dict, Union
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 from urllib.parse import urljoin
 
-from centra_py_client.exceptions import ManagementAPIError, ManagementAPITimeoutError, RESTAuthenticationError
+from centra_py_client.codec import (TIME_FORMAT_STRING, DatetimeEncoder, JSONCodec,  # noqa: F401
+                                    get_default_codec, iter_json_array)
+from centra_py_client.exceptions import (ManagementAPIConnectionError, ManagementAPIError, ManagementAPITimeoutError,
+                                         RESTAuthenticationError)
+from centra_py_client.health import UNAVAILABLE_HTTP_STATUS_CODES, CircuitBreaker
+from centra_py_client.metrics import RequestEvent, TransferSize, TransferStats, endpoint_template
+from centra_py_client.response_cache import ResponseCache
+from centra_py_client.streaming import MultipartStream, SizedBody
+from centra_py_client.throttling import AdaptiveConcurrencyLimiter, TokenBucket
+from centra_py_client.token_cache import TokenCache, get_token_cache_key
+from centra_py_client.transport import (KEEPALIVE_SOCKET_OPTIONS, JWTAuth, RequestsTransport, Transport,  # noqa: F401
+                                        Urllib3Transport)
 
 import requests
-from requests.auth import AuthBase
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
 
 MANAGEMENT_REST_API_PORT = 443
 AUTHENTICATION_ERROR_HTTP_STATUS_CODE = 403
-TIME_FORMAT_STRING = "%Y/%m/%d %H:%M:%S.%f"  # this should be parsable by dateutil.parser
+NOT_MODIFIED_HTTP_STATUS_CODE = 304
 REST_API_BASE_PATH_V3 = '/api/v3.0/'
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_TOKEN_REFRESH_MARGIN = 60  # seconds before the JWT expiration in which the token is refreshed
+DEFAULT_RETRY_BACKOFF = 0.5  # seconds
+DEFAULT_RETRY_BACKOFF_MAX = 30  # seconds
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+DEFAULT_COMPRESSION_THRESHOLD = 16 * 1024  # bytes
+REQUEST_COMPRESSION_LEVEL = 6
+OVERLOAD_HTTP_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_HTTP_METHODS = frozenset({"GET", "PUT", "DELETE"})
 
 
-class DatetimeEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime.datetime):
-            return obj.strftime(TIME_FORMAT_STRING)
-            # Let the base class default method raise the TypeError
-        return json.JSONEncoder.default(self, obj)
+def get_http_server_root(management_address: str) -> str:
+    """
+    :param management_address: A host[:port], or a URL root when a scheme other than https is needed (e.g. for a
+                               local test server)
+    """
+    if management_address.startswith(('https://', 'http://')):
+        return management_address.rstrip('/')
+    return f"https://{management_address}"
 
 
-class JWTAuth(AuthBase):
-    """Attaches JWT Authentication to the given Request object."""
+def get_query_key(uri: str, params: Optional[Dict]) -> Tuple:
+    """
+    :return: A key identifying a GET request, which does not depend on the order or the types of its params
+    """
+    return uri, tuple(sorted((str(name), str(value)) for name, value in (params or {}).items()))
 
-    def __init__(self, token):
-        # setup any auth-related data here
-        if token is None:
-            raise ManagementAPIError("REST Token not set!")
-        self.token = token
 
-    def __call__(self, r):
-        # modify and return the request
-        r.headers['Authorization'] = 'Bearer ' + self.token
-        return r
+def get_jwt_expiration(token: str) -> Optional[float]:
+    """
+    Read the expiration time of a JWT. The signature is not verified, this is only used to schedule token refreshes.
+    :return: The `exp` claim as a unix timestamp, or None if the token has no readable expiration
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def raise_for_status(response):
+    """
+    Raise the matching ManagementAPIError for an unsuccessful management API response.
+    :param response: A response object exposing `status_code`, `content` and `json()`
+    """
+    if AUTHENTICATION_ERROR_HTTP_STATUS_CODE == response.status_code:  # This is a potential authorization error
+        raise RESTAuthenticationError(response)
+
+    if 200 != response.status_code:
+        try:
+            json_obj = json.loads(response.content)
+        except:  # noqa: E722
+            json_obj = response.content
+            if isinstance(json_obj, bytes) and b"504 Gateway Time-out" in json_obj:
+                raise ManagementAPITimeoutError(json_obj, response.status_code)
+
+        if 504 == response.status_code:
+            raise ManagementAPITimeoutError(json_obj, response.status_code)
+        raise ManagementAPIError(json_obj, response.status_code)
+
+
+def decode_json_response(content: bytes, codec: Optional[JSONCodec] = None) -> Union[Dict, str, None]:
+    """
+    Decode a management API response body, raising ManagementAPIError for error payloads.
+    :param codec: The codec to decode with, defaults to the json module
+    """
+    try:
+        json_obj = json.loads(content) if codec is None else codec.decode(content)
+        if json_obj is not None and "code" in json_obj and 0 != json_obj["code"]:
+            raise ManagementAPIError("Error: %s" % (json_obj["message"],))
+
+        return json_obj
+    except ValueError as exc:
+        raise ManagementAPIError("Error reading server response: %s :: [%s]" % (str(exc), content))
+
+
+class QueryResult(NamedTuple):
+    """The outcome of a single query run through CentraSession.map."""
+    value: Any
+    error: Optional[ManagementAPIError]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class _KeepAliveHTTPAdapter(HTTPAdapter):
+    """An HTTPAdapter which enables TCP keep-alive probes on its pooled connections."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = KEEPALIVE_SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
 
 
 class CentraSession:
@@ -45,31 +135,121 @@ class CentraSession:
         auth_username: str,
         auth_password: str,
         base_api_path=REST_API_BASE_PATH_V3,
-        verify_certificate: bool = True
+        verify_certificate: bool = True,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        token_refresh_margin: float = DEFAULT_TOKEN_REFRESH_MARGIN,
+        rate_limiter: Optional[TokenBucket] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        max_retries: int = 0,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        retry_backoff_max: float = DEFAULT_RETRY_BACKOFF_MAX,
+        json_codec: Optional[JSONCodec] = None,
+        compression: bool = False,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+        lazy_connect: bool = False,
+        token_cache: Optional[TokenCache] = None,
+        response_cache: Optional[ResponseCache] = None,
+        coalesce_requests: bool = True,
+        transport: Union[str, Transport] = 'requests',
+        circuit_breaker: Optional[CircuitBreaker] = None
     ):
         """
-        Todo
+        A session with the management REST API.
+        A single session may be shared between threads: connections are taken from a thread-safe pool, and the JWT
+        token is replaced atomically.
         :param management_address:
         :param auth_username:
         :param auth_password:
+        :param pool_connections: The number of connection pools to cache
+        :param pool_maxsize: The maximal number of connections kept open to the management server. Set it to at
+                             least the number of threads sharing this session.
+        :param pool_block: Whether threads should wait for a free connection when the pool is exhausted, instead of
+                           opening a connection which is discarded after use
+        :param keep_alive: Whether to reuse connections between requests (with TCP keep-alive probes)
+        :param token_refresh_margin: Seconds before the JWT expires in which the session re-authenticates
+        :param rate_limiter: Limits the rate of requests sent to the management server
+        :param concurrency_limiter: Adapts the number of requests in flight to the load of the management server
+        :param max_retries: How many times idempotent requests (GET, PUT, DELETE) are retried after a timeout,
+                            a connection error or a 429/5xx response
+        :param retry_backoff: The base delay of the jittered exponential backoff between retries, in seconds
+        :param retry_backoff_max: The maximal delay between retries, in seconds
+        :param json_codec: Encodes request bodies and decodes responses, defaults to the fastest codec installed
+        :param compression: Whether to accept every response encoding supported in this environment (including
+                            brotli when it is installed) and gzip request bodies larger than compression_threshold
+        :param compression_threshold: The minimal size in bytes of a request body to compress
+        :param lazy_connect: Whether to authenticate on the first request instead of in the constructor
+        :param token_cache: Where to look for a valid token before authenticating, and to store new tokens in, e.g. a
+                            FileTokenCache shared by the processes using the same management server and user
+        :param response_cache: Caches the responses of GET requests made through json_query
+        :param coalesce_requests: Whether identical GET requests made concurrently through json_query share a single
+                                  request, and its result or error
+        :param transport: Sends the requests: "requests" (the default), "urllib3" (direct urllib3 pooling, with less
+                          overhead per request) or a Transport instance
+        :param circuit_breaker: Fails requests fast, without sending them, while the management server is down
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.management_address = management_address
         self.auth_username = auth_username
         self.auth_password = auth_password
 
-        self.http_server_root = f"https://{management_address}"
+        self.http_server_root = get_http_server_root(management_address)
+        self.pool_maxsize = pool_maxsize
         self._requests_session = requests.Session()
         self._requests_session.verify = verify_certificate
+        adapter_class = _KeepAliveHTTPAdapter if keep_alive else HTTPAdapter
+        for prefix in ('https://', 'http://'):
+            self._requests_session.mount(prefix, adapter_class(pool_connections=pool_connections,
+                                                               pool_maxsize=pool_maxsize,
+                                                               pool_block=pool_block))
+        session_headers = {}
+        if not keep_alive:
+            session_headers['Connection'] = 'close'
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        if compression:
+            session_headers['Accept-Encoding'] = ACCEPT_ENCODING
+        self._requests_session.headers.update(session_headers)
+        if transport == 'requests':
+            self.transport = RequestsTransport(self._requests_session)
+        elif transport == 'urllib3':
+            self.transport = Urllib3Transport(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                              pool_block=pool_block, keep_alive=keep_alive,
+                                              verify_certificate=verify_certificate, headers=session_headers)
+        elif isinstance(transport, Transport):
+            self.transport = transport
+        else:
+            raise ValueError(f"Unknown transport {transport!r}, expected 'requests', 'urllib3' or a Transport")
+        self.transfer_stats = TransferStats()
+        self._observers = []
+        self.token = None
+        self.token_expiration = None
+        self.token_refresh_margin = token_refresh_margin
+        self.token_cache = token_cache
+        self.response_cache = response_cache
+        self.coalesce_requests = coalesce_requests
+        self._in_flight = {}  # query key -> Future of the response body
+        self._in_flight_lock = threading.Lock()
+        self._token_lock = threading.Lock()
+        self._reauthentication_lock = threading.RLock()
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.circuit_breaker = circuit_breaker
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
 
-        self.json_encoder = DatetimeEncoder()
+        self.json_codec = json_codec if json_codec is not None else get_default_codec()
         self.rest_auth_enabled = True
         self.authentication_handler = self.rest_authenticate
 
         self.set_base_api_path(base_api_path)
 
-        self.connect()
-        self.logger.debug(f"Connected to Centra successfully on {self.management_address}.")
+        if not lazy_connect:
+            self.connect()
+            self.logger.debug(f"Connected to Centra successfully on {self.management_address}.")
 
     def set_base_api_path(self, base_api_path):
         # TODO import validators and validate the path
@@ -106,63 +286,389 @@ class CentraSession:
                    convert_data_to_json=True) -> Union[bytes, Dict, str, None]:
         # TODO apijoin the uri
         if data is not None and convert_data_to_json:
-            data = self.json_encoder.encode(data)
-        response = self._query(uri=uri, method=method, data=data,
-                               params=params, authenticate=authenticate, files=files)
+            data = self.json_codec.encode(data)
+
+        def fetch() -> bytes:
+            if self.response_cache is not None:
+                return self._cached_query(uri=uri, method=method, data=data,
+                                          params=params, authenticate=authenticate, files=files)
+            return self._query(uri=uri, method=method, data=data,
+                               params=params, authenticate=authenticate, files=files).content
+
+        if self.coalesce_requests and method == "GET":
+            content = self._single_flight((authenticate,) + get_query_key(uri, params), fetch)
+        else:
+            content = fetch()
+        if not return_json:
+            return content
+        return decode_json_response(content, self.json_codec)
+
+    def uncached_query(self, uri, method="GET", data=None, return_json=True, params=None,
+                       **kwargs) -> Union[bytes, Dict, str, None]:
+        """
+        Like json_query, but always sent to the server: never answered from the response cache, nor joined to an
+        identical request in flight. E.g. for checking that the server is alive.
+        :param kwargs: Passed to the transport, e.g. timeout
+        """
+        if data is not None:
+            data = self.json_codec.encode(data)
+        content = self._query(uri=uri, method=method, data=data, params=params, **kwargs).content
+        if not return_json:
+            return content
+        return decode_json_response(content, self.json_codec)
+
+    def _cached_query(self, uri, method, data, params, authenticate, files) -> bytes:
+        """
+        Query through the response cache: answer GET requests from it, revalidate its stale responses, and
+        invalidate it after mutating requests.
+        :return: The response body
+        """
+        endpoint = endpoint_template(uri, self.base_api_path)
+        if method != "GET":
+            try:
+                return self._query(uri=uri, method=method, data=data, params=params,
+                                   authenticate=authenticate, files=files).content
+            finally:
+                self.response_cache.invalidate(endpoint)
+        if not authenticate or self.response_cache.get_ttl(endpoint) <= 0:
+            return self._query(uri=uri, method=method, data=data, params=params,
+                               authenticate=authenticate, files=files).content
+
+        key = get_query_key(uri, params)
+        cached = self.response_cache.get(key)
+        if cached is not None and cached.fresh:
+            return cached.content
+        response = self._query(uri=uri, method=method, data=data, params=params, files=files,
+                               extra_headers=cached.revalidation_headers if cached is not None else None)
+        if cached is not None and NOT_MODIFIED_HTTP_STATUS_CODE == response.status_code:
+            return self.response_cache.refresh(key, cached).content
+        self.response_cache.put(key, endpoint, response.content, response.headers)
+        return response.content
+
+    def json_query_stream(self, uri, method="GET", data=None, params=None, key='objects',
+                          chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE) -> Iterator:
+        """
+        Like json_query, but yield the elements of the `key` array of the response as they are read from the socket,
+        instead of reading and decoding the whole response body at once.
+        :param key: The key of the array in the response object, e.g. "objects"
+        :param chunk_size: The number of bytes to read from the socket at a time
+        """
+        if data is not None:
+            data = self.json_codec.encode(data)
+        response = self._query(uri=uri, method=method, data=data, params=params, stream=True)
+        try:
+            yield from iter_json_array(response.iter_content(chunk_size), key)
+        finally:
+            response.close()
+
+    def download(self, uri, destination, method="GET", data=None, params=None,
+                 chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE) -> int:
+        """
+        Write a response body to a file or a buffer as it is read from the socket, instead of holding all of it in
+        memory as json_query(return_json=False) does.
+        :param destination: A file path, which is only replaced once the whole body was received, or a writable binary
+                            file object
+        :return: The number of bytes written
+        """
+        if data is not None:
+            data = self.json_codec.encode(data)
+        response = self._query(uri=uri, method=method, data=data, params=params, stream=True)
         try:
-            if not return_json:
-                return response.content
+            if hasattr(destination, 'write'):
+                return self._write_chunks(response.iter_content(chunk_size), destination)
+            partial_path = f"{os.fspath(destination)}.part"
             try:
-                json_obj = json.loads(response.content)
-            except TypeError:
-                json_obj = json.loads(response.content.decode('utf-8'))
-            if json_obj is not None and "code" in json_obj and 0 != json_obj["code"]:
-                raise ManagementAPIError("Error: %s" % (json_obj["message"],))
+                with open(partial_path, 'wb') as f:
+                    written = self._write_chunks(response.iter_content(chunk_size), f)
+                os.replace(partial_path, destination)
+            finally:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+            return written
+        finally:
+            response.close()
+
+    @staticmethod
+    def _write_chunks(chunks: Iterable[bytes], destination) -> int:
+        written = 0
+        for chunk in chunks:
+            destination.write(chunk)
+            written += len(chunk)
+        return written
 
-            return json_obj
-        except ValueError as exc:
-            raise ManagementAPIError("Error reading server response: %s :: [%s]" % (str(exc), response.content))
+    def upload(self, uri, data=None, files=None, method="POST", params=None,
+               content_type: str = 'application/octet-stream', return_json=True) -> Union[bytes, Dict, str, None]:
+        """
+        Send a request body without loading it into memory.
+        Bodies which can be rewound (bytes, seekable files and multipart forms of seekable files) are replayed after a
+        re-authentication or for a retry; other bodies (e.g. generators) are sent once.
+        :param data: The raw body: bytes, a binary file object or an iterable of bytes chunks
+        :param files: Multipart form fields, streamed from their file objects (see MultipartStream)
+        :param content_type: The content type of a raw body
+        """
+        if files is not None:
+            multipart = files if isinstance(files, MultipartStream) else MultipartStream(files)
+            content_type = multipart.content_type
+            # Without a known length, the body is sent with chunked transfer encoding
+            length = multipart.length
+            data = SizedBody(multipart, length) if length is not None else iter(multipart)
+        response = self._query(uri=uri, method=method, data=data, params=params,
+                               extra_headers={'content-type': content_type})
+        if not return_json:
+            return response.content
+        return decode_json_response(response.content, self.json_codec)
 
-    def _query(self, uri, method="GET", data=None, params=None, authenticate=True, files=None, **kwargs):
+    def _single_flight(self, key: Hashable, fetch: Callable[[], bytes]) -> bytes:
+        """
+        Fetch, unless another thread is already fetching the same key, in which case wait for its result.
+        """
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._in_flight[key] = Future()
+        if not is_leader:
+            self.logger.debug("Joining the request in flight for %s", key[1])
+            return future.result()
+
+        try:
+            content = fetch()
+        except BaseException as e:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._in_flight_lock:
+            del self._in_flight[key]
+        future.set_result(content)
+        return content
+
+    def map(self, queries: Iterable[Dict], max_workers: Optional[int] = None) -> List[QueryResult]:
+        """
+        Run many queries concurrently over the pooled connections.
+        :param queries: An iterable of json_query keyword arguments, e.g. {"uri": ..., "method": "DELETE"}
+        :param max_workers: The maximal number of concurrent queries, defaults to the connection pool size
+        :return: A QueryResult for every query, in the order of the queries. Failed queries hold their
+                 ManagementAPIError instead of raising it.
+        """
+        def run_query(query_kwargs):
+            try:
+                return QueryResult(self.json_query(**query_kwargs), None)
+            except ManagementAPIError as e:
+                return QueryResult(None, e)
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_maxsize,
+                                thread_name_prefix=f"{self.__class__.__name__}-map") as executor:
+            return list(executor.map(run_query, queries))
+
+    def _query(self, uri, method="GET", data=None, params=None, authenticate=True, files=None, extra_headers=None,
+               **kwargs):
         if params is None:
             params = {}
 
-        self.logger.debug("%s %s%s", method, uri, ('' if not params
-                                                   else '?' + '&'.join("%s=%s" % (key, value)
-                                                                       for key, value in params.items())))
-
-        method_func = {"GET": self._requests_session.get,
-                       "POST": self._requests_session.post,
-                       "PUT": self._requests_session.put,
-                       "PATCH": self._requests_session.patch,
-                       "DELETE": self._requests_session.delete}[method]
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s %s%s", method, uri, ('' if not params
+                                                       else '?' + '&'.join("%s=%s" % (key, value)
+                                                                           for key, value in params.items())))
 
         headers = {'content-type': 'application/json'} if files is None else None
-        auth = JWTAuth(self.token) if (authenticate and self.rest_auth_enabled) else None
-        # print urljoin(self.http_server_root, uri), data, headers, params
+        if extra_headers:
+            headers = dict(headers or {}, **extra_headers)
+        request_bytes = 0
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if isinstance(data, bytes):
+            request_bytes = len(data)
+            if self.compression and request_bytes >= self.compression_threshold:
+                data = gzip.compress(data, compresslevel=REQUEST_COMPRESSION_LEVEL)
+                headers = dict(headers or {}, **{'Content-Encoding': 'gzip'})
+        request_wire_bytes = len(data) if isinstance(data, bytes) else request_bytes
+        # Streamed bodies are rewound before they are sent again, or not sent again if they cannot be
+        body_position = None
+        replayable = True
+        if hasattr(data, 'read'):
+            try:
+                body_position = data.tell()
+            except (AttributeError, OSError):
+                replayable = False
+        elif data is not None and not isinstance(data, (bytes, dict, list, tuple)):
+            replayable = False
+        sent_count = 0
+
+        start_time = time.perf_counter()
+        use_token = authenticate and self.rest_auth_enabled
+        # The totals of all the attempts of this query, reported to the observers
+        totals = {'request_bytes': 0, 'response_bytes': 0, 'retries': 0, 'auth_refreshes': 0}
+
+        def reauthenticate(stale_token):
+            if self._reauthenticate(stale_token):
+                totals['auth_refreshes'] += 1
+
+        def send():
+            nonlocal sent_count
+            if sent_count and body_position is not None:
+                data.seek(body_position)
+            sent_count += 1
+            token = self.token
+            if use_token and token is None:
+                raise ManagementAPIError("REST Token not set!")
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.check()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            if self.concurrency_limiter is not None:
+                self.concurrency_limiter.acquire()
+            overloaded = True
+            unavailable = None  # unknown, if the request failed for a reason unrelated to the server
+            try:
+                r = self.transport.request(method, urljoin(self.http_server_root, uri), data=data, headers=headers,
+                                           params=params, token=token if use_token else None, files=files, **kwargs)
+                overloaded = r.status_code in OVERLOAD_HTTP_STATUS_CODES
+                unavailable = r.status_code in UNAVAILABLE_HTTP_STATUS_CODES
+                transfer_size = TransferSize(request_bytes, request_wire_bytes,
+                                             *self._response_size(r, kwargs.get('stream', False)))
+                self.transfer_stats.add(transfer_size)
+                totals['request_bytes'] += transfer_size.request_wire_bytes
+                totals['response_bytes'] += transfer_size.response_wire_bytes
+                return token, r
+            except ManagementAPIConnectionError as e:  # including timeouts, and responses which could not be read
+                unavailable = True
+                raise ManagementAPIConnectionError("Error while handling %s request for uri %s: %s" % (method, uri, e))
+            finally:
+                if self.concurrency_limiter is not None:
+                    self.concurrency_limiter.release(overloaded)
+                if self.circuit_breaker is not None:
+                    if unavailable is None:
+                        self.circuit_breaker.release()
+                    else:
+                        self.circuit_breaker.record(unavailable)
+
+        def send_authenticated():
+            sent_token, r = send()
+            if use_token and AUTHENTICATION_ERROR_HTTP_STATUS_CODE == r.status_code:
+                if replayable:
+                    # Release the connection of the refused response first, a streamed one would otherwise hold it
+                    r.close()
+                reauthenticate(sent_token)
+                if replayable:
+                    self.logger.debug("%s %s was refused, re-authenticated and replaying it", method, uri)
+                    _, r = send()
+
+            if not (extra_headers and NOT_MODIFIED_HTTP_STATUS_CODE == r.status_code):
+                try:
+                    raise_for_status(r)
+                except ManagementAPIError:
+                    r.close()  # before a retry, or before the error reaches the caller
+                    raise
+            return r
+
+        def send_with_retries():
+            if use_token and (self.token is None or self._token_needs_refresh()):
+                reauthenticate(self.token)
+            for attempt in itertools.count():
+                try:
+                    return send_authenticated()
+                except ManagementAPIError as e:
+                    if attempt >= self.max_retries or not replayable or not self._is_retryable(method, e):
+                        raise
+                    delay = random.uniform(0, min(self.retry_backoff_max, self.retry_backoff * 2 ** attempt))
+                    self.logger.debug("%s %s failed (%s), retrying in %.2f seconds", method, uri, e, delay)
+                    totals['retries'] += 1
+                    time.sleep(delay)
+
+        if not self._observers:
+            return send_with_retries()
+
+        status_code = None
+        error = None
         try:
-            r = method_func(urljoin(self.http_server_root, uri), data=data, headers=headers,
-                            params=params, auth=auth, files=files, **kwargs)
-        except requests.exceptions.RequestException as e:
-            raise ManagementAPIError("Error while handling %s request for uri %s: %s" % (method, uri, e))
+            r = send_with_retries()
+            status_code = r.status_code
+            return r
+        except ManagementAPIError as e:
+            status_code = e.status_code
+            error = e
+            raise
+        finally:
+            self._notify_observers(RequestEvent(
+                method=method, endpoint=endpoint_template(uri, self.base_api_path), uri=uri,
+                status_code=status_code, latency=time.perf_counter() - start_time, error=error, **totals))
 
-        if AUTHENTICATION_ERROR_HTTP_STATUS_CODE == r.status_code:  # This is a potential authorization error
-            raise RESTAuthenticationError(r)
+    def add_observer(self, observer: Callable[[RequestEvent], None]):
+        """
+        Call an observer after every request, with a RequestEvent describing it.
+        Observers are called synchronously on the requesting thread, so they should be quick and thread-safe.
+        """
+        self._observers = self._observers + [observer]
 
-        if 200 != r.status_code:
+    def remove_observer(self, observer: Callable[[RequestEvent], None]):
+        self._observers = [registered for registered in self._observers if registered is not observer]
+
+    def _notify_observers(self, event: RequestEvent):
+        for observer in self._observers:
             try:
-                json_obj = json.loads(r.content)
-            except:  # noqa: E722
-                json_obj = r.content
-                if isinstance(json_obj, bytes) and b"504 Gateway Time-out" in json_obj:
-                    raise ManagementAPITimeoutError(json_obj)
+                observer(event)
+            except Exception:  # an observer must never fail the request
+                self.logger.exception(f"Request observer {observer!r} failed")
+
+    @staticmethod
+    def _response_size(r, stream: bool):
+        """
+        :return: The decoded and the on-the-wire size of a response body. Streamed bodies are not counted.
+        """
+        if stream:
+            return 0, 0
+        response_bytes = len(r.content)
+        wire_bytes = r.headers.get('Content-Length')
+        if wire_bytes is None:
+            wire_bytes = r.raw.tell() if hasattr(r.raw, 'tell') else response_bytes
+        try:
+            return response_bytes, int(wire_bytes)
+        except (TypeError, ValueError):
+            return response_bytes, response_bytes
+
+    @staticmethod
+    def _is_retryable(method: str, error: ManagementAPIError) -> bool:
+        if method not in IDEMPOTENT_HTTP_METHODS:
+            return False
+        return (isinstance(error, (ManagementAPITimeoutError, ManagementAPIConnectionError))
+                or error.status_code in OVERLOAD_HTTP_STATUS_CODES)
 
-            raise ManagementAPIError(json_obj)
+    def _token_needs_refresh(self) -> bool:
+        return self._expires_soon(self.token_expiration)
 
-        return r
+    def _expires_soon(self, token_expiration: Optional[float]) -> bool:
+        return token_expiration is not None and time.time() >= token_expiration - self.token_refresh_margin
+
+    def _reauthenticate(self, stale_token):
+        """
+        Re-authenticate, unless another thread already replaced the stale token while we waited for the lock.
+        This makes sure that many requests failing together cause a single authentication.
+        :return: Whether this call re-authenticated
+        """
+        with self._reauthentication_lock:
+            if self.token != stale_token:
+                return False
+            self.connect()
+            return True
 
     def connect(self):
-        self.authentication_handler(self.auth_username, self.auth_password)
+        if self.token_cache is None:
+            self.authentication_handler(self.auth_username, self.auth_password)
+            return
+
+        cache_key = get_token_cache_key(self.management_address, self.auth_username)
+        with self.token_cache.lock(cache_key):
+            cached_token = self.token_cache.get(cache_key)
+            # The current token is never taken from the cache again, it is being replaced because it was refused
+            if (cached_token is not None and cached_token != self.token
+                    and not self._expires_soon(get_jwt_expiration(cached_token))):
+                self.logger.debug("Using the cached REST token")
+                self.set_token(cached_token)
+                return
+            self.authentication_handler(self.auth_username, self.auth_password)
+            if self.token is not None:
+                self.token_cache.set(cache_key, self.token)
 
     def disconnect(self):
         self.json_query(self.urljoin_api('logout'), method='POST', return_json=False)
@@ -173,5 +679,7 @@ class CentraSession:
         :param token:
         """
         self.logger.debug("Setting REST token")
-        self.token = token
-        self._requests_session.auth = JWTAuth(self.token)  # so others can use this session
+        with self._token_lock:
+            self.token = token
+            self.token_expiration = get_jwt_expiration(token)
+            self._requests_session.auth = JWTAuth(token)  # so others can use this session
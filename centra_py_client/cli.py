@@ -0,0 +1,68 @@
+"""Command line tools."""
+import argparse
+import logging
+import os
+import sys
+
+from centra_py_client.centra_py_client import DEFAULT_PAGE_SIZE, CentraClient
+from centra_py_client.centra_session import CentraSession
+from centra_py_client.exceptions import ManagementAPIError
+from centra_py_client.export import EXPORT_ENDPOINTS, EXPORT_FORMATS, export
+from centra_py_client.token_cache import FileTokenCache
+
+DEFAULT_OUTPUT_EXTENSIONS = {'ndjson': '.ndjson', 'csv': '.csv', 'parquet': ''}
+
+
+def _parse_filter(text: str):
+    key, separator, value = text.partition('=')
+    if not separator or not key:
+        raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got {text!r}")
+    return key, value
+
+
+def export_main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='centra-export',
+                                     description="Export all the assets or labels of Centra to a file, streaming one "
+                                                 "page at a time.")
+    parser.add_argument('resource', choices=sorted(EXPORT_ENDPOINTS))
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson')
+    parser.add_argument('--output', '-o', help="The output file (a directory for parquet), defaults to the resource "
+                                               "name with the format's extension")
+    parser.add_argument('--fields', help="Comma separated top-level fields to export, defaults to all of them")
+    parser.add_argument('--filter', type=_parse_filter, action='append', default=[], metavar='KEY=VALUE',
+                        help="A filter passed to the API, may be repeated, e.g. --filter status=on")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--resume', action='store_true', help="Continue an interrupted export")
+    parser.add_argument('--address', default=os.environ.get('CENTRA_ADDRESS'),
+                        help="The management server address, defaults to $CENTRA_ADDRESS")
+    parser.add_argument('--username', default=os.environ.get('CENTRA_USERNAME'),
+                        help="Defaults to $CENTRA_USERNAME")
+    parser.add_argument('--password', default=os.environ.get('CENTRA_PASSWORD'),
+                        help="Defaults to $CENTRA_PASSWORD")
+    parser.add_argument('--no-verify', action='store_true', help="Do not verify the server certificate")
+    parser.add_argument('--no-token-cache', action='store_true',
+                        help="Always log in, instead of reusing a cached token")
+    parser.add_argument('--verbose', '-v', action='store_true')
+    args = parser.parse_args(argv)
+    for name in ('address', 'username', 'password'):
+        if not getattr(args, name):
+            parser.error(f"--{name} (or $CENTRA_{name.upper()}) is required")
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s %(levelname)s %(message)s')
+    output = args.output or args.resource + DEFAULT_OUTPUT_EXTENSIONS[args.format]
+    fields = [field.strip() for field in args.fields.split(',')] if args.fields else None
+    try:
+        session = CentraSession(args.address, args.username, args.password, verify_certificate=not args.no_verify,
+                                lazy_connect=True, token_cache=None if args.no_token_cache else FileTokenCache())
+        result = export(CentraClient(session), args.resource, output, format=args.format, fields=fields,
+                        page_size=args.page_size, resume=args.resume, **dict(args.filter))
+    except ManagementAPIError as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Exported {result.rows} {args.resource} to {result.path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(export_main())
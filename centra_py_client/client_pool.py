@@ -0,0 +1,238 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from centra_py_client.centra_py_client import DEFAULT_PAGE_SIZE, CentraClient
+from centra_py_client.centra_session import CentraSession
+
+MERGE_QUEUE_PAGES = 2  # pages per cluster buffered by a merged iterator
+_PRODUCER_POLL_INTERVAL = 0.1  # seconds
+_END = object()  # marks the end of the objects of a cluster
+
+
+class ClusterResult(NamedTuple):
+    """An object returned by one of the clusters of a CentraClientPool."""
+    cluster: str
+    value: Any
+
+
+class FanOutResult(NamedTuple):
+    """The outcome of an operation run on every cluster of a CentraClientPool."""
+    values: Dict[str, Any]  # cluster -> the value returned by the cluster
+    errors: Dict[str, Exception]  # cluster -> the error raised by the cluster, or a TimeoutError
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class MergedIterator:
+    """
+    Iterates over the objects of all the clusters as ClusterResults, in the order they are received, so a slow
+    cluster does not hold back the others. Every cluster is read by a thread of its own into a bounded queue.
+    The clusters which failed are in `errors` once the iteration is over; the objects they returned before failing
+    were already yielded.
+    """
+
+    def __init__(self, iterables: Dict[str, Callable[[], Iterable]], buffer_size: int,
+                 timeout: Optional[float] = None):
+        """
+        :param iterables: Creates the iterable of every cluster, by cluster name
+        :param buffer_size: The maximal number of objects read ahead of the consumer
+        :param timeout: Seconds a cluster may go without returning an object before it is abandoned with a
+                        TimeoutError. Time spent waiting for the consumer does not count, so a long iteration over
+                        healthy clusters is never cut short.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.errors: Dict[str, Exception] = {}
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=buffer_size)
+        self._stopped = threading.Event()
+        self._running = set(iterables)
+        self._abandoned = set()
+        now = time.monotonic()
+        self._last_progress = {cluster: now for cluster in iterables}  # cluster -> when it last made progress
+        self._threads = [threading.Thread(target=self._produce, args=(cluster, make_iterable), daemon=True,
+                                          name=f"{self.__class__.__name__}-{cluster}")
+                         for cluster, make_iterable in iterables.items()]
+        for thread in self._threads:
+            thread.start()
+
+    def _put(self, item: ClusterResult) -> bool:
+        while not self._stopped.is_set() and item.cluster not in self._abandoned:
+            try:
+                self._queue.put(item, timeout=_PRODUCER_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                # Waiting for the consumer, the cluster itself is not stalled
+                self._last_progress[item.cluster] = time.monotonic()
+        return False
+
+    def _produce(self, cluster: str, make_iterable: Callable[[], Iterable]):
+        try:
+            for value in make_iterable():
+                self._last_progress[cluster] = time.monotonic()
+                if not self._put(ClusterResult(cluster, value)):
+                    return
+        except Exception as e:
+            self.logger.warning(f"Cluster {cluster} failed: {e}")
+            self.errors[cluster] = e
+        finally:
+            self._put(ClusterResult(cluster, _END))
+
+    def __iter__(self) -> Iterator[ClusterResult]:
+        return self
+
+    def __next__(self) -> ClusterResult:
+        while self._running:
+            timeout = None
+            if self.timeout is not None:
+                stalled_at = min(self._last_progress[cluster] for cluster in self._running) + self.timeout
+                timeout = max(0.0, stalled_at - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._abandon_stalled_clusters()
+                continue
+            if item.cluster in self._abandoned:
+                continue
+            if item.value is not _END:
+                return item
+            self._running.discard(item.cluster)
+        raise StopIteration
+
+    def _abandon_stalled_clusters(self):
+        now = time.monotonic()
+        for cluster in list(self._running):
+            if now - self._last_progress[cluster] >= self.timeout:
+                self.logger.warning(f"Cluster {cluster} returned nothing for {self.timeout} seconds")
+                self.errors[cluster] = TimeoutError(f"Cluster {cluster} returned nothing for {self.timeout} seconds")
+                self._abandoned.add(cluster)
+                self._running.discard(cluster)
+        if not self._running:
+            self.close()
+
+    def close(self):
+        """
+        Stop reading the clusters, when the iteration is abandoned before it is over.
+        """
+        self._stopped.set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CentraClientPool:
+    """
+    Runs queries on several management clusters in parallel:
+
+        pool = CentraClientPool.from_addresses(["centra-eu", "centra-us"], "username", "password")
+        for cluster, asset in pool.iter_assets(status="on"):
+            ...
+        result = pool.get_labels_ids("Environment", "Production")
+        result.values["centra-eu"], result.errors
+    """
+
+    def __init__(self, clients: Dict[str, CentraClient], timeout: Optional[float] = None):
+        """
+        :param clients: The client of every cluster, by cluster name
+        :param timeout: Seconds to wait for the clusters in every fan-out operation, and that a cluster may go without
+                        returning an object during an iteration. Clusters which did not answer in time are reported
+                        with a TimeoutError, and do not delay the others.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.clients = dict(clients)
+        self.timeout = timeout
+
+    @classmethod
+    def from_addresses(cls, management_addresses: Iterable[str], auth_username: str, auth_password: str,
+                       timeout: Optional[float] = None, **session_kwargs) -> 'CentraClientPool':
+        """
+        Create a pool of clusters sharing the same credentials, named by their addresses. The sessions authenticate
+        on their first request, so an unreachable cluster only fails its own queries.
+        :param session_kwargs: Passed to every CentraSession
+        """
+        session_kwargs.setdefault('lazy_connect', True)
+        return cls({address: CentraClient(CentraSession(address, auth_username, auth_password, **session_kwargs))
+                    for address in management_addresses}, timeout)
+
+    def run(self, operation: Callable[[CentraClient], Any], clusters: Optional[Iterable[str]] = None) -> FanOutResult:
+        """
+        Run an operation on every cluster in parallel.
+        :param operation: Called with the client of every cluster
+        :param clusters: The clusters to run on, defaults to all of them
+        """
+        return self._run({cluster: lambda client=self.clients[cluster]: operation(client)
+                          for cluster in (self.clients if clusters is None else clusters)})
+
+    def _run(self, operations: Dict[str, Callable[[], Any]]) -> FanOutResult:
+        # Every fan-out gets threads of its own, so a cluster still busy with a timed out operation does not take a
+        # worker from the next operations
+        executor = ThreadPoolExecutor(max_workers=max(1, len(operations)), thread_name_prefix=self.__class__.__name__)
+        futures = {cluster: executor.submit(operation) for cluster, operation in operations.items()}
+        executor.shutdown(wait=False)
+        wait(futures.values(), timeout=self.timeout)
+        values, errors = {}, {}
+        for cluster, future in futures.items():
+            if not future.done():
+                # The operation keeps running in the background, its result is discarded
+                errors[cluster] = TimeoutError(f"Cluster {cluster} did not answer within {self.timeout} seconds")
+            elif future.exception() is not None:
+                errors[cluster] = future.exception()
+            else:
+                values[cluster] = future.result()
+        for cluster, error in errors.items():
+            self.logger.warning(f"Cluster {cluster} failed: {error}")
+        return FanOutResult(values, errors)
+
+    def iter_assets(self, *, page_size: int = DEFAULT_PAGE_SIZE, fields: Optional[Sequence[str]] = None,
+                    as_models: bool = False, **filt) -> MergedIterator:
+        """
+        Iterate over the assets of all the clusters. See CentraClient.iter_assets for the parameters.
+        """
+        return MergedIterator({cluster: lambda client=client: client.iter_assets(page_size=page_size, fields=fields,
+                                                                                 as_models=as_models, **filt)
+                               for cluster, client in self.clients.items()},
+                              MERGE_QUEUE_PAGES * page_size * max(1, len(self.clients)), self.timeout)
+
+    def iter_labels(self, *, page_size: int = DEFAULT_PAGE_SIZE, fields: Optional[Sequence[str]] = None,
+                    as_models: bool = False, **filt) -> MergedIterator:
+        """
+        Iterate over the labels of all the clusters. See CentraClient.iter_labels for the parameters.
+        """
+        return MergedIterator({cluster: lambda client=client: client.iter_labels(page_size=page_size, fields=fields,
+                                                                                 as_models=as_models, **filt)
+                               for cluster, client in self.clients.items()},
+                              MERGE_QUEUE_PAGES * page_size * max(1, len(self.clients)), self.timeout)
+
+    def list_assets(self, **filt) -> FanOutResult:
+        """
+        :return: The list of assets of every cluster
+        """
+        return self.run(lambda client: client.list_assets(**filt))
+
+    def get_labels_ids(self, label_key: str, label_value: str) -> FanOutResult:
+        """
+        :return: The ids of the matching labels in every cluster
+        """
+        return self.run(lambda client: client.get_labels_ids(label_key, label_value))
+
+    def add_label_to_assets(self, asset_ids_by_cluster: Dict[str, List[str]], label_key: str,
+                            label_value: str) -> FanOutResult:
+        """
+        Add a label to assets in several clusters in parallel.
+        :param asset_ids_by_cluster: The ids of the assets to label in every cluster (asset ids are per cluster)
+        :return: The id of the label in every cluster
+        """
+        return self._run({cluster: lambda client=self.clients[cluster], asset_ids=asset_ids:
+                          client.add_label_to_assets(asset_ids, label_key, label_value)
+                          for cluster, asset_ids in asset_ids_by_cluster.items()})
+
+    def delete_label_by_key_value(self, label_key: str, label_value: str) -> FanOutResult:
+        return self.run(lambda client: client.delete_label_by_key_value(label_key, label_value))
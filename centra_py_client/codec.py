@@ -0,0 +1,176 @@
+import codecs
+import datetime
+import json
+from typing import Any, Iterable, Iterator, Union
+
+from centra_py_client.exceptions import ManagementAPIError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+TIME_FORMAT_STRING = "%Y/%m/%d %H:%M:%S.%f"  # this should be parsable by dateutil.parser
+_JSON_WHITESPACE = ' \t\n\r'
+
+
+class DatetimeEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, datetime.datetime):
+            return obj.strftime(TIME_FORMAT_STRING)
+            # Let the base class default method raise the TypeError
+        return json.JSONEncoder.default(self, obj)
+
+
+class JSONCodec:
+    """Encodes request bodies and decodes response bodies. Datetimes are encoded with TIME_FORMAT_STRING."""
+
+    def encode(self, obj: Any) -> Union[str, bytes]:
+        raise NotImplementedError()
+
+    def decode(self, content: Union[bytes, str]) -> Any:
+        """
+        :raise ValueError: If the content is not valid JSON
+        """
+        raise NotImplementedError()
+
+
+class StdlibJSONCodec(JSONCodec):
+    def __init__(self):
+        self.encoder = DatetimeEncoder()
+
+    def encode(self, obj: Any) -> str:
+        return self.encoder.encode(obj)
+
+    def decode(self, content: Union[bytes, str]) -> Any:
+        return json.loads(content)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    A codec backed by orjson, which encodes and decodes several times faster than the json module.
+    Objects orjson does not encode (e.g. integers beyond 64 bits) are encoded by the json module, so installing orjson
+    does not change which request bodies can be sent.
+    """
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires orjson, install it with `pip install centra_py_client[fast-json]`")
+        self._fallback = StdlibJSONCodec()
+
+    @staticmethod
+    def _default(obj):
+        if isinstance(obj, datetime.datetime):
+            return obj.strftime(TIME_FORMAT_STRING)
+        raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+    def encode(self, obj: Any) -> bytes:
+        # orjson formats datetimes as RFC 3339 by default, pass them through to keep TIME_FORMAT_STRING.
+        # Non-str keys are converted to strings, as the json module does.
+        try:
+            return orjson.dumps(obj, default=self._default,
+                                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+        except TypeError:  # orjson.JSONEncodeError is a TypeError
+            return self._fallback.encode(obj).encode('utf-8')
+
+    def decode(self, content: Union[bytes, str]) -> Any:
+        return orjson.loads(content)
+
+
+def get_default_codec() -> JSONCodec:
+    """
+    :return: The fastest codec available in this environment
+    """
+    return OrjsonCodec() if orjson is not None else StdlibJSONCodec()
+
+
+class _JSONStreamReader:
+    """Reads JSON tokens and values from a stream of byte chunks, holding only the unread part of the stream."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._exhausted = False
+
+    def _read_more(self) -> bool:
+        if self._exhausted:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._exhausted = True
+            text = self._text_decoder.decode(b'', final=True)
+        else:
+            text = self._text_decoder.decode(chunk)
+        self._buffer = self._buffer[self._position:] + text
+        self._position = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        :return: The next non-whitespace character, or an empty string at the end of the stream
+        """
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _JSON_WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read_more():
+                return ''
+
+    def consume(self, expected: str):
+        if self.peek() != expected:
+            raise ValueError(f"Expected {expected!r} at stream offset {self._position}")
+        self._position += 1
+
+    def read_value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._position)
+                # A value which ends with the buffer might be truncated (e.g. a number), unless the stream ended
+                if end < len(self._buffer) or self._exhausted:
+                    self._position = end
+                    return value
+            except ValueError:
+                if self._exhausted:
+                    raise
+            # Read until the unread part doubles, so a large value is not re-parsed for every chunk
+            unread_length = len(self._buffer) - self._position
+            while self._read_more() and len(self._buffer) - self._position < 2 * unread_length:
+                pass
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str = 'objects') -> Iterator[Any]:
+    """
+    Incrementally decode a JSON object, yielding the elements of its `key` array as soon as they are read.
+    :param chunks: The raw JSON object, as a stream of byte chunks
+    :param key: The key of the array to yield the elements of
+    """
+    reader = _JSONStreamReader(chunks)
+    try:
+        reader.consume('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            name = reader.read_value()
+            reader.consume(':')
+            if name == key and reader.peek() == '[':
+                reader.consume('[')
+                if reader.peek() != ']':
+                    while True:
+                        yield reader.read_value()
+                        if reader.peek() != ',':
+                            break
+                        reader.consume(',')
+                reader.consume(']')
+            else:
+                reader.read_value()
+            if reader.peek() != ',':
+                break
+            reader.consume(',')
+        reader.consume('}')
+    except ValueError as exc:
+        raise ManagementAPIError("Error reading server response: %s" % (exc,))
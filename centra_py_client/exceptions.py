@@ -1,16 +1,31 @@
 class ManagementAPIError(Exception):
-    def __init__(self, message):
+    def __init__(self, message, status_code=None):
         super(ManagementAPIError, self).__init__(message)
+        self.status_code = status_code
 
 
 class ManagementAPITimeoutError(ManagementAPIError):
+    def __init__(self, message, status_code=None):
+        super(ManagementAPITimeoutError, self).__init__(message, status_code)
+
+
+class ManagementAPIConnectionError(ManagementAPIError):
     def __init__(self, message):
-        super(ManagementAPITimeoutError, self).__init__(message)
+        super(ManagementAPIConnectionError, self).__init__(message)
 
 
 class RESTAuthenticationError(ManagementAPIError):
     def __init__(self, response):
         data = response.json()
         super(RESTAuthenticationError, self).__init__('%s: %s' % (data['error'],
-                                                                  data['description']))
+                                                                  data['description']),
+                                                      response.status_code)
         self.data = data
+
+
+class ManagementAPIUnavailableError(ManagementAPIError):
+    """Raised without sending a request while the circuit breaker considers the management server down."""
+
+    def __init__(self, message, retry_after=None):
+        super(ManagementAPIUnavailableError, self).__init__(message)
+        self.retry_after = retry_after
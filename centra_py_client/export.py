@@ -0,0 +1,242 @@
+import csv
+import io
+import json
+import logging
+import os
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from centra_py_client.centra_py_client import DEFAULT_PAGE_SIZE, CentraClient
+from centra_py_client.codec import JSONCodec
+from centra_py_client.label_catalog import LABELS_ENDPOINT
+from centra_py_client.models import project
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - pyarrow is an optional dependency
+    pyarrow = None
+
+EXPORT_ENDPOINTS = {
+    'assets': 'assets',
+    'labels': LABELS_ENDPOINT,
+}
+EXPORT_FORMATS = ('ndjson', 'csv', 'parquet')
+STATE_FILE_SUFFIX = '.state.json'
+
+
+class ExportResult(NamedTuple):
+    path: str
+    rows: int  # including the rows exported before resuming
+    pages: int  # exported by this run
+    resumed_from: int  # the offset the export resumed from, 0 if it started from the beginning
+
+
+def _encode_nested(codec: JSONCodec, value):
+    # Flat formats keep scalars as they are, and nested values as JSON
+    if isinstance(value, (dict, list)):
+        encoded = codec.encode(value)
+        return encoded.decode('utf-8') if isinstance(encoded, bytes) else encoded
+    return value
+
+
+class _FlatColumns:
+    """
+    The columns of a flat format. Without explicit fields, they are the fields of the first page, and fields which
+    first appear in later pages are not exported: a warning names them, pass `fields` to export them.
+    """
+
+    def __init__(self, columns: Optional[List[str]]):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.columns = columns
+        self._inferred = columns is None
+        self._dropped = set()
+
+    def update(self, objects: List[Dict]) -> List[str]:
+        """
+        :return: The columns to write the page with
+        """
+        if self.columns is None:
+            self.columns = list(dict.fromkeys(field for obj in objects for field in obj))
+        elif self._inferred:
+            dropped = {field for obj in objects for field in obj}.difference(self.columns, self._dropped)
+            if dropped:
+                self.logger.warning(f"Fields missing from the first page are not exported: {', '.join(sorted(dropped))}"
+                                    f", pass them as fields to export them")
+                self._dropped.update(dropped)
+        return self.columns
+
+
+class _FileWriter:
+    """Appends pages to a single file. The size of the file after every page is kept to resume from."""
+
+    def __init__(self, path: str, codec: JSONCodec, columns: Optional[List[str]], resume_size: Optional[int]):
+        self.path = path
+        self.codec = codec
+        self.columns = columns
+        if resume_size is None:
+            self.file = open(path, 'wb')
+        else:
+            # Drop whatever was written after the last completed page
+            self.file = open(path, 'r+b')
+            self.file.truncate(resume_size)
+            self.file.seek(resume_size)
+
+    def write_page(self, objects: List[Dict]):
+        self.file.write(self._encode_page(objects))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def _encode_page(self, objects: List[Dict]) -> bytes:
+        raise NotImplementedError()
+
+    def position(self) -> int:
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class NDJSONWriter(_FileWriter):
+    def _encode_page(self, objects: List[Dict]) -> bytes:
+        lines = []
+        for obj in objects:
+            encoded = self.codec.encode(project(obj, self.columns))
+            lines.append(encoded.encode('utf-8') if isinstance(encoded, str) else encoded)
+            lines.append(b'\n')
+        return b''.join(lines)
+
+
+class CSVWriter(_FileWriter):
+    def __init__(self, path: str, codec: JSONCodec, columns: Optional[List[str]], resume_size: Optional[int]):
+        super().__init__(path, codec, columns, resume_size)
+        self._columns = _FlatColumns(columns)
+
+    def _encode_page(self, objects: List[Dict]) -> bytes:
+        self.columns = self._columns.update(objects)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if self.file.tell() == 0:
+            writer.writerow(self.columns)
+        writer.writerows([_encode_nested(self.codec, obj.get(column)) for column in self.columns]
+                         for obj in objects)
+        return buffer.getvalue().encode('utf-8')
+
+
+class ParquetWriter:
+    """
+    Writes every page to a part file of its own in the output directory, named by the offset of the page, so
+    resuming simply rewrites the parts after the last completed page. All the parts have the same columns.
+    Requires pyarrow.
+    """
+
+    def __init__(self, path: str, codec: JSONCodec, columns: Optional[List[str]], resume_size: Optional[int]):
+        if pyarrow is None:
+            raise ImportError("Parquet export requires pyarrow, install it with "
+                              "`pip install centra_py_client[parquet]`")
+        self.path = path
+        self.codec = codec
+        self.columns = columns
+        self._columns = _FlatColumns(columns)
+        self.offset = resume_size or 0
+        os.makedirs(path, exist_ok=True)
+        if resume_size is None:
+            for name in os.listdir(path):
+                if name.startswith('part-') and name.endswith('.parquet'):
+                    os.remove(os.path.join(path, name))
+
+    def write_page(self, objects: List[Dict]):
+        self.columns = self._columns.update(objects)
+        table = pyarrow.table({column: [_encode_nested(self.codec, obj.get(column)) for obj in objects]
+                               for column in self.columns})
+        part_path = os.path.join(self.path, f"part-{self.offset:010d}.parquet")
+        pyarrow.parquet.write_table(table, part_path + '.tmp')
+        os.replace(part_path + '.tmp', part_path)
+        self.offset += len(objects)
+
+    def position(self) -> int:
+        return self.offset
+
+    def close(self):
+        pass
+
+
+_WRITERS = {
+    'ndjson': NDJSONWriter,
+    'csv': CSVWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def _read_state(state_path: str) -> Optional[Dict]:
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_state(state_path: str, state: Dict):
+    with open(state_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(state_path + '.tmp', state_path)
+
+
+def export(client: CentraClient, resource: str, path: str, format: str = 'ndjson',
+           fields: Optional[Sequence[str]] = None, page_size: int = DEFAULT_PAGE_SIZE, resume: bool = False,
+           codec: Optional[JSONCodec] = None, **filt) -> ExportResult:
+    """
+    Stream all the objects of a resource to a file, one page at a time: the next page is fetched while the current
+    one is written, and at most two pages are held in memory.
+    After every page, the progress is saved next to the output (in path + ".state.json"), so an interrupted export can
+    be resumed from the last completed page. The state file is removed once the export completes.
+    :param resource: One of EXPORT_ENDPOINTS, e.g. "assets"
+    :param path: The output file, or directory for parquet
+    :param format: One of EXPORT_FORMATS
+    :param fields: The top-level fields to export, defaults to all of them. Flat formats (csv and parquet) have a
+                   fixed set of columns, which defaults to the fields of the first page: fields which first appear in
+                   later pages are not exported, with a warning. Pass the fields to make sure they are exported.
+    :param resume: Whether to continue an interrupted export of the same resource, filter and format
+    :param codec: Encodes the NDJSON lines and the nested values of flat formats, defaults to the session's codec
+    :param filt: Filters passed as query parameters to the resource API, e.g. status="on"
+    """
+    logger = logging.getLogger(__name__)
+    if resource not in EXPORT_ENDPOINTS:
+        raise ValueError(f"Unknown resource {resource}, expected one of {', '.join(EXPORT_ENDPOINTS)}")
+    if format not in _WRITERS:
+        raise ValueError(f"Unknown format {format}, expected one of {', '.join(EXPORT_FORMATS)}")
+    if codec is None:
+        codec = client.centra_session.json_codec
+    columns = list(fields) if fields is not None else None
+
+    state_path = path.rstrip(os.sep) + STATE_FILE_SUFFIX
+    state = {'resource': resource, 'format': format, 'filter': {key: str(value) for key, value in filt.items()},
+             'fields': columns, 'columns': columns, 'offset': 0, 'position': None, 'rows': 0}
+    saved_state = _read_state(state_path) if resume else None
+    if saved_state is not None and all(saved_state.get(key) == state[key]
+                                       for key in ('resource', 'format', 'filter', 'fields')):
+        state = saved_state
+        logger.info(f"Resuming the export of {resource} to {path} from offset {state['offset']}")
+    elif saved_state is not None:
+        logger.warning(f"Ignoring the state of a different export in {state_path}")
+
+    resumed_from = state['offset']
+    writer = _WRITERS[format](path, codec, state['columns'], state['position'])
+    pages = 0
+    try:
+        for offset, objects in client._iter_pages(EXPORT_ENDPOINTS[resource], page_size=page_size,
+                                                  start_offset=resumed_from,
+                                                  **client._with_fields_param(filt, fields)):
+            if not objects:
+                continue
+            writer.write_page(objects)
+            pages += 1
+            state.update(offset=offset + len(objects), position=writer.position(), rows=state['rows'] + len(objects),
+                         columns=writer.columns)
+            _write_state(state_path, state)
+            logger.debug(f"Exported {state['rows']} {resource}")
+    finally:
+        writer.close()
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    logger.info(f"Exported {state['rows']} {resource} to {path}")
+    return ExportResult(path, state['rows'], pages, resumed_from)
@@ -0,0 +1,222 @@
+import logging
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+from centra_py_client.exceptions import ManagementAPIError, ManagementAPIUnavailableError
+
+DEFAULT_FAILURE_THRESHOLD = 5  # consecutive failures
+DEFAULT_RESET_TIMEOUT = 30  # seconds
+DEFAULT_HEALTH_FRESHNESS = 10  # seconds
+DEFAULT_PROBE_TIMEOUT = 5  # seconds
+DEFAULT_PROBE_ENDPOINT = 'system-notifications'
+DEFAULT_PROBE_PARAMS = {'limit': 1}
+UNAVAILABLE_HTTP_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while the management server is known to be down, instead of letting every caller wait for
+    its own timeout. Pass it to CentraSession(circuit_breaker=...).
+
+    After failure_threshold consecutive failures (connection errors, timeouts and 5xx responses) the circuit opens,
+    and requests raise ManagementAPIUnavailableError without being sent. After reset_timeout seconds a single trial
+    request is let through (half-open): the circuit closes if it succeeds, and opens again if it fails.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        if failure_threshold < 1:
+            raise ValueError("The failure threshold must be at least 1")
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return CLOSED
+            if self._trial_in_flight or time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return OPEN
+
+    def check(self):
+        """
+        Call before sending a request; every request let through must be followed by a call to record or release.
+        :raise ManagementAPIUnavailableError: If the circuit is open
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            retry_after = self._opened_at + self.reset_timeout - time.monotonic()
+            if retry_after <= 0 and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+        raise ManagementAPIUnavailableError(
+            f"The management server is unavailable after {self.consecutive_failures} consecutive failures",
+            retry_after=max(0.0, retry_after))
+
+    def record(self, failed: bool):
+        """
+        :param failed: Whether the request failed in a way which suggests the server is down
+        """
+        with self._lock:
+            self._trial_in_flight = False
+            if not failed:
+                if self._opened_at is not None:
+                    self.logger.info("The management server is available again, closing the circuit")
+                self.consecutive_failures = 0
+                self._opened_at = None
+                return
+            self.consecutive_failures += 1
+            if self._opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    self.logger.warning(f"Opening the circuit after {self.consecutive_failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """
+        Call instead of record when a request failed for a reason which says nothing about the server (e.g. an
+        unreadable request body), so it counts neither as a failure nor as a success.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def reset(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+
+class HealthStatus(NamedTuple):
+    healthy: bool
+    checked_at: float  # time.monotonic() of the probe
+    latency: Optional[float]  # seconds, None if the probe was not sent
+    error: Optional[Exception]
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.checked_at
+
+
+class HealthMonitor:
+    """
+    Tells whether the management server is reachable and answering the API, with a cheap probe whose result is
+    reused for `freshness` seconds, so health checks from many components cost at most one request per window:
+
+        monitor = HealthMonitor(session, freshness=10, heartbeat_interval=5).start()
+        if monitor.is_healthy():
+            ...
+
+    The optional heartbeat probes in the background, keeping the status fresh (checks never wait for a probe) and
+    the pooled connection warm.
+    """
+
+    def __init__(self, centra_session, freshness: float = DEFAULT_HEALTH_FRESHNESS,
+                 heartbeat_interval: Optional[float] = None, probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+                 probe_endpoint: str = DEFAULT_PROBE_ENDPOINT, probe_params: Optional[Dict] = None):
+        """
+        :param centra_session: The CentraSession to probe. Probes go through its circuit breaker, if it has one.
+        :param freshness: Seconds during which a probe result is reused
+        :param heartbeat_interval: Seconds between background probes, once `start` is called. Defaults to half the
+                                   freshness window.
+        :param probe_timeout: Seconds after which a probe fails
+        :param probe_endpoint: A cheap GET endpoint, relative to the API path
+        :param probe_params: The query parameters of the probe, defaults to requesting a single item
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.centra_session = centra_session
+        self.freshness = freshness
+        self.heartbeat_interval = heartbeat_interval if heartbeat_interval is not None else freshness / 2
+        self.probe_timeout = probe_timeout
+        self.probe_endpoint = probe_endpoint
+        self.probe_params = dict(DEFAULT_PROBE_PARAMS if probe_params is None else probe_params)
+        self.status: Optional[HealthStatus] = None
+        self._probe_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def probe(self) -> HealthStatus:
+        """
+        Probe the management server now.
+        """
+        start = time.monotonic()
+        latency, error = None, None
+        try:
+            # Uncached, so a cached or coalesced response does not pass for a live server
+            self.centra_session.uncached_query(self.centra_session.urljoin_api(self.probe_endpoint),
+                                               params=self.probe_params, return_json=False,
+                                               timeout=self.probe_timeout)
+            latency = time.monotonic() - start
+        except ManagementAPIError as e:
+            if not isinstance(e, ManagementAPIUnavailableError):
+                latency = time.monotonic() - start
+            error = e
+        except Exception as e:  # an unexpected failure must not leave a stale healthy status behind
+            self.logger.warning(f"Probe failed unexpectedly: {e!r}")
+            error = e
+        status = HealthStatus(error is None, time.monotonic(), latency, error)
+        if self.status is not None and self.status.healthy != status.healthy:
+            self.logger.info(f"The management server is {'healthy' if status.healthy else 'unhealthy'}: "
+                             f"{error or 'probe succeeded'}")
+        self.status = status
+        return status
+
+    def get_status(self, max_age: Optional[float] = None) -> HealthStatus:
+        """
+        :param max_age: The maximal age in seconds of a reused probe result, defaults to the freshness window
+        :return: The latest probe result, probing first if it is too old. Concurrent callers share a single probe.
+        """
+        max_age = self.freshness if max_age is None else max_age
+        status = self.status
+        if status is not None and status.age <= max_age:
+            return status
+        with self._probe_lock:
+            status = self.status
+            if status is not None and status.age <= max_age:  # probed by another thread meanwhile
+                return status
+            return self.probe()
+
+    def is_healthy(self, max_age: Optional[float] = None) -> bool:
+        return self.get_status(max_age).healthy
+
+    def start(self):
+        """
+        Probe every heartbeat_interval seconds in a background thread.
+        """
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                with self._probe_lock:
+                    self.probe()
+            except Exception as e:  # keep the heartbeat alive, and the status from freezing
+                self.logger.warning(f"Heartbeat failed: {e!r}")
+                self.status = HealthStatus(False, time.monotonic(), None, e)
+            self._stopped.wait(self.heartbeat_interval)
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_LABEL_CATALOG_TTL = 300  # seconds
+LABELS_ENDPOINT = 'visibility/labels'
+
+
+class LabelCatalog:
+    """
+    An in-memory index of all the labels in Centra, by id, key, value and name ("key: value").
+    The catalog is loaded with a single paginated listing and reloaded once it is older than its TTL. Labels created
+    or deleted through the owning CentraClient are applied to the catalog as they happen, so lookups never go stale
+    because of our own writes.
+    """
+
+    def __init__(self, client, ttl: float = DEFAULT_LABEL_CATALOG_TTL, page_size: Optional[int] = None):
+        """
+        :param client: The CentraClient used to list the labels
+        :param ttl: Seconds after which the catalog is reloaded
+        :param page_size: The number of labels to request per page
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.client = client
+        self.ttl = ttl
+        self.page_size = page_size
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._by_id = {}
+        self._ids_by_key = {}
+        self._ids_by_value = {}
+        self._ids_by_name = {}
+
+    def refresh(self):
+        """
+        Reload all the labels from Centra.
+        """
+        page_kwargs = {} if self.page_size is None else {'page_size': self.page_size}
+        labels = [label
+                  for _, page in self.client._iter_pages(LABELS_ENDPOINT, **page_kwargs)
+                  for label in page]
+        with self._lock:
+            self._by_id.clear()
+            self._ids_by_key.clear()
+            self._ids_by_value.clear()
+            self._ids_by_name.clear()
+            for label in labels:
+                self._index(label)
+            self._loaded_at = time.monotonic()
+        self.logger.debug(f"Loaded {len(labels)} labels")
+
+    def invalidate(self):
+        """
+        Reload the catalog on the next lookup.
+        """
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_fresh(self):
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+                self.refresh()
+
+    def _index(self, label: Dict):
+        label_id = label['id']
+        self._by_id[label_id] = label
+        self._ids_by_key.setdefault(label['key'], set()).add(label_id)
+        self._ids_by_value.setdefault(label['value'], set()).add(label_id)
+        self._ids_by_name.setdefault(self._name(label), set()).add(label_id)
+
+    @staticmethod
+    def _name(label: Dict) -> str:
+        return label.get('name') or f"{label['key']}: {label['value']}"
+
+    def add(self, label: Dict):
+        """
+        Add a label (or update it) without reloading the catalog.
+        :param label: A label object with at least `id`, `key` and `value`
+        """
+        with self._lock:
+            self.remove(label['id'])
+            self._index(label)
+
+    def remove(self, label_id: str):
+        """
+        Remove a label without reloading the catalog.
+        """
+        with self._lock:
+            label = self._by_id.pop(label_id, None)
+            if label is None:
+                return
+            for index, index_key in ((self._ids_by_key, label['key']),
+                                     (self._ids_by_value, label['value']),
+                                     (self._ids_by_name, self._name(label))):
+                index[index_key].discard(label_id)
+                if not index[index_key]:
+                    del index[index_key]
+
+    def get(self, label_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._ensure_fresh()
+            return self._by_id.get(label_id)
+
+    def find(self, label_key: Optional[str] = None, label_value: Optional[str] = None) -> List[Dict]:
+        """
+        :return: The labels matching both the key and the value, where None matches anything
+        """
+        with self._lock:
+            self._ensure_fresh()
+            label_ids = None
+            for index, index_key in ((self._ids_by_key, label_key), (self._ids_by_value, label_value)):
+                if index_key is not None:
+                    matching_ids = index.get(index_key, set())
+                    label_ids = matching_ids if label_ids is None else label_ids & matching_ids
+            if label_ids is None:
+                return list(self._by_id.values())
+            return [self._by_id[label_id] for label_id in label_ids]
+
+    def find_by_name(self, label_name: str) -> List[Dict]:
+        """
+        :param label_name: The label name, e.g. "Environment: Production"
+        """
+        with self._lock:
+            self._ensure_fresh()
+            return [self._by_id[label_id] for label_id in self._ids_by_name.get(label_name, ())]
+
+    def get_labels_ids(self, label_key: str, label_value: str) -> List[str]:
+        return [label['id'] for label in self.find(label_key, label_value)]
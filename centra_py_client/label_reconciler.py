@@ -0,0 +1,172 @@
+import logging
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from centra_py_client.asset_inventory import get_asset_id
+from centra_py_client.centra_py_client import DEFAULT_LABEL_CHUNK_SIZE, DEFAULT_PAGE_SIZE, BulkLabelResult
+
+LabelKeyValue = Tuple[str, str]
+
+
+def get_label_key_value(label: Dict) -> LabelKeyValue:
+    if 'key' in label and 'value' in label:
+        return label['key'], label['value']
+    key, value = label['name'].split(':', 1)
+    return key.strip(), value.strip()
+
+
+def _count_chunks(labels: Mapping[LabelKeyValue, List[str]], chunk_size: int) -> int:
+    return sum(-(-len(asset_ids) // chunk_size) for asset_ids in labels.values())
+
+
+class ReconciliationPlan(NamedTuple):
+    """The label changes needed to bring the assets to their desired labels, grouped per label."""
+    additions: Dict[LabelKeyValue, List[str]]  # label -> the ids of the assets to add it to
+    removals: Dict[LabelKeyValue, List[str]]  # label -> the ids of the assets to remove it from
+    unchanged_assets: int  # assets which already have their desired labels
+    missing_assets: List[str]  # desired assets which do not exist in Centra, and are skipped
+    chunk_size: int
+
+    @property
+    def call_count(self) -> int:
+        """
+        The number of requests executing the plan takes.
+        """
+        return _count_chunks(self.additions, self.chunk_size) + _count_chunks(self.removals, self.chunk_size)
+
+    def __bool__(self):
+        return bool(self.additions or self.removals)
+
+    def summary(self) -> str:
+        lines = [f"{self.call_count} requests: {len(self.additions)} labels to add, {len(self.removals)} labels to "
+                 f"remove, {self.unchanged_assets} assets unchanged, {len(self.missing_assets)} assets missing"]
+        for action, labels in (('add', self.additions), ('remove', self.removals)):
+            for (key, value), asset_ids in sorted(labels.items()):
+                lines.append(f"  {action} {key}: {value} ({len(asset_ids)} assets)")
+        return '\n'.join(lines)
+
+
+class ReconciliationResult(NamedTuple):
+    plan: ReconciliationPlan
+    added: Optional[BulkLabelResult]  # None for a dry run
+    removed: Optional[BulkLabelResult]  # None for a dry run
+
+    @property
+    def ok(self) -> bool:
+        return not any(result is not None and result.failed_chunks for result in (self.added, self.removed))
+
+
+class LabelReconciler:
+    """
+    Brings assets to a desired set of labels with as few requests as possible: the current labels of the desired
+    assets are fetched in batches of ids, and only the labels which differ are added or removed, in per-label chunks
+    sent concurrently.
+
+        reconciler = LabelReconciler(client, managed_keys={"App", "Owner"})
+        print(reconciler.reconcile(desired, dry_run=True).plan.summary())
+        result = reconciler.reconcile(desired)
+
+    An asset has a single label per key: adding a label replaces the label of the asset with the same key, so changing
+    the value of a key takes a single addition.
+    """
+
+    def __init__(self, client, managed_keys: Optional[Iterable[str]] = None,
+                 chunk_size: int = DEFAULT_LABEL_CHUNK_SIZE, page_size: int = DEFAULT_PAGE_SIZE,
+                 max_workers: Optional[int] = None):
+        """
+        :param client: The CentraClient of the assets
+        :param managed_keys: The label keys owned by the desired state: labels with these keys which are not desired are
+                             removed, while labels with other keys are left alone. Defaults to the keys which appear in
+                             the desired state.
+        :param chunk_size: The maximal number of assets labeled in a single request
+        :param page_size: The number of assets to request per page when fetching the current labels
+        :param max_workers: The maximal number of concurrent requests, defaults to the session's connection pool size
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.client = client
+        self.managed_keys = None if managed_keys is None else set(managed_keys)
+        self.chunk_size = chunk_size
+        self.page_size = page_size
+        self.max_workers = max_workers
+
+    def get_current_labels(self, asset_ids: Optional[Iterable[str]] = None, **filt) -> Dict[str, Set[LabelKeyValue]]:
+        """
+        :param asset_ids: The assets whose labels to fetch, in batches of ids. If not given, all the assets matching
+                          the filters are listed.
+        :param filt: Filters selecting the assets to list, when asset_ids is not given
+        :return: The labels of every asset, by asset id
+        """
+        fields = ['id', '_id', 'labels']
+        if asset_ids is not None:
+            assets = self.client.get_assets_by_ids(asset_ids, fields=fields, max_workers=self.max_workers).values()
+        else:
+            assets = self.client.iter_assets(page_size=self.page_size, fields=fields, **filt)
+        return {get_asset_id(asset): {get_label_key_value(label) for label in asset.get('labels') or []}
+                for asset in assets}
+
+    def plan(self, desired: Mapping[str, Iterable[LabelKeyValue]],
+             current: Optional[Mapping[str, Iterable[LabelKeyValue]]] = None) -> ReconciliationPlan:
+        """
+        :param desired: The (key, value) labels every asset should have, by asset id. Assets which are not in it are
+                        left alone.
+        :param current: The current labels of the assets, fetched from Centra if not given
+        :raise ValueError: If an asset is given more than one value for the same key
+        """
+        desired_by_key = {}
+        for asset_id, labels in desired.items():
+            values = desired_by_key[asset_id] = {}
+            for key, value in labels:
+                if values.setdefault(key, value) != value:
+                    raise ValueError(f"Asset {asset_id} cannot have both {key}: {values[key]} and {key}: {value}")
+        managed_keys = self.managed_keys
+        if managed_keys is None:
+            managed_keys = {key for values in desired_by_key.values() for key in values}
+        if current is None:
+            current = self.get_current_labels(desired)
+
+        additions, removals, missing_assets = {}, {}, []
+        unchanged_assets = 0
+        for asset_id, values in desired_by_key.items():
+            if asset_id not in current:
+                missing_assets.append(asset_id)
+                continue
+            current_values = {}
+            for key, value in current[asset_id]:
+                if key in managed_keys:
+                    current_values.setdefault(key, set()).add(value)
+            changed = False
+            for key in managed_keys:
+                value, existing = values.get(key), current_values.get(key, set())
+                if value is not None and existing != {value}:
+                    # Replaces all the existing values of the key
+                    additions.setdefault((key, value), []).append(asset_id)
+                    changed = True
+                elif value is None:
+                    for existing_value in existing:
+                        removals.setdefault((key, existing_value), []).append(asset_id)
+                        changed = True
+            unchanged_assets += not changed
+
+        if missing_assets:
+            self.logger.warning(f"{len(missing_assets)} assets were not found and are skipped")
+        return ReconciliationPlan(additions, removals, unchanged_assets, missing_assets, self.chunk_size)
+
+    def apply(self, plan: ReconciliationPlan) -> ReconciliationResult:
+        """
+        Execute a plan. The chunks which failed are in the returned BulkLabelResults.
+        """
+        self.logger.debug(f"Reconciling labels with {plan.call_count} requests")
+        added = self.client.bulk_add_labels_to_assets(plan.additions, chunk_size=plan.chunk_size,
+                                                      max_workers=self.max_workers)
+        removed = self.client.bulk_remove_labels_from_assets(plan.removals, chunk_size=plan.chunk_size,
+                                                             max_workers=self.max_workers)
+        return ReconciliationResult(plan, added, removed)
+
+    def reconcile(self, desired: Mapping[str, Iterable[LabelKeyValue]], dry_run: bool = False) -> ReconciliationResult:
+        """
+        Plan the changes needed to reach the desired labels, and execute them unless dry_run is set.
+        See plan for the parameters.
+        """
+        plan = self.plan(desired)
+        if dry_run:
+            return ReconciliationResult(plan, None, None)
+        return self.apply(plan)
@@ -0,0 +1,214 @@
+import bisect
+import functools
+import re
+import threading
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)  # seconds
+_ENDPOINT_TEMPLATES = (
+    (re.compile(r'^assets/labels/[^/]+/[^/]+/?$'), 'assets/labels/{key}/{value}'),
+    (re.compile(r'^visibility/labels/[^/]+/?$'), 'visibility/labels/{id}'),
+)
+_ID_PATH_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F-]{16,})$')
+
+
+class TransferSize(NamedTuple):
+    """The bytes of a single request and its response, before and after compression."""
+    request_bytes: int
+    request_wire_bytes: int
+    response_bytes: int
+    response_wire_bytes: int
+
+
+class TransferStats:
+    """Thread-safe totals of the bytes sent and received by a session."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.request_bytes = 0
+        self.request_wire_bytes = 0
+        self.response_bytes = 0
+        self.response_wire_bytes = 0
+
+    def add(self, transfer_size: TransferSize):
+        with self._lock:
+            self.requests += 1
+            self.request_bytes += transfer_size.request_bytes
+            self.request_wire_bytes += transfer_size.request_wire_bytes
+            self.response_bytes += transfer_size.response_bytes
+            self.response_wire_bytes += transfer_size.response_wire_bytes
+
+    @property
+    def saved_bytes(self) -> int:
+        """
+        The number of bytes compression saved from being sent over the network.
+        """
+        return self.request_bytes + self.response_bytes - self.request_wire_bytes - self.response_wire_bytes
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(requests={self.requests}, "
+                f"request_bytes={self.request_bytes}, request_wire_bytes={self.request_wire_bytes}, "
+                f"response_bytes={self.response_bytes}, response_wire_bytes={self.response_wire_bytes})")
+
+
+class RequestEvent(NamedTuple):
+    """Describes a request sent by CentraSession, including all its retries."""
+    method: str
+    endpoint: str  # the endpoint template, e.g. "visibility/labels/{id}"
+    uri: str
+    status_code: Optional[int]  # None if no response was received
+    latency: float  # seconds, including retries and re-authentication
+    request_bytes: int  # on the wire, summed over all the attempts
+    response_bytes: int  # on the wire, summed over all the attempts
+    retries: int
+    auth_refreshes: int
+    error: Optional[Exception]
+
+
+@functools.lru_cache(maxsize=4096)
+def endpoint_template(uri: str, base_api_path: str = '') -> str:
+    """
+    Group URIs by endpoint, replacing the ids and names in their paths with placeholders.
+    :param uri: A request URI, e.g. "/api/v3.0/visibility/labels/1234"
+    :param base_api_path: The prefix to remove from the URI path, e.g. "/api/v3.0/"
+    """
+    path = urlsplit(uri).path
+    if base_api_path and path.startswith(base_api_path):
+        path = path[len(base_api_path):]
+    for pattern, template in _ENDPOINT_TEMPLATES:
+        if pattern.match(path):
+            return template
+    return '/'.join('{id}' if _ID_PATH_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+class EndpointMetrics:
+    """The aggregated metrics of a single endpoint."""
+
+    def __init__(self, latency_buckets: Sequence[float]):
+        self.latency_buckets = latency_buckets
+        self.bucket_counts = [0] * (len(latency_buckets) + 1)  # the last bucket counts latencies above all buckets
+        self.count = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+        self.auth_refreshes = 0
+
+    def record(self, event: RequestEvent):
+        self.count += 1
+        self.errors += event.error is not None
+        self.latency_sum += event.latency
+        self.latency_max = max(self.latency_max, event.latency)
+        self.bucket_counts[bisect.bisect_left(self.latency_buckets, event.latency)] += 1
+        self.request_bytes += event.request_bytes
+        self.response_bytes += event.response_bytes
+        self.retries += event.retries
+        self.auth_refreshes += event.auth_refreshes
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.count if self.count else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.latency_sum / self.count if self.count else 0.0
+
+    def latency_percentile(self, percentile: float) -> float:
+        """
+        :param percentile: e.g. 0.99
+        :return: The upper bound of the histogram bucket holding the percentile (the maximal latency if it is
+                 above all the buckets)
+        """
+        rank = percentile * self.count
+        seen = 0
+        for bucket_index, bucket_count in enumerate(self.bucket_counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return self.latency_buckets[bucket_index] if bucket_index < len(self.latency_buckets) \
+                    else self.latency_max
+        return 0.0
+
+
+class MetricsCollector:
+    """
+    A request observer keeping per-endpoint latency histograms, error rates and byte counts in memory:
+
+        metrics = MetricsCollector()
+        session.add_observer(metrics)
+        ...
+        print(metrics.report())
+    """
+
+    def __init__(self, latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.latency_buckets = tuple(sorted(latency_buckets))
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def __call__(self, event: RequestEvent):
+        with self._lock:
+            key = (event.method, event.endpoint)
+            if key not in self._endpoints:
+                self._endpoints[key] = EndpointMetrics(self.latency_buckets)
+            self._endpoints[key].record(event)
+
+    def snapshot(self) -> Dict[Tuple[str, str], EndpointMetrics]:
+        """
+        :return: The metrics of every (method, endpoint template) seen so far
+        """
+        with self._lock:
+            snapshot = {}
+            for key, metrics in self._endpoints.items():
+                copied = EndpointMetrics(self.latency_buckets)
+                copied.__dict__.update(metrics.__dict__, bucket_counts=list(metrics.bucket_counts))
+                snapshot[key] = copied
+            return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def report(self) -> str:
+        """
+        :return: A table of the endpoints, sorted by the total time spent on them
+        """
+        lines = [f"{'endpoint':<45}{'count':>8}{'errors':>8}{'total s':>10}{'mean ms':>10}{'p99 ms':>10}"]
+        for (method, endpoint), metrics in sorted(self.snapshot().items(), key=lambda item: -item[1].latency_sum):
+            lines.append(f"{method + ' ' + endpoint:<45}{metrics.count:>8}{metrics.errors:>8}"
+                         f"{metrics.latency_sum:>10.2f}{metrics.mean_latency * 1000:>10.1f}"
+                         f"{metrics.latency_percentile(0.99) * 1000:>10.1f}")
+        return '\n'.join(lines)
+
+
+class PrometheusObserver:
+    """A request observer exporting the requests as Prometheus metrics. Requires prometheus_client."""
+
+    def __init__(self, namespace: str = 'centra_client', registry=None,
+                 latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        try:
+            import prometheus_client
+        except ImportError:
+            raise ImportError("PrometheusObserver requires prometheus_client, install it with "
+                              "`pip install prometheus_client`") from None
+        registry_kwargs = {} if registry is None else {'registry': registry}
+        self.latency = prometheus_client.Histogram('request_duration_seconds', 'Centra API request latency',
+                                                   ['method', 'endpoint'], namespace=namespace,
+                                                   buckets=latency_buckets, **registry_kwargs)
+        self.requests = prometheus_client.Counter('requests_total', 'Centra API requests',
+                                                  ['method', 'endpoint', 'status'], namespace=namespace,
+                                                  **registry_kwargs)
+        self.transferred_bytes = prometheus_client.Counter('transferred_bytes_total', 'Centra API bytes on the wire',
+                                                           ['method', 'endpoint', 'direction'], namespace=namespace,
+                                                           **registry_kwargs)
+        self.retries = prometheus_client.Counter('retries_total', 'Centra API request retries',
+                                                 ['method', 'endpoint'], namespace=namespace, **registry_kwargs)
+
+    def __call__(self, event: RequestEvent):
+        self.latency.labels(event.method, event.endpoint).observe(event.latency)
+        self.requests.labels(event.method, event.endpoint, str(event.status_code or 'error')).inc()
+        self.transferred_bytes.labels(event.method, event.endpoint, 'sent').inc(event.request_bytes)
+        self.transferred_bytes.labels(event.method, event.endpoint, 'received').inc(event.response_bytes)
+        self.retries.labels(event.method, event.endpoint).inc(event.retries)
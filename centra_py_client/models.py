@@ -0,0 +1,99 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from centra_py_client.codec import JSONCodec, get_default_codec
+
+_default_codec = None
+
+
+def _get_codec(codec: Optional[JSONCodec]) -> JSONCodec:
+    global _default_codec
+    if codec is not None:
+        return codec
+    if _default_codec is None:
+        _default_codec = get_default_codec()
+    return _default_codec
+
+
+def _encode(codec: JSONCodec, obj) -> bytes:
+    encoded = codec.encode(obj)
+    return encoded.encode('utf-8') if isinstance(encoded, str) else encoded
+
+
+def project(obj: Dict, fields: Optional[Iterable[str]]) -> Dict:
+    """
+    :return: Only the given top-level fields of obj (or obj itself if fields is None)
+    """
+    if fields is None:
+        return obj
+    return {field: obj[field] for field in fields if field in obj}
+
+
+class _CompactObject:
+    """
+    A read-only API object which keeps its scalar top-level fields in slots and the rest of its fields as encoded
+    JSON, which is decoded on every access. This takes a fraction of the memory of the equivalent nested dicts.
+    Fields can be read as attributes or as items, e.g. `asset.name` or `asset["name"]`.
+    """
+    __slots__ = ('_codec', '_encoded')
+    _SLOT_FIELDS = ()
+
+    def __init__(self, obj: Dict, codec: Optional[JSONCodec] = None):
+        object.__setattr__(self, '_codec', _get_codec(codec))
+        for field in self._SLOT_FIELDS:
+            object.__setattr__(self, field, obj.get(field))
+        rest = {field: value for field, value in obj.items() if field not in self._SLOT_FIELDS}
+        object.__setattr__(self, '_encoded', _encode(self._codec, rest) if rest else None)
+
+    def _rest(self) -> Dict:
+        return {} if self._encoded is None else self._codec.decode(self._encoded)
+
+    def __getattr__(self, field: str) -> Any:
+        # Only called for fields which are not slots
+        if field.startswith('_'):
+            raise AttributeError(field)
+        try:
+            return self._rest()[field]
+        except KeyError:
+            raise AttributeError(field) from None
+
+    def __setattr__(self, field, value):
+        raise AttributeError(f"{self.__class__.__name__} is read-only")
+
+    def __getitem__(self, field: str) -> Any:
+        if field in self._SLOT_FIELDS:
+            return getattr(self, field)
+        return self._rest()[field]
+
+    def get(self, field: str, default=None) -> Any:
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict:
+        obj = {field: getattr(self, field) for field in self._SLOT_FIELDS}
+        obj.update(self._rest())
+        return obj
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(id={self.id!r}, name={self.name!r})"
+
+
+class Label(_CompactObject):
+    __slots__ = ('id', 'key', 'value', 'name')
+    _SLOT_FIELDS = __slots__
+
+
+class Asset(_CompactObject):
+    __slots__ = ('id', 'name', 'status', 'first_seen', 'last_seen')
+    _SLOT_FIELDS = __slots__
+
+    @property
+    def labels(self) -> List[Label]:
+        return [Label(label, self._codec) for label in self.get('labels') or []]
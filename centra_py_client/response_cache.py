@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, NamedTuple, Optional
+
+DEFAULT_RESPONSE_CACHE_TTLS = {  # seconds, by endpoint template
+    'system-notifications': 5,
+    'visibility/labels': 60,
+    'assets': 30,
+}
+DEFAULT_RESPONSE_CACHE_MAX_ENTRIES = 1024
+DEFAULT_RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# A mutating request invalidates the cached responses of its resource, and of the resources it changes indirectly
+# (e.g. labeling assets changes the labels listing, deleting a label changes the labels of assets)
+RELATED_RESOURCES = {
+    'assets': ('assets', 'visibility'),
+    'visibility': ('visibility', 'assets'),
+}
+
+
+def get_resource(endpoint: str) -> str:
+    """
+    :param endpoint: An endpoint template, e.g. "visibility/labels/{id}"
+    :return: The top-level resource of the endpoint, e.g. "visibility"
+    """
+    return endpoint.split('/', 1)[0]
+
+
+class CachedResponse(NamedTuple):
+    endpoint: str
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float  # time.monotonic()
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    @property
+    def revalidation_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    A thread-safe LRU cache of GET response bodies, used by CentraSession.json_query:
+
+        session = CentraSession("my.centra.address", "username", "password", response_cache=ResponseCache())
+
+    Responses are fresh for the TTL of their endpoint. Stale responses with an ETag or a Last-Modified header are
+    revalidated with a conditional request, and evicted otherwise. The cache keeps the raw bodies, so every caller
+    decodes its own copy.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 0,
+                 max_entries: int = DEFAULT_RESPONSE_CACHE_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_RESPONSE_CACHE_MAX_BYTES):
+        """
+        :param ttls: Seconds a response stays fresh, by endpoint template (see metrics.endpoint_template), defaults
+                     to DEFAULT_RESPONSE_CACHE_TTLS
+        :param default_ttl: The TTL of the endpoints missing from ttls, 0 to not cache them
+        :param max_entries: The maximal number of cached responses
+        :param max_bytes: The maximal total size of the cached response bodies
+        """
+        self.ttls = dict(DEFAULT_RESPONSE_CACHE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_ttl(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """
+        :return: The cached response, which may be stale, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.fresh:
+                self.hits += 1
+            elif entry.revalidation_headers:
+                self.revalidations += 1
+            else:
+                self.misses += 1
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, endpoint: str, content: bytes, headers) -> Optional[CachedResponse]:
+        """
+        Cache a response body, unless its endpoint has no TTL or it is too large.
+        :param headers: The response headers, for the ETag and Last-Modified validators
+        """
+        ttl = self.get_ttl(endpoint)
+        if ttl <= 0 or len(content) > self.max_bytes:
+            return None
+        entry = CachedResponse(endpoint, content, headers.get('ETag'), headers.get('Last-Modified'),
+                               time.monotonic() + ttl)
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = entry
+            self._size += len(content)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+        return entry
+
+    def refresh(self, key: Hashable, entry: CachedResponse) -> CachedResponse:
+        """
+        Restart the TTL of a response the server answered 304 Not Modified for.
+        """
+        refreshed = entry._replace(expires_at=time.monotonic() + self.get_ttl(entry.endpoint))
+        with self._lock:
+            if self._entries.get(key) is entry:
+                self._entries[key] = refreshed
+        return refreshed
+
+    def invalidate(self, endpoint: str):
+        """
+        Evict the responses affected by a mutating request to the given endpoint template.
+        """
+        resources = RELATED_RESOURCES.get(get_resource(endpoint), (get_resource(endpoint),))
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if get_resource(entry.endpoint) in resources]:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _pop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.content)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,175 @@
+import io
+import mimetypes
+import os
+import uuid
+from typing import Iterator, List, Mapping, Optional, Tuple, Union
+
+DEFAULT_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _remaining_size(file) -> Optional[int]:
+    """
+    :return: The number of bytes left to read from a file object, or None if it cannot be known without reading it
+    """
+    try:
+        return os.fstat(file.fileno()).st_size - file.tell()
+    except (AttributeError, OSError, ValueError):
+        pass
+    try:
+        position = file.tell()
+        end = file.seek(0, io.SEEK_END)
+        file.seek(position)
+        return end - position
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def iter_chunks(source, chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    :param source: Bytes, a binary file object or an iterable of bytes chunks
+    """
+    if isinstance(source, bytes):
+        yield source
+    elif hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from source
+
+
+class MultipartStream:
+    """
+    A multipart/form-data body which reads its file fields in chunks while it is sent, instead of building the whole
+    body in memory (as requests does for `files=`).
+    It is sent with a Content-Length when the sizes of all its fields are known (see SizedBody), and can be rewound for
+    a retry when all its file objects are seekable.
+    """
+
+    def __init__(self, fields: Mapping[str, Union[str, bytes, Tuple]], boundary: Optional[str] = None,
+                 chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE):
+        """
+        :param fields: Form fields by name. A value is a str or bytes, a binary file object, or a (filename, content)
+                       or (filename, content, content type) tuple whose content is bytes, a binary file object or an
+                       iterable of bytes chunks.
+        """
+        self.boundary = boundary or uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self._parts: List[Tuple[bytes, object]] = []
+        for name, value in fields.items():
+            if hasattr(value, 'read'):
+                value = (os.path.basename(getattr(value, 'name', name)), value)
+            if isinstance(value, tuple):
+                filename, content = value[0], value[1]
+                content_type = value[2] if len(value) > 2 else (mimetypes.guess_type(filename)[0]
+                                                                or 'application/octet-stream')
+                header = (f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                          f'filename="{filename}"\r\nContent-Type: {content_type}\r\n\r\n')
+            else:
+                content = value.encode('utf-8') if isinstance(value, str) else value
+                header = f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+            self._parts.append((header.encode('utf-8'), content))
+        self._trailer = f'--{self.boundary}--\r\n'.encode('utf-8')
+        self._file_positions = {}
+        for _, content in self._parts:
+            if isinstance(content, bytes):
+                continue
+            try:
+                self._file_positions[id(content)] = content.tell()
+            except (AttributeError, OSError):
+                # Iterables and unseekable files cannot be read again
+                self._file_positions = None
+                break
+        self._chunks = None
+        self._buffer = b''
+        self._position = 0
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    @property
+    def length(self) -> Optional[int]:
+        """
+        The size of the body, or None if it is unknown (e.g. when a field is a generator).
+        """
+        length = len(self._trailer)
+        for header, content in self._parts:
+            if isinstance(content, bytes):
+                size = len(content)
+            elif hasattr(content, 'read'):
+                size = _remaining_size(content)
+            else:
+                size = None
+            if size is None:
+                return None
+            length += len(header) + size + 2
+        return length
+
+    def __iter__(self) -> Iterator[bytes]:
+        for header, content in self._parts:
+            yield header
+            yield from iter_chunks(content, self.chunk_size)
+            yield b'\r\n'
+        yield self._trailer
+
+    def read(self, size: int = -1) -> bytes:
+        if self._chunks is None:
+            self._chunks = iter(self)
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        self._position += len(data)
+        return data
+
+    def tell(self) -> int:
+        if self._file_positions is None:
+            raise io.UnsupportedOperation("A field cannot be rewound")
+        return self._position
+
+    def seek(self, position: int, whence: int = io.SEEK_SET) -> int:
+        """
+        Only rewinding to the start is supported, to replay the body.
+        """
+        if self._file_positions is None or position != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("MultipartStream can only be rewound to its start")
+        for _, content in self._parts:
+            if hasattr(content, 'read'):
+                content.seek(self._file_positions[id(content)])
+        self._chunks = None
+        self._buffer = b''
+        self._position = 0
+        return 0
+
+
+class SizedBody:
+    """
+    A readable body of a known length, so that it is sent with a Content-Length rather than in chunks.
+    """
+
+    def __init__(self, body, length: int):
+        self.body = body
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter_chunks(self.body)
+
+    def read(self, size: int = -1) -> bytes:
+        return self.body.read(size)
+
+    def tell(self) -> int:
+        return self.body.tell()
+
+    def seek(self, position: int, whence: int = io.SEEK_SET) -> int:
+        return self.body.seek(position, whence)
@@ -0,0 +1,86 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket, limiting the rate of requests sent by a CentraSession.
+    Every request takes a token; tokens are refilled at `rate` per second, up to `burst` tokens.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        :param rate: The sustained number of requests per second
+        :param burst: The maximal number of requests which may be sent at once after an idle period, defaults to
+                      one second worth of requests
+        :raise ValueError: If the rate is not positive, or the burst is lower than a single request
+        """
+        if not rate > 0:
+            raise ValueError("The rate must be positive")
+        if burst is not None and not burst >= 1:
+            raise ValueError("The burst must be at least 1, or no request could ever be sent")
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, blocking until one is available.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the number of requests in flight, adapting the limit with AIMD (additive increase, multiplicative decrease):
+    every successful request raises the limit by `increase / limit`, so the limit grows by about `increase` per round
+    of requests, and every overloaded response (timeout, 429, 5xx) multiplies it by `decrease_factor`.
+    """
+
+    def __init__(self, initial_limit: float = 8, min_limit: float = 1, max_limit: float = 64,
+                 increase: float = 1, decrease_factor: float = 0.5):
+        if not 0 < min_limit <= initial_limit <= max_limit:
+            raise ValueError("The limits must satisfy 0 < min_limit <= initial_limit <= max_limit")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("The decrease factor must be between 0 and 1")
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Wait until a request may be sent under the current limit, and count it as in flight.
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, overloaded: bool):
+        """
+        Mark a request as done and adapt the limit.
+        :param overloaded: Whether the server signaled it is overloaded when handling the request
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self._condition.notify_all()
@@ -0,0 +1,122 @@
+import contextlib
+import json
+import logging
+import os
+import threading
+from typing import ContextManager, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - fcntl is not available on Windows
+    fcntl = None
+
+DEFAULT_TOKEN_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'centra_py_client', 'tokens.json')
+
+
+def get_token_cache_key(management_address: str, username: str) -> str:
+    return f"{username}@{management_address}"
+
+
+class TokenCache:
+    """
+    Stores JWTs between sessions, so new sessions (and processes) reuse a valid token instead of logging in.
+    Implement get and set (and lock, for stores shared between processes) to keep the tokens in a shared store.
+    """
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError()
+
+    def set(self, key: str, token: str):
+        raise NotImplementedError()
+
+    def lock(self, key: str) -> ContextManager:
+        """
+        :return: A context manager held while a session reads the cache, authenticates and stores the new token,
+                 so sessions starting together log in only once
+        """
+        return contextlib.nullcontext()
+
+
+class MemoryTokenCache(TokenCache):
+    """Shares tokens between the sessions of a single process."""
+
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.RLock()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._tokens.get(key)
+
+    def set(self, key: str, token: str):
+        self._tokens[key] = token
+
+    def lock(self, key: str) -> ContextManager:
+        return self._lock
+
+
+class FileTokenCache(TokenCache):
+    """
+    Shares tokens between processes through a JSON file, readable only by its owner.
+    Writers are serialized with an advisory lock on a sibling ".lock" file (where fcntl is available).
+    """
+
+    def __init__(self, path: str = DEFAULT_TOKEN_CACHE_PATH):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                tokens = json.load(f)
+            return tokens if isinstance(tokens, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            self.logger.warning(f"Ignoring the corrupt token cache {self.path}")
+            return {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self._read().get(key)
+
+    def set(self, key: str, token: str):
+        with self.lock(key):
+            tokens = self._read()
+            tokens[key] = token
+            self._make_directory()
+            # Write to a temporary file and rename it, so readers never see a partially written file
+            temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(tokens, f)
+            os.replace(temp_path, self.path)
+
+    @contextlib.contextmanager
+    def lock(self, key: str):
+        with self._thread_lock:
+            # The file lock is taken once, nested calls (e.g. set while locked) only count the depth
+            self._lock_depth += 1
+            try:
+                if self._lock_depth > 1 or fcntl is None:
+                    yield
+                else:
+                    with self._file_lock():
+                        yield
+            finally:
+                self._lock_depth -= 1
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        self._make_directory()
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # closing the file releases the lock
+
+    def _make_directory(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
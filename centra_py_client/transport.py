@@ -0,0 +1,159 @@
+import json
+import socket
+from typing import Dict, Iterator, Mapping, Optional
+from urllib.parse import urlencode
+
+from centra_py_client.exceptions import ManagementAPIConnectionError, ManagementAPIError
+
+import requests
+from requests.auth import AuthBase
+import urllib3
+from urllib3._collections import HTTPHeaderDict  # not exported at the top level before urllib3 2
+from urllib3.connection import HTTPConnection
+
+KEEPALIVE_SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+DEFAULT_HEADERS = {  # the headers requests sends by default
+    'User-Agent': requests.utils.default_user_agent(),
+    'Accept-Encoding': 'gzip, deflate',
+    'Accept': '*/*',
+}
+
+
+class JWTAuth(AuthBase):
+    """Attaches JWT Authentication to the given Request object."""
+
+    def __init__(self, token):
+        # setup any auth-related data here
+        if token is None:
+            raise ManagementAPIError("REST Token not set!")
+        self.token = token
+
+    def __call__(self, r):
+        # modify and return the request
+        r.headers['Authorization'] = 'Bearer ' + self.token
+        return r
+
+
+class Transport:
+    """
+    Sends the HTTP requests of a CentraSession. Responses expose the parts of requests.Response used by the
+    session: status_code, headers, content, json(), iter_content(chunk_size), close() and raw.tell().
+    """
+
+    def request(self, method: str, url: str, *, data=None, headers: Optional[Mapping[str, str]] = None,
+                params: Optional[Mapping] = None, token: Optional[str] = None, files=None, stream: bool = False,
+                **kwargs):
+        """
+        :param token: The JWT to authenticate the request with, if any
+        :param stream: Whether to return as soon as the headers are read, leaving the body to iter_content
+        :raise ManagementAPIConnectionError: If the request could not be sent or its response could not be read
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """Sends requests through a requests.Session."""
+
+    def __init__(self, session: requests.Session):
+        self.session = session
+
+    def request(self, method: str, url: str, *, data=None, headers=None, params=None, token=None, files=None,
+                **kwargs):
+        # The session method is looked up on every request, so it may be replaced (e.g. by tests or profilers)
+        method_func = getattr(self.session, method.lower())
+        try:
+            return method_func(url, data=data, headers=headers, params=params,
+                               auth=JWTAuth(token) if token is not None else None, files=files, **kwargs)
+        except requests.exceptions.RequestException as e:
+            raise ManagementAPIConnectionError(str(e))
+
+    def close(self):
+        self.session.close()
+
+
+class _Urllib3Response:
+    """Adapts a urllib3 response to the interface of requests.Response used by CentraSession."""
+
+    def __init__(self, response: urllib3.HTTPResponse, stream: bool):
+        self.raw = response
+        self.status_code = response.status
+        self.headers = response.headers
+        self._content = None if stream else response.data
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            self._content = self.raw.read()
+        return self._content
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        try:
+            yield from self.raw.stream(chunk_size)
+        except urllib3.exceptions.HTTPError as e:
+            raise ManagementAPIConnectionError(str(e))
+
+    def close(self):
+        # A connection is only reusable once its response was read to the end. The rest of an abandoned stream is
+        # not read (it may be large), its connection is closed instead, as requests does.
+        if not self.raw.closed:
+            self.raw.close()
+        self.raw.release_conn()
+
+
+class Urllib3Transport(Transport):
+    """
+    Sends requests directly through a urllib3 connection pool, skipping the request preparation, hooks and adapters
+    of requests, which make up most of its per-request overhead.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 keep_alive: bool = True, verify_certificate: bool = True,
+                 headers: Optional[Dict[str, str]] = None):
+        """
+        :param headers: Headers to send with every request, in addition to the defaults of requests
+        """
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self.pool_manager = urllib3.PoolManager(num_pools=pool_connections, maxsize=pool_maxsize, block=pool_block,
+                                                cert_reqs='CERT_REQUIRED' if verify_certificate else 'CERT_NONE',
+                                                socket_options=KEEPALIVE_SOCKET_OPTIONS if keep_alive else None,
+                                                retries=False)
+
+    def request(self, method: str, url: str, *, data=None, headers=None, params=None, token=None, files=None,
+                stream: bool = False, **kwargs):
+        request_headers = HTTPHeaderDict(self.headers)
+        request_headers.update(headers or {})
+        if token is not None:
+            request_headers['Authorization'] = 'Bearer ' + token
+        if params:
+            query = urlencode([(key, value) for key, value in params.items() if value is not None], doseq=True)
+            if query:
+                url = f"{url}{'&' if '?' in url else '?'}{query}"
+        if files is not None:
+            data, request_headers['Content-Type'] = urllib3.encode_multipart_formdata(self._read_files(files))
+        try:
+            response = self.pool_manager.request(method, url, body=data, headers=request_headers,
+                                                 preload_content=not stream, redirect=False, **kwargs)
+        except urllib3.exceptions.HTTPError as e:
+            raise ManagementAPIConnectionError(str(e))
+        return _Urllib3Response(response, stream)
+
+    @staticmethod
+    def _read_files(files: Mapping) -> Dict:
+        # requests takes file objects and (filename, file object[, content type]) tuples, urllib3 takes the contents
+        fields = {}
+        for name, value in files.items():
+            value = value if isinstance(value, tuple) else (getattr(value, 'name', name), value)
+            filename, content = value[0], value[1]
+            if hasattr(content, 'read'):
+                content = content.read()
+            fields[name] = (filename, content) + tuple(value[2:3])
+        return fields
+
+    def close(self):
+        self.pool_manager.clear()
@@ -0,0 +1,207 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from centra_py_client.asset_inventory import fingerprint, get_asset_id
+
+DEFAULT_MIN_POLL_INTERVAL = 5  # seconds
+DEFAULT_MAX_POLL_INTERVAL = 300  # seconds
+DEFAULT_FULL_POLL_EVERY = 10  # polls, when polling for changes only
+POLL_INTERVAL_BACKOFF = 1.5  # the interval grows by this factor after every poll without changes
+NOTIFICATION_ITEMS_KEY = 'items'
+
+
+class ChangeSet(NamedTuple):
+    """The changes found by a single poll."""
+    added: List[Dict]
+    changed: List[Dict]
+    removed: List[str]  # ids
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+
+class Watcher:
+    """
+    Polls a collection of API objects and reports the objects added, changed and removed since the previous poll.
+    Only a compact fingerprint of every object is kept between polls.
+
+    Iterate over `changes()`, or register callbacks with `subscribe` and `start` a background poller feeding them.
+    The poll interval halves (down to min_interval) after every poll finding changes, and grows (up to max_interval)
+    after every poll which does not.
+    """
+
+    def __init__(self, fetch: Callable[[Optional[int]], Iterable[Dict]], get_id: Callable[[Dict], str],
+                 supports_delta: bool = False, full_poll_every: int = DEFAULT_FULL_POLL_EVERY,
+                 min_interval: float = DEFAULT_MIN_POLL_INTERVAL, max_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+                 report_initial: bool = False):
+        """
+        :param fetch: Called with the unix time in milliseconds of the previous poll (or None for a full poll),
+                      returns the objects changed since then
+        :param get_id: Returns the id of an object
+        :param supports_delta: Whether fetch can select the changed objects by itself. Objects removed on the server
+                               are only noticed by full polls, which are made every full_poll_every polls.
+        :param report_initial: Whether the first poll reports all the existing objects as added, rather than only
+                               recording them
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.fetch = fetch
+        self.get_id = get_id
+        self.supports_delta = supports_delta
+        self.full_poll_every = full_poll_every
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.report_initial = report_initial
+        self.interval = min_interval
+        self._fingerprints: Optional[Dict[str, bytes]] = None  # id -> fingerprint, None before the first poll
+        self._last_poll = None
+        self._polls_since_full = 0
+        self._poll_lock = threading.Lock()
+        self._subscribers = []
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def poll(self) -> ChangeSet:
+        """
+        Fetch the objects and notify the subscribers of the changes, if any.
+        """
+        with self._poll_lock:
+            changes = self._poll()
+            self.interval = (max(self.min_interval, self.interval / 2) if changes
+                             else min(self.max_interval, self.interval * POLL_INTERVAL_BACKOFF))
+        if changes:
+            self.logger.debug(f"Found {len(changes.added)} added, {len(changes.changed)} changed and "
+                              f"{len(changes.removed)} removed objects")
+            for subscriber in self._subscribers:
+                try:
+                    subscriber(changes)
+                except Exception:  # a subscriber must never stop the others or the poller
+                    self.logger.exception(f"Watch subscriber {subscriber!r} failed")
+        return changes
+
+    def _poll(self) -> ChangeSet:
+        poll_start = int(time.time() * 1000)
+        is_delta = (self.supports_delta and self._fingerprints is not None
+                    and self._polls_since_full + 1 < self.full_poll_every)
+        previous = self._fingerprints or {}
+        current = dict(previous) if is_delta else {}
+        added, changed = [], []
+        for obj in self.fetch(self._last_poll if is_delta else None):
+            object_id = self.get_id(obj)
+            object_fingerprint = fingerprint(obj)
+            current[object_id] = object_fingerprint
+            previous_fingerprint = previous.get(object_id)
+            if previous_fingerprint is None:
+                added.append(obj)
+            elif previous_fingerprint != object_fingerprint:
+                changed.append(obj)
+        removed = [] if is_delta else [object_id for object_id in previous if object_id not in current]
+
+        is_initial = self._fingerprints is None
+        self._fingerprints = current
+        self._last_poll = poll_start
+        self._polls_since_full = self._polls_since_full + 1 if is_delta else 0
+        if is_initial and not self.report_initial:
+            return ChangeSet([], [], [])
+        return ChangeSet(added, changed, removed)
+
+    def changes(self) -> Iterator[ChangeSet]:
+        """
+        Poll until `stop` is called, yielding the changes of every poll which found any.
+        """
+        while not self._stopped.is_set():
+            changes = self.poll()
+            if changes:
+                yield changes
+            self._stopped.wait(self.interval)
+
+    def subscribe(self, callback: Callable[[ChangeSet], None]):
+        """
+        Call a callback with the changes found by every poll. Callbacks are called on the polling thread.
+        """
+        self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback: Callable[[ChangeSet], None]):
+        self._subscribers = [subscriber for subscriber in self._subscribers if subscriber is not callback]
+
+    def start(self):
+        """
+        Poll in a background thread, feeding the subscribers.
+        """
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.poll()
+            except Exception as e:  # keep polling through transient API errors
+                self.logger.warning(f"Poll failed: {e}")
+                self.interval = min(self.max_interval, self.interval * POLL_INTERVAL_BACKOFF)
+            self._stopped.wait(self.interval)
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+
+class AssetWatcher(Watcher):
+    """
+    Watches the assets matching a filter:
+
+        watcher = AssetWatcher(client, status="on")
+        watcher.subscribe(lambda changes: print(changes.added, changes.changed, changes.removed))
+        watcher.start()
+    """
+
+    def __init__(self, client, delta_filter_param: Optional[str] = None, page_size: Optional[int] = None,
+                 fields: Optional[List[str]] = None, full_poll_every: int = DEFAULT_FULL_POLL_EVERY,
+                 min_interval: float = DEFAULT_MIN_POLL_INTERVAL, max_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+                 report_initial: bool = False, **filt):
+        """
+        :param client: The CentraClient used to list the assets
+        :param delta_filter_param: The assets API filter which selects assets changed since a unix time in
+                                   milliseconds. If given, polls only fetch the changed assets, with a full poll every
+                                   full_poll_every polls to notice removed assets.
+        :param fields: If given, only changes to these top-level fields are watched (and fetched, where supported)
+        :param filt: Filters selecting the assets to watch, e.g. status="on"
+        See Watcher for the other parameters.
+        """
+        page_kwargs = {} if page_size is None else {'page_size': page_size}
+        if fields is not None and 'id' not in fields:
+            fields = ['id'] + list(fields)
+
+        def fetch(since: Optional[int]) -> Iterable[Dict]:
+            delta_filter = {} if since is None else {delta_filter_param: since}
+            return client.iter_assets(fields=fields, **page_kwargs, **filt, **delta_filter)
+
+        super().__init__(fetch, get_asset_id, supports_delta=delta_filter_param is not None,
+                         full_poll_every=full_poll_every, min_interval=min_interval, max_interval=max_interval,
+                         report_initial=report_initial)
+
+
+class NotificationWatcher(Watcher):
+    """Watches the system notifications."""
+
+    def __init__(self, client, since_filter_param: Optional[str] = None, **kwargs):
+        """
+        :param client: The CentraClient used to get the notifications
+        :param since_filter_param: The notifications API filter which selects notifications changed since a unix time
+                                   in milliseconds, if the server supports one
+        :param kwargs: Watcher parameters, e.g. min_interval
+        """
+        def fetch(since: Optional[int]) -> Iterable[Dict]:
+            params = {} if since is None else {since_filter_param: since}
+            return client.get_system_notifications(**params).get(NOTIFICATION_ITEMS_KEY) or []
+
+        super().__init__(fetch, self._get_notification_id, supports_delta=since_filter_param is not None, **kwargs)
+
+    @staticmethod
+    def _get_notification_id(notification: Dict) -> str:
+        # Notifications without an id are identified by their content
+        return str(notification.get('id') or notification.get('_id') or fingerprint(notification).hex())
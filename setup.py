@@ -9,6 +9,12 @@ with open('README.rst') as readme_file:
 
 requirements = ['requests', ]  # todo read from requirements.txt
 
+extras_requirements = {
+    'async': ['aiohttp>=3.6'],
+    'fast-json': ['orjson>=3.0'],
+    'parquet': ['pyarrow>=1.0'],
+}
+
 setup_requirements = ['pytest-runner', ]
 
 test_requirements = ['pytest>=3', ]
@@ -27,7 +33,13 @@ setup(
         'Programming Language :: Python :: 3.8',
     ],
     description="Python client for Centra API access.",
+    entry_points={
+        'console_scripts': [
+            'centra-export=centra_py_client.cli:export_main',
+        ],
+    },
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="GNU General Public License v3",
     long_description=readme,
     include_package_data=True,
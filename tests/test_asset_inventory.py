@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.asset_inventory` module."""
+import os
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+from centra_py_client.asset_inventory import AssetInventory
+
+WEB_SERVER = {
+    "id": "1", "name": "Web-01", "ip_addresses": ["10.0.0.1"],
+    "nics": [{"ip_addresses": ["192.168.0.1"]}],
+    "labels": [{"id": "l1", "key": "App", "value": "Web", "name": "App: Web"}],
+}
+DB_SERVER = {"id": "2", "name": "db-01", "ip_addresses": ["10.0.0.2"], "labels": []}
+
+
+class TestAssetInventory(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.client = Mock()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def inventories(self):
+        yield AssetInventory(self.client)
+        yield AssetInventory(self.client, path=os.path.join(self.temp_dir.name, "inventory.sqlite"))
+
+    def test_full_sync_and_lookups(self):
+        for inventory in self.inventories():
+            with self.subTest(store=inventory.store.__class__.__name__):
+                self.client.iter_assets.side_effect = lambda **filt: iter([WEB_SERVER, DB_SERVER])
+                assert inventory.sync() == (2, 0, 0)
+
+                assert inventory.get("1") == WEB_SERVER
+                assert inventory.find_by_ip("192.168.0.1") == [WEB_SERVER]
+                assert inventory.find_by_hostname("DB-01") == [DB_SERVER]
+                assert inventory.find_by_label("App", "Web") == [WEB_SERVER]
+
+                moved_web_server = dict(WEB_SERVER, ip_addresses=["10.0.0.3"])
+                self.client.iter_assets.side_effect = lambda **filt: iter([moved_web_server])
+                assert inventory.sync() == (0, 1, 1)
+
+                assert inventory.find_by_ip("10.0.0.1") == []
+                assert inventory.find_by_ip("10.0.0.3") == [moved_web_server]
+                assert inventory.get("2") is None
+                assert len(inventory) == 1
+
+    def test_delta_sync(self):
+        self.client.iter_assets.side_effect = lambda **filt: iter([WEB_SERVER, DB_SERVER])
+        inventory = AssetInventory(self.client, delta_filter_param="last_seen_from", status="on")
+        inventory.sync()
+        self.client.iter_assets.assert_called_with(status="on")
+
+        first_sync = inventory.last_sync
+
+        self.client.iter_assets.side_effect = lambda **filt: iter([])
+        assert inventory.sync() == (0, 0, 0)
+
+        self.client.iter_assets.assert_called_with(status="on", last_seen_from=first_sync)
+        assert len(inventory) == 2
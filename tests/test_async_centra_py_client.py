@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""Tests for the asyncio client of `centra_py_client` package."""
+import asyncio
+import pytest
+
+from unittest import TestCase
+from unittest.mock import patch
+from centra_py_client.exceptions import ManagementAPIError
+
+pytest.importorskip("aiohttp")
+
+from centra_py_client.async_centra_py_client import AsyncCentraClient  # noqa: E402
+from centra_py_client.async_centra_session import AsyncCentraSession, _BufferedResponse  # noqa: E402
+
+
+class TestAsyncClient(TestCase):
+    def test_list_assets(self):
+        all_assets = [{"id": str(i)} for i in range(3)]
+        queries = []
+
+        async def fake_json_query(session, uri, params=None, **kwargs):
+            queries.append(params)
+            offset, limit = params["offset"], params["limit"]
+            return {"objects": all_assets[offset:offset + limit], "total_count": len(all_assets)}
+
+        with patch.object(AsyncCentraSession, "json_query", fake_json_query):
+            client = AsyncCentraClient(AsyncCentraSession("fakeaddr", "fakeuser", "fakepassword"))
+            returned_assets = asyncio.run(client.list_assets(status="on"))
+
+        assert returned_assets == all_assets
+        assert queries == [{"status": "on", "offset": 0, "limit": 1000}]
+
+    def test_delete_label_by_key_value(self):
+        deleted_uris = []
+
+        async def fake_json_query(session, uri, method="GET", params=None, **kwargs):
+            if method == "GET":
+                assert params == {"key": "a_key", "value": "a_value"}
+                return {"objects": [{"id": "first_id"}, {"id": "second_id"}]}
+            deleted_uris.append(uri)
+            return uri.split("/")[-1]
+
+        with patch.object(AsyncCentraSession, "json_query", fake_json_query):
+            client = AsyncCentraClient(AsyncCentraSession("fakeaddr", "fakeuser", "fakepassword"))
+            asyncio.run(client.delete_label_by_key_value("a_key", "a_value"))
+
+        assert sorted(uri.split("/")[-1] for uri in deleted_uris) == ["first_id", "second_id"]
+
+    def test_is_connected_not_connected(self):
+        async def fake_json_query(session, uri, **kwargs):
+            raise ManagementAPIError(f"{uri} testerror")
+
+        with patch.object(AsyncCentraSession, "json_query", fake_json_query):
+            client = AsyncCentraClient(AsyncCentraSession("fakeaddr", "fakeuser", "fakepassword"))
+            assert not asyncio.run(client.is_connected())
+
+    def test_identical_gets_are_coalesced(self):
+        queries = []
+
+        async def fake_query(session, uri, params=None, **kwargs):
+            queries.append(params)
+            await asyncio.sleep(0.01)
+            return _BufferedResponse(200, b'{"objects": []}')
+
+        async def query_concurrently(session):
+            return await asyncio.gather(*[session.json_query("/api/v3.0/visibility/labels",
+                                                             params={"key": "a_key", "value": "a_value"})
+                                          for _ in range(5)])
+
+        with patch.object(AsyncCentraSession, "_query", fake_query):
+            results = asyncio.run(query_concurrently(AsyncCentraSession("fakeaddr", "fakeuser", "fakepassword")))
+
+        assert results == [{"objects": []}] * 5
+        assert results[0] is not results[1]
+        assert len(queries) == 1
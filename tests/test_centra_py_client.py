@@ -7,10 +7,10 @@ import uuid
 from unittest import TestCase
 from unittest.mock import Mock, patch, call
 from callee import Contains
-from centra_py_client.exceptions import ManagementAPIError
+from centra_py_client.exceptions import ManagementAPIError, ManagementAPITimeoutError
 
 from centra_py_client.centra_py_client import CentraClient
-from centra_py_client.centra_session import CentraSession
+from centra_py_client.centra_session import CentraSession, QueryResult
 
 
 class TestClient(TestCase):
@@ -32,6 +32,42 @@ class TestClient(TestCase):
         mock_json_query.assert_called_once()
         assert fake_asset in returned_assets
 
+    @patch("centra_py_client.centra_py_client.CentraSession.connect")
+    @patch("centra_py_client.centra_py_client.CentraSession.json_query")
+    def test_iter_assets_pagination(self, mock_json_query, _):
+        # arrange
+        all_assets = [{"id": str(i)} for i in range(5)]
+
+        def fake_page(uri, params):
+            offset, limit = params["offset"], params["limit"]
+            return {"objects": all_assets[offset:offset + limit], "total_count": len(all_assets)}
+        mock_json_query.side_effect = fake_page
+        client = CentraClient(CentraSession("fakeaddr", "fakeuser", "fakepassword"))
+
+        # act
+        returned_assets = list(client.iter_assets(page_size=2, status="on"))
+
+        # assert
+        assert returned_assets == all_assets
+        assert mock_json_query.call_count == 3
+        mock_json_query.assert_has_calls(
+            calls=[call(Contains("assets"), params={"status": "on", "offset": offset, "limit": 2})
+                   for offset in (0, 2, 4)],
+            any_order=True
+        )
+
+    @patch("centra_py_client.centra_py_client.CentraSession.connect")
+    @patch("centra_py_client.centra_py_client.CentraSession.json_query")
+    def test_iter_assets_without_total_count(self, mock_json_query, _):
+        mock_json_query.side_effect = [
+            {"objects": [{"id": "1"}, {"id": "2"}]},
+            {"objects": [{"id": "3"}]},
+        ]
+        client = CentraClient(CentraSession("fakeaddr", "fakeuser", "fakepassword"))
+
+        assert [asset["id"] for asset in client.iter_assets(page_size=2)] == ["1", "2", "3"]
+        assert mock_json_query.call_count == 2
+
     @patch("centra_py_client.centra_py_client.CentraSession.connect")
     @patch("centra_py_client.centra_py_client.CentraSession.json_query")
     def test_add_label_to_assets(self, mock_json_query, _):
@@ -58,6 +94,36 @@ class TestClient(TestCase):
             method="POST",
             data={"vms": [fake_asset_id, fake_asset_2_id]})
 
+    @patch("centra_py_client.centra_py_client.CentraSession.connect")
+    @patch("centra_py_client.centra_py_client.CentraSession.map")
+    def test_bulk_add_labels_to_assets(self, mock_map, _):
+        asset_ids = [str(i) for i in range(250)]
+
+        def fake_map(queries, max_workers):
+            results = []
+            for query in queries:
+                if query["uri"].endswith("Env/Prod"):
+                    results.append(QueryResult({"id": "prod_id"}, None))
+                elif len(query["data"]["vms"]) > 60:
+                    results.append(QueryResult(None, ManagementAPITimeoutError("504 Gateway Time-out")))
+                else:
+                    results.append(QueryResult(None, ManagementAPIError("testerror")))
+            return results
+        mock_map.side_effect = fake_map
+        client = CentraClient(CentraSession("fakeaddr", "fakeuser", "fakepassword"))
+
+        result = client.bulk_add_labels_to_assets({("Env", "Prod"): asset_ids, ("App", "Web"): asset_ids[:100]},
+                                                  chunk_size=100)
+
+        assert result.label_ids == {("Env", "Prod"): "prod_id"}
+        rounds = [[(query["uri"].split("/")[-2], len(query["data"]["vms"])) for query in call_args[0][0]]
+                  for call_args in mock_map.call_args_list]
+        # A single chunk is sent to every label until the label exists, so concurrent requests do not each create it.
+        # The timed out chunk of 100 assets was split in two chunks of 50, which failed with a non-timeout error.
+        assert rounds == [[("Env", 100), ("App", 100)], [("App", 50), ("Env", 100), ("Env", 50)], [("App", 50)]]
+        assert [len(chunk.asset_ids) for chunk in result.failed_chunks] == [50, 50]
+        assert result.failed_assets() == {("App", "Web"): asset_ids[:100]}
+
     @patch("centra_py_client.centra_py_client.CentraSession.connect")
     @patch("centra_py_client.centra_py_client.CentraSession.json_query")
     def test_get_labels_ids(self, mock_json_query, _):
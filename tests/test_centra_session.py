@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.centra_session` module."""
+import base64
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+
+from unittest import TestCase
+from unittest.mock import Mock, patch
+from centra_py_client.exceptions import ManagementAPIError, ManagementAPITimeoutError
+
+from centra_py_client.centra_session import CentraSession, get_jwt_expiration
+from centra_py_client.token_cache import FileTokenCache, MemoryTokenCache, get_token_cache_key
+
+
+def make_jwt(expiration):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": expiration}).encode()).rstrip(b"=").decode()
+    return f"header.{payload}.signature"
+
+
+def make_response(status_code, content=b'{}'):
+    response = Mock(status_code=status_code, content=content)
+    response.json.return_value = json.loads(content)
+    return response
+
+
+class TestSession(TestCase):
+    @patch("centra_py_client.centra_session.CentraSession.connect")
+    def test_pool_configuration(self, _):
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword", pool_maxsize=32, pool_block=True)
+
+        adapter = session._requests_session.get_adapter("https://fakeaddr/api/v3.0/assets")
+        assert adapter._pool_maxsize == 32
+        assert adapter._pool_block
+
+    @patch("centra_py_client.centra_session.CentraSession.connect")
+    @patch("centra_py_client.centra_session.CentraSession.json_query")
+    def test_map_keeps_order_and_errors(self, mock_json_query, _):
+        def fake_query(uri, method="GET"):
+            if uri.endswith("bad"):
+                raise ManagementAPIError("testerror")
+            return uri
+        mock_json_query.side_effect = fake_query
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword")
+        uris = [f"visibility/labels/{i}" for i in range(20)] + ["visibility/labels/bad"]
+
+        results = session.map([{"uri": uri, "method": "DELETE"} for uri in uris], max_workers=4)
+
+        assert [result.value for result in results[:-1]] == uris[:-1]
+        assert all(result.ok for result in results[:-1])
+        assert not results[-1].ok
+        assert isinstance(results[-1].error, ManagementAPIError)
+
+    def test_get_jwt_expiration(self):
+        assert get_jwt_expiration(make_jwt(1234567890)) == 1234567890
+        assert get_jwt_expiration("not-a-jwt") is None
+
+    @patch("centra_py_client.centra_session.CentraSession.connect")
+    def test_token_refreshed_before_expiration(self, mock_connect):
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword")
+        session.set_token(make_jwt(time.time() + 10))
+        mock_connect.reset_mock()
+        mock_connect.side_effect = lambda: session.set_token(make_jwt(time.time() + 3600))
+        session._requests_session.get = Mock(return_value=make_response(200))
+
+        session.json_query("/api/v3.0/assets")
+
+        mock_connect.assert_called_once()
+
+    @patch("centra_py_client.centra_session.CentraSession.connect")
+    def test_reauthenticate_once_on_concurrent_403(self, mock_connect):
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword")
+        session.set_token("expired")
+        mock_connect.reset_mock()
+        refused = threading.Barrier(8)
+
+        def fake_get(url, auth, **kwargs):
+            if auth.token == "expired":
+                refused.wait(timeout=5)
+                return make_response(403, b'{"error": "Unauthorized", "description": "expired"}')
+            return make_response(200, b'{"objects": []}')
+
+        def fake_connect():
+            time.sleep(0.05)
+            session.set_token("fresh")
+        session._requests_session.get = fake_get
+        mock_connect.side_effect = fake_connect
+
+        results = session.map([{"uri": "/api/v3.0/assets", "params": {"offset": i}} for i in range(8)], max_workers=8)
+
+        assert all(result.value == {"objects": []} for result in results)
+        mock_connect.assert_called_once()
+
+    @patch("centra_py_client.centra_session.CentraSession.connect")
+    def test_retry_idempotent_request(self, _):
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword", max_retries=2, retry_backoff=0)
+        session.set_token("token")
+        session._requests_session.get = Mock(side_effect=[make_response(504, b'"Gateway Time-out"'),
+                                                          make_response(503),
+                                                          make_response(200, b'{"objects": []}')])
+
+        assert session.json_query("/api/v3.0/assets") == {"objects": []}
+        assert session._requests_session.get.call_count == 3
+
+    @patch("centra_py_client.centra_session.CentraSession.connect")
+    def test_no_retry_for_post(self, _):
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword", max_retries=2, retry_backoff=0)
+        session.set_token("token")
+        session._requests_session.post = Mock(return_value=make_response(504, b'"Gateway Time-out"'))
+
+        with self.assertRaises(ManagementAPITimeoutError):
+            session.json_query("/api/v3.0/assets/labels/key/value", method="POST", data={"vms": []})
+        session._requests_session.post.assert_called_once()
+
+    @patch("centra_py_client.centra_session.CentraSession.connect")
+    def test_json_query_stream(self, _):
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword")
+        session.set_token("token")
+        response = make_response(200)
+        response.iter_content.return_value = iter([b'{"objects": [{"id"', b': 1}, {"id": 2}]}'])
+        session._requests_session.get = Mock(return_value=response)
+
+        assert list(session.json_query_stream("/api/v3.0/assets")) == [{"id": 1}, {"id": 2}]
+        assert session._requests_session.get.call_args.kwargs["stream"]
+        response.close.assert_called_once()
+
+    @patch("centra_py_client.centra_session.CentraSession.connect")
+    def test_request_compression(self, _):
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword", compression=True, compression_threshold=1024)
+        session.set_token("token")
+        response = make_response(200, b'{"id": "label_id"}')
+        response.headers = {"Content-Length": "10"}
+        session._requests_session.post = Mock(return_value=response)
+        asset_ids = [f"asset-{i}" for i in range(1000)]
+
+        session.json_query("/api/v3.0/assets/labels/key/value", method="POST", data={"vms": asset_ids})
+        session.json_query("/api/v3.0/assets/labels/key/value", method="POST", data={"vms": asset_ids[:1]})
+
+        first_call, second_call = session._requests_session.post.call_args_list
+        assert first_call.kwargs["headers"]["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(first_call.kwargs["data"])) == {"vms": asset_ids}
+        assert "Content-Encoding" not in second_call.kwargs["headers"]
+        assert session.transfer_stats.requests == 2
+        assert session.transfer_stats.request_wire_bytes < session.transfer_stats.request_bytes
+        assert session.transfer_stats.response_wire_bytes == 20
+
+    def test_lazy_connect_authenticates_on_first_request(self):
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword", lazy_connect=True)
+        session.authentication_handler = Mock(side_effect=lambda *_: session.set_token(make_jwt(time.time() + 3600)))
+        session._requests_session.get = Mock(return_value=make_response(200))
+
+        session.authentication_handler.assert_not_called()
+        session.json_query("/api/v3.0/assets")
+        session.json_query("/api/v3.0/assets")
+        session.authentication_handler.assert_called_once()
+
+    def test_token_cache(self):
+        token_cache = MemoryTokenCache()
+        cached_token = make_jwt(time.time() + 3600)
+        token_cache.set(get_token_cache_key("fakeaddr", "fakeuser"), cached_token)
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword", lazy_connect=True, token_cache=token_cache)
+        new_token = make_jwt(time.time() + 7200)
+        session.authentication_handler = Mock(side_effect=lambda *_: session.set_token(new_token))
+
+        session.connect()
+        assert session.token == cached_token
+        session.authentication_handler.assert_not_called()
+
+        # The cached token was refused, so it is not reused
+        session.connect()
+        assert session.token == new_token
+        assert token_cache.get(get_token_cache_key("fakeaddr", "fakeuser")) == new_token
+
+    def test_file_token_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache", "tokens.json")
+            FileTokenCache(path).set("user@addr", "token")
+            with FileTokenCache(path).lock("user@addr"):
+                assert FileTokenCache(path).get("user@addr") == "token"
+            assert FileTokenCache(path).get("other@addr") is None
+            assert os.stat(path).st_mode & 0o777 == 0o600
+
+    @patch("centra_py_client.centra_session.CentraSession.connect")
+    def test_identical_gets_are_coalesced(self, _):
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword")
+        release = threading.Event()
+        responses = iter([make_response(200, b'{"objects": []}'), ManagementAPIError("error", 500)])
+
+        def slow_query(**kwargs):
+            release.wait(1)
+            response = next(responses)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        session._query = Mock(side_effect=slow_query)
+
+        def query_concurrently(threads_count):
+            results = []
+
+            def query():
+                try:
+                    results.append(session.json_query("/api/v3.0/assets", params={"status": "on", "limit": 10}))
+                except ManagementAPIError as e:
+                    results.append(e)
+            threads = [threading.Thread(target=query) for _ in range(threads_count)]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join()
+            release.clear()
+            return results
+
+        results = query_concurrently(5)
+        assert results == [{"objects": []}] * 5
+        assert session._query.call_count == 1
+
+        errors = query_concurrently(3)
+        assert len(errors) == 3 and all(isinstance(error, ManagementAPIError) for error in errors)
+        assert session._query.call_count == 2
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.client_pool` module."""
+import time
+from unittest import TestCase
+
+from centra_py_client.centra_py_client import CentraClient
+from centra_py_client.centra_session import CentraSession
+from centra_py_client.client_pool import CentraClientPool
+from centra_py_client.exceptions import ManagementAPIConnectionError
+
+from benchmarks.stub_server import StubCentraServer
+
+
+class TestClientPool(TestCase):
+    def setUp(self):
+        self.servers = {"first": StubCentraServer(asset_count=15).start(),
+                        "second": StubCentraServer(asset_count=7).start()}
+        for server in self.servers.values():
+            self.addCleanup(server.stop)
+        self.pool = CentraClientPool({name: CentraClient(CentraSession(server.address, "user", "password"))
+                                      for name, server in self.servers.items()})
+
+    def test_iter_assets_merges_clusters(self):
+        assets = self.pool.iter_assets(page_size=5)
+        by_cluster = {}
+        for cluster, asset in assets:
+            by_cluster.setdefault(cluster, []).append(asset["name"])
+
+        assert {cluster: len(names) for cluster, names in by_cluster.items()} == {"first": 15, "second": 7}
+        assert by_cluster["first"] == [asset["name"] for asset in self.servers["first"].assets]
+        assert assets.errors == {}
+
+    def test_iter_assets_slow_consumer(self):
+        for server in self.servers.values():
+            server.latency = 0.1  # every page takes less than the timeout, but all of them together more
+        pool = CentraClientPool(self.pool.clients, timeout=0.3)
+        assets = pool.iter_assets(page_size=2)  # the clusters also wait for the consumer on a small buffer
+        names = []
+        for cluster, asset in assets:
+            time.sleep(0.02)
+            names.append(asset["name"])
+
+        assert len(names) == 15 + 7
+        assert assets.errors == {}
+
+    def test_label_operations(self):
+        result = self.pool.add_label_to_assets({"first": ["a"], "second": ["b"]}, "Environment", "Test")
+        assert result.ok and set(result.values) == {"first", "second"}
+
+        assert {cluster: len(ids) for cluster, ids in self.pool.get_labels_ids("Environment", "Test").values.items()} \
+            == {"first": 1, "second": 1}
+        assert self.pool.delete_label_by_key_value("Environment", "Test").ok
+        assert self.pool.get_labels_ids("Environment", "Test").values == {"first": [], "second": []}
+
+    def test_partial_failures(self):
+        unreachable = StubCentraServer()
+        slow = StubCentraServer(latency=0.5).start()
+        self.addCleanup(slow.stop)
+        pool = CentraClientPool.from_addresses([self.servers["first"].address, unreachable.address, slow.address],
+                                               "user", "password", timeout=0.3)
+        unreachable._server.server_close()
+
+        result = pool.list_assets()
+        assert len(result.values[self.servers["first"].address]) == 15
+        assert isinstance(result.errors[unreachable.address], ManagementAPIConnectionError)
+        assert isinstance(result.errors[slow.address], TimeoutError)
+
+        assets = pool.iter_assets()
+        assert len(list(assets)) == 15
+        assert set(assets.errors) == {unreachable.address, slow.address}
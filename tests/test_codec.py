@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.codec` module."""
+import datetime
+import json
+import pytest
+
+from unittest import TestCase
+from centra_py_client.exceptions import ManagementAPIError
+
+from centra_py_client.codec import OrjsonCodec, StdlibJSONCodec, iter_json_array, orjson
+
+RESPONSE = {
+    "total_count": 12345,
+    "objects": [{"id": "1", "name": "שרת", "ip_addresses": ["10.0.0.1"]}, 17, "x", {"nested": {"list": [1, 2]}}],
+    "results_in_page": 4,
+}
+
+
+def chunked(content: bytes, chunk_size: int):
+    return (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+
+
+class TestCodec(TestCase):
+    def test_datetime_format(self):
+        codecs = [StdlibJSONCodec()] + ([OrjsonCodec()] if orjson is not None else [])
+        obj = {"from": datetime.datetime(2020, 1, 2, 3, 4, 5, 6)}
+        for codec in codecs:
+            with self.subTest(codec=codec.__class__.__name__):
+                assert json.loads(codec.encode(obj)) == {"from": "2020/01/02 03:04:05.000006"}
+                assert codec.decode(b'{"a": [1]}') == {"a": [1]}
+
+    def test_encodes_what_the_json_module_encodes(self):
+        codecs = [StdlibJSONCodec()] + ([OrjsonCodec()] if orjson is not None else [])
+        for obj in ({1: "a", 2.5: ["b"], None: True}, {"big": 2 ** 70, "nested": {3: 4}}):
+            for codec in codecs:
+                with self.subTest(codec=codec.__class__.__name__, obj=obj):
+                    assert json.loads(codec.encode(obj)) == json.loads(json.dumps(obj))
+
+    def test_unserializable_object(self):
+        codecs = [StdlibJSONCodec()] + ([OrjsonCodec()] if orjson is not None else [])
+        for codec in codecs:
+            with self.subTest(codec=codec.__class__.__name__):
+                with self.assertRaises(TypeError):
+                    codec.encode({"a": object()})
+
+
+class TestIterJsonArray(TestCase):
+    def test_chunk_boundaries(self):
+        content = json.dumps(RESPONSE, ensure_ascii=False, indent=1).encode("utf-8")
+        for chunk_size in (1, 2, 7, len(content)):
+            with self.subTest(chunk_size=chunk_size):
+                assert list(iter_json_array(chunked(content, chunk_size))) == RESPONSE["objects"]
+
+    def test_missing_and_empty_array(self):
+        assert list(iter_json_array([b'{"total_count": 0, "objects": []}'])) == []
+        assert list(iter_json_array([b'{"items": [1, 2]}'])) == []
+        assert list(iter_json_array([b'{}'])) == []
+
+    def test_truncated_response(self):
+        with pytest.raises(ManagementAPIError):
+            list(iter_json_array(chunked(b'{"objects": [{"id": 1}, {"id"', 4)))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.export` module."""
+import csv
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+
+from centra_py_client.centra_py_client import CentraClient
+from centra_py_client.centra_session import CentraSession
+from centra_py_client.cli import export_main
+from centra_py_client.export import NDJSONWriter, export
+
+from benchmarks.stub_server import StubCentraServer
+
+
+class TestExport(TestCase):
+    def setUp(self):
+        self.server = StubCentraServer(asset_count=25).start()
+        self.addCleanup(self.server.stop)
+        self.client = CentraClient(CentraSession(self.server.address, "user", "password"))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_ndjson(self):
+        path = os.path.join(self.directory, "assets.ndjson")
+        result = export(self.client, "assets", path, fields=["id", "name"], page_size=10)
+
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+        assert lines == [{"id": asset["id"], "name": asset["name"]} for asset in self.server.assets]
+        assert (result.rows, result.pages) == (25, 3)
+        assert not os.path.exists(path + ".state.json")
+
+    def test_csv(self):
+        path = os.path.join(self.directory, "assets.csv")
+        export(self.client, "assets", path, format="csv", page_size=10)
+
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 25
+        assert rows[0]["name"] == "asset-000000"
+        assert json.loads(rows[0]["ip_addresses"]) == ["10.0.0.0"]
+
+    def test_csv_fields_missing_from_the_first_page(self):
+        self.server.assets[15]["os"] = "Linux"
+        path = os.path.join(self.directory, "assets.csv")
+
+        with self.assertLogs("_FlatColumns", "WARNING") as logs:
+            export(self.client, "assets", path, format="csv", page_size=10)
+        assert "not exported: os," in logs.output[0]
+        with open(path, newline='') as f:
+            assert "os" not in csv.DictReader(f).fieldnames
+
+        export(self.client, "assets", path, format="csv", fields=["name", "os"], page_size=10)
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert [row["os"] for row in rows[14:17]] == ["", "Linux", ""]
+
+    def test_resume(self):
+        path = os.path.join(self.directory, "assets.ndjson")
+        write_page = NDJSONWriter.write_page
+
+        def fail_on_third_page(writer, objects):
+            if writer.position() and objects[0]["name"] == "asset-000020":
+                writer.file.write(b'{"partial')
+                raise IOError("disk full")
+            write_page(writer, objects)
+
+        with patch.object(NDJSONWriter, "write_page", fail_on_third_page), self.assertRaises(IOError):
+            export(self.client, "assets", path, page_size=10)
+        result = export(self.client, "assets", path, page_size=10, resume=True)
+
+        with open(path) as f:
+            names = [json.loads(line)["name"] for line in f]
+        assert names == [asset["name"] for asset in self.server.assets]
+        assert (result.rows, result.pages, result.resumed_from) == (25, 1, 20)
+
+    def test_parquet(self):
+        pytest.importorskip("pyarrow")
+        import pyarrow.parquet
+        path = os.path.join(self.directory, "assets")
+        export(self.client, "assets", path, format="parquet", page_size=10)
+
+        table = pyarrow.parquet.read_table(path)
+        assert table.num_rows == 25
+        assert sorted(table.column("name").to_pylist()) == [asset["name"] for asset in self.server.assets]
+
+    def test_cli(self):
+        path = os.path.join(self.directory, "labels.ndjson")
+        self.client.add_label_to_assets(["a"], "Environment", "Test")
+
+        assert export_main(["labels", "-o", path, "--filter", "key=Environment", "--address", self.server.address,
+                            "--username", "user", "--password", "password", "--no-token-cache"]) == 0
+        with open(path) as f:
+            assert [json.loads(line)["value"] for line in f] == ["Test"]
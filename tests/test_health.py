@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.health` module."""
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from centra_py_client.centra_session import CentraSession
+from centra_py_client.exceptions import ManagementAPIConnectionError, ManagementAPIUnavailableError
+from centra_py_client.health import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, HealthMonitor
+
+from benchmarks.stub_server import StubCentraServer
+
+
+class TestCircuitBreaker(TestCase):
+    @patch("centra_py_client.health.time.monotonic")
+    def test_opens_and_recovers(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        breaker.check()
+        breaker.record(True)
+        breaker.record(False)  # a success resets the count
+        breaker.record(True)
+        assert breaker.state == CLOSED
+        breaker.record(True)
+        assert breaker.state == OPEN
+        with self.assertRaises(ManagementAPIUnavailableError) as raised:
+            breaker.check()
+        assert raised.exception.retry_after == 10
+
+        mock_monotonic.return_value = 110.0
+        breaker.check()  # the trial request
+        assert breaker.state == HALF_OPEN
+        with self.assertRaises(ManagementAPIUnavailableError):
+            breaker.check()  # a single trial at a time
+        breaker.record(True)
+        assert breaker.state == OPEN
+
+        mock_monotonic.return_value = 120.0
+        breaker.check()
+        breaker.release()  # neither a failure nor a success
+        assert breaker.state == HALF_OPEN and breaker.consecutive_failures == 3
+        breaker.check()
+        breaker.record(False)
+        assert breaker.state == CLOSED
+        breaker.check()
+
+
+class TestHealthMonitor(TestCase):
+    def setUp(self):
+        self.server = StubCentraServer(asset_count=1).start()
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        self.session = CentraSession(self.server.address, "user", "password", circuit_breaker=self.breaker)
+
+    def test_cached_status(self):
+        self.addCleanup(self.server.stop)
+        monitor = HealthMonitor(self.session, freshness=60)
+        request_count = self.server.request_count
+        assert all(monitor.is_healthy() for _ in range(10))
+        assert self.server.request_count == request_count + 1
+        assert monitor.is_healthy(max_age=0)
+        assert self.server.request_count == request_count + 2
+
+    def test_fails_fast_when_down(self):
+        # Without keep-alive, so no pooled connection outlives the server
+        session = CentraSession(self.server.address, "user", "password", keep_alive=False,
+                                circuit_breaker=self.breaker)
+        monitor = HealthMonitor(session, freshness=0, probe_timeout=1)
+        self.server.stop()
+        statuses = [monitor.get_status() for _ in range(3)]
+        assert not any(status.healthy for status in statuses)
+        assert isinstance(statuses[-1].error, ManagementAPIUnavailableError) and statuses[-1].latency is None
+        assert self.breaker.state == OPEN
+        with self.assertRaises(ManagementAPIUnavailableError):
+            session.json_query(session.urljoin_api("assets"))
+
+    def test_only_server_failures_count(self):
+        self.addCleanup(self.server.stop)
+        uri = self.session.urljoin_api("assets")
+        with patch.object(self.session.transport, "request", side_effect=ValueError("unreadable body")):
+            for _ in range(3):
+                with self.assertRaises(ValueError):
+                    self.session.json_query(uri)
+        assert self.breaker.state == CLOSED and self.breaker.consecutive_failures == 0
+
+        with patch.object(self.session.transport, "request", side_effect=ManagementAPIConnectionError("timed out")):
+            for _ in range(2):
+                with self.assertRaises(ManagementAPIConnectionError):
+                    self.session.json_query(uri)
+        assert self.breaker.state == OPEN
+
+    def test_heartbeat(self):
+        self.addCleanup(self.server.stop)
+        with HealthMonitor(self.session, freshness=60, heartbeat_interval=0.01) as monitor:
+            request_count = self.server.request_count
+            time.sleep(0.2)
+            assert monitor.is_healthy()
+        assert self.server.request_count - request_count >= 3
+
+    def test_unexpected_errors(self):
+        self.addCleanup(self.server.stop)
+        monitor = HealthMonitor(self.session, freshness=60, heartbeat_interval=0.01)
+        assert monitor.probe().healthy
+        with patch.object(self.session, "_query", side_effect=RuntimeError("bug")):
+            status = monitor.probe()
+        assert not status.healthy and isinstance(status.error, RuntimeError)
+
+        # The heartbeat keeps going when a probe raises
+        with patch.object(monitor, "probe", side_effect=RuntimeError("bug")) as mock_probe:
+            with monitor:
+                time.sleep(0.1)
+        assert mock_probe.call_count >= 3
+        assert not monitor.status.healthy and isinstance(monitor.status.error, RuntimeError)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.label_catalog` module."""
+from unittest import TestCase
+from unittest.mock import patch
+
+from centra_py_client.centra_py_client import CentraClient
+from centra_py_client.centra_session import CentraSession
+
+LABELS = [
+    {"id": "1", "key": "Environment", "value": "Production", "name": "Environment: Production"},
+    {"id": "2", "key": "Environment", "value": "Staging", "name": "Environment: Staging"},
+    {"id": "3", "key": "App", "value": "Production", "name": "App: Production"},
+]
+
+
+def fake_labels_page(uri, params=None, **kwargs):
+    offset, limit = params["offset"], params["limit"]
+    return {"objects": LABELS[offset:offset + limit], "total_count": len(LABELS)}
+
+
+class TestLabelCatalog(TestCase):
+    @patch("centra_py_client.centra_py_client.CentraSession.connect")
+    @patch("centra_py_client.centra_py_client.CentraSession.json_query")
+    def test_lookups_load_catalog_once(self, mock_json_query, _):
+        mock_json_query.side_effect = fake_labels_page
+        client = CentraClient(CentraSession("fakeaddr", "fakeuser", "fakepassword"), label_catalog_ttl=60)
+        client.label_catalog.page_size = 2
+
+        assert client.get_labels_ids("Environment", "Production") == ["1"]
+        assert client.get_labels_ids("Environment", "Staging") == ["2"]
+        assert {label["id"] for label in client.label_catalog.find(label_value="Production")} == {"1", "3"}
+        assert client.label_catalog.find_by_name("App: Production") == [LABELS[2]]
+        assert mock_json_query.call_count == 2  # two pages, loaded once
+
+    @patch("centra_py_client.centra_py_client.CentraSession.connect")
+    @patch("centra_py_client.centra_py_client.CentraSession.json_query")
+    def test_ttl_expiration(self, mock_json_query, _):
+        mock_json_query.side_effect = fake_labels_page
+        client = CentraClient(CentraSession("fakeaddr", "fakeuser", "fakepassword"), label_catalog_ttl=0)
+
+        client.get_labels_ids("Environment", "Production")
+        client.get_labels_ids("Environment", "Production")
+
+        assert mock_json_query.call_count == 2
+
+    @patch("centra_py_client.centra_py_client.CentraSession.connect")
+    @patch("centra_py_client.centra_py_client.CentraSession.json_query")
+    def test_writes_update_catalog(self, mock_json_query, _):
+        mock_json_query.side_effect = fake_labels_page
+        client = CentraClient(CentraSession("fakeaddr", "fakeuser", "fakepassword"), label_catalog_ttl=60)
+        client.label_catalog.refresh()
+
+        mock_json_query.side_effect = lambda uri, method, data: {"id": "4", "name": "Role: DB"}
+        client.add_label_to_assets(["asset"], "Role", "DB")
+        mock_json_query.side_effect = lambda uri, method: uri.split("/")[-1]
+        client.delete_label_by_key_value("Environment", "Staging")
+
+        assert client.get_labels_ids("Role", "DB") == ["4"]
+        assert client.get_labels_ids("Environment", "Staging") == []
+        assert client.label_catalog.get("2") is None
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.label_reconciler` module."""
+from unittest import TestCase
+from unittest.mock import Mock
+
+from centra_py_client.centra_py_client import CentraClient
+from centra_py_client.centra_session import CentraSession
+from centra_py_client.label_reconciler import LabelReconciler
+
+from benchmarks.stub_server import StubCentraServer
+
+
+class TestLabelReconciler(TestCase):
+    def test_plan(self):
+        reconciler = LabelReconciler(Mock(), managed_keys={"App", "Owner"}, chunk_size=2)
+        current = {
+            "a": {("App", "Web"), ("Owner", "Alice"), ("Environment", "Production")},
+            "b": {("App", "Db"), ("Owner", "Bob")},
+            "c": {("App", "Web"), ("Owner", "Bob")},
+            "d": set(),
+        }
+        desired = {
+            "a": [("App", "Web"), ("Owner", "Alice")],  # unchanged, the unmanaged Environment label is kept
+            "b": [("App", "Web")],  # App changed, Owner removed
+            "c": [("App", "Web")],  # Owner removed
+            "d": [("App", "Web"), ("Owner", "Bob")],
+            "e": [("App", "Web")],  # does not exist
+        }
+
+        plan = reconciler.plan(desired, current)
+
+        assert plan.additions == {("App", "Web"): ["b", "d"], ("Owner", "Bob"): ["d"]}
+        assert plan.removals == {("Owner", "Bob"): ["b", "c"]}
+        assert plan.unchanged_assets == 1
+        assert plan.missing_assets == ["e"]
+        assert plan.call_count == 3
+        with self.assertRaises(ValueError):
+            reconciler.plan({"a": [("App", "Web"), ("App", "Db")]}, current)
+
+    def test_get_current_labels(self):
+        client = Mock()
+        client.get_assets_by_ids.return_value = {
+            "a": {"_id": "a", "labels": [{"key": "App", "value": "Web"}]},  # no "id" field
+            "b": {"id": "b", "_id": "b", "labels": [{"name": "Owner: Bob"}]},
+        }
+        reconciler = LabelReconciler(client)
+
+        assert reconciler.get_current_labels(["a", "b"]) == {"a": {("App", "Web")}, "b": {("Owner", "Bob")}}
+        client.get_assets_by_ids.assert_called_once_with(["a", "b"], fields=["id", "_id", "labels"], max_workers=None)
+        client.iter_assets.assert_not_called()
+
+    def test_reconcile(self):
+        server = StubCentraServer(asset_count=30).start()
+        self.addCleanup(server.stop)
+        client = CentraClient(CentraSession(server.address, "user", "password"))
+        reconciler = LabelReconciler(client, managed_keys={"App", "Environment"}, chunk_size=10)
+        asset_ids = [asset["id"] for asset in server.assets]
+        desired = {asset_id: [("App", "Web" if i % 3 else "Db")] for i, asset_id in enumerate(asset_ids)}
+
+        dry_run = reconciler.reconcile(desired, dry_run=True)
+        request_count = server.request_count
+        # 10 assets get App: Db, 20 get App: Web, and the Environment label of the stub assets is removed from all 30
+        assert dry_run.added is None and dry_run.plan.call_count == 1 + 2 + 3
+        assert server.request_count == request_count
+
+        result = reconciler.reconcile(desired)
+        assert result.ok
+        assert server.request_count == request_count + 1 + dry_run.plan.call_count  # one batch of ids
+        assert {asset["id"]: [(label["key"], label["value"]) for label in asset["labels"]]
+                for asset in server.assets} == {asset_id: list(labels) for asset_id, labels in desired.items()}
+
+        assert not reconciler.reconcile(desired).plan
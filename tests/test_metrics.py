@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.metrics` module."""
+import json
+
+from unittest import TestCase
+from unittest.mock import Mock, patch
+from centra_py_client.exceptions import ManagementAPIError
+
+from centra_py_client.centra_session import CentraSession
+from centra_py_client.metrics import MetricsCollector, endpoint_template
+
+
+def make_response(status_code, content=b'{}'):
+    response = Mock(status_code=status_code, content=content, headers={"Content-Length": str(len(content))})
+    response.json.return_value = json.loads(content)
+    return response
+
+
+class TestMetrics(TestCase):
+    def test_endpoint_template(self):
+        base = "/api/v3.0/"
+        assert endpoint_template("/api/v3.0/assets/labels/App/Web", base) == "assets/labels/{key}/{value}"
+        assert endpoint_template("/api/v3.0/visibility/labels/1234", base) == "visibility/labels/{id}"
+        assert endpoint_template("/api/v3.0/assets/deadbeef-1337-1337-1337deadbeef1337", base) == "assets/{id}"
+        assert endpoint_template("/api/v3.0/system-notifications?limit=1", base) == "system-notifications"
+
+    @patch("centra_py_client.centra_session.CentraSession.connect")
+    def test_collector_observes_requests(self, _):
+        session = CentraSession("fakeaddr", "fakeuser", "fakepassword", max_retries=1, retry_backoff=0)
+        session.set_token("token")
+        collector = MetricsCollector()
+        events = []
+        session.add_observer(collector)
+        session.add_observer(events.append)
+        session._requests_session.get = Mock(side_effect=[make_response(503), make_response(200, b'[1, 2]'),
+                                                          make_response(500), make_response(500)])
+        session._requests_session.delete = Mock(return_value=make_response(200, b'"1"'))
+
+        session.json_query("/api/v3.0/assets")
+        session.json_query("/api/v3.0/visibility/labels/1", method="DELETE")
+        with self.assertRaises(ManagementAPIError):
+            session.json_query("/api/v3.0/assets")
+
+        assert [(event.method, event.endpoint, event.status_code, event.retries) for event in events] == [
+            ("GET", "assets", 200, 1), ("DELETE", "visibility/labels/{id}", 200, 0), ("GET", "assets", 500, 1)]
+        assert events[0].response_bytes == 2 + 6
+        assets_metrics = collector.snapshot()[("GET", "assets")]
+        assert assets_metrics.count == 2
+        assert assets_metrics.error_rate == 0.5
+        assert assets_metrics.retries == 2
+        assert "visibility/labels/{id}" in collector.report()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.models` module."""
+import pytest
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from centra_py_client.centra_py_client import CentraClient
+from centra_py_client.centra_session import CentraSession
+from centra_py_client.models import Asset
+
+ASSET = {
+    "id": "1", "name": "web-01", "status": "on",
+    "ip_addresses": ["10.0.0.1"],
+    "labels": [{"id": "l1", "key": "App", "value": "Web", "name": "App: Web"}],
+}
+
+
+class TestModels(TestCase):
+    def test_asset_fields(self):
+        asset = Asset(ASSET)
+
+        assert asset.name == "web-01"
+        assert asset["ip_addresses"] == ["10.0.0.1"]
+        assert asset.ip_addresses == ["10.0.0.1"]
+        assert asset.last_seen is None
+        assert asset.get("missing", 5) == 5
+        assert [label.name for label in asset.labels] == ["App: Web"]
+        assert asset.to_dict() == dict(ASSET, first_seen=None, last_seen=None)
+        assert not hasattr(asset, "__dict__")
+        with pytest.raises(AttributeError):
+            asset.name = "db-01"
+
+    @patch("centra_py_client.centra_py_client.CentraSession.connect")
+    @patch("centra_py_client.centra_py_client.CentraSession.json_query")
+    def test_list_assets_projection(self, mock_json_query, _):
+        mock_json_query.return_value = {"objects": [ASSET]}
+        client = CentraClient(CentraSession("fakeaddr", "fakeuser", "fakepassword"))
+
+        assets = client.list_assets(fields=["id", "ip_addresses"], as_models=True, status="on")
+
+        assert assets[0].to_dict() == {"id": "1", "ip_addresses": ["10.0.0.1"],
+                                       "name": None, "status": None, "first_seen": None, "last_seen": None}
+        assert mock_json_query.call_args.kwargs["params"]["fields"] == "id,ip_addresses"
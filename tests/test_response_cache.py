@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.response_cache` module."""
+import time
+from unittest import TestCase
+
+from centra_py_client.response_cache import ResponseCache
+
+
+class TestResponseCache(TestCase):
+    def test_ttl_and_lru_eviction(self):
+        cache = ResponseCache(ttls={"assets": 60, "visibility/labels": 60}, max_entries=2)
+        assert cache.put("system", "system-notifications", b"{}", {}) is None  # no TTL, not cached
+
+        cache.put("first", "assets", b"1", {})
+        cache.put("second", "assets", b"2", {})
+        assert cache.get("first").content == b"1"
+        cache.put("third", "visibility/labels", b"3", {})
+        assert cache.get("second") is None  # the least recently used
+        assert len(cache) == 2
+
+    def test_size_bound(self):
+        cache = ResponseCache(ttls={"assets": 60}, max_bytes=10)
+        cache.put("first", "assets", b"123456", {})
+        cache.put("second", "assets", b"123456", {})
+        assert cache.get("first") is None
+        assert cache.put("large", "assets", b"x" * 11, {}) is None
+
+    def test_stale_responses(self):
+        cache = ResponseCache(ttls={"assets": 0.01})
+        cache.put("with_etag", "assets", b"1", {"ETag": '"v1"'})
+        cache.put("without_validators", "assets", b"2", {})
+        time.sleep(0.02)
+
+        stale = cache.get("with_etag")
+        assert not stale.fresh
+        assert stale.revalidation_headers == {"If-None-Match": '"v1"'}
+        assert cache.refresh("with_etag", stale).fresh
+        assert cache.get("without_validators") is None
+
+    def test_invalidate_related_resources(self):
+        cache = ResponseCache(ttls={"assets": 60, "visibility/labels": 60, "system-notifications": 60})
+        cache.put("assets", "assets", b"1", {})
+        cache.put("labels", "visibility/labels", b"2", {})
+        cache.put("notifications", "system-notifications", b"3", {})
+
+        cache.invalidate("assets/labels/{key}/{value}")
+        assert cache.get("assets") is None
+        assert cache.get("labels") is None
+        assert cache.get("notifications") is not None
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.streaming` module."""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+import urllib3
+from requests.utils import super_len
+
+from centra_py_client.centra_session import CentraSession
+from centra_py_client.streaming import MultipartStream, SizedBody
+
+from benchmarks.stub_server import StubCentraServer
+
+
+class TestMultipartStream(TestCase):
+    def test_matches_urllib3_encoding(self):
+        fields = {"comment": "hello", "report": ("report.csv", b"a,b\n1,2\n", "text/csv")}
+        expected_body, expected_content_type = urllib3.encode_multipart_formdata(fields, boundary="boundary")
+
+        stream = MultipartStream({"comment": "hello", "report": ("report.csv", io.BytesIO(b"a,b\n1,2\n"), "text/csv")},
+                                 boundary="boundary", chunk_size=3)
+        assert stream.content_type == expected_content_type
+        assert stream.length == len(expected_body)
+        assert super_len(SizedBody(stream, stream.length)) == len(expected_body)
+        assert stream.read(10) + stream.read() == expected_body
+        stream.seek(0)
+        assert b"".join(stream) == expected_body
+
+    def test_unknown_length(self):
+        stream = MultipartStream({"report": ("report.csv", iter([b"a", b"b"]))})
+        assert stream.length is None
+        assert super_len(stream) == 0  # requests sends it in chunks
+        with self.assertRaises(io.UnsupportedOperation):
+            stream.seek(0)
+
+
+class TestStreamingTransfers(TestCase):
+    def setUp(self):
+        self.server = StubCentraServer(asset_count=50).start()
+        self.addCleanup(self.server.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_download(self):
+        for transport in ("requests", "urllib3"):
+            session = CentraSession(self.server.address, "user", "password", transport=transport)
+            path = os.path.join(self.directory, "assets.json")
+            size = session.download(session.urljoin_api("assets"), path, chunk_size=1024)
+            with open(path, "rb") as f:
+                assert len(json.load(f)["objects"]) == 50
+            assert size == os.path.getsize(path)
+            assert not os.path.exists(path + ".part")
+
+            buffer = io.BytesIO()
+            session.download(session.urljoin_api("assets"), buffer, params={"limit": 5})
+            assert len(json.loads(buffer.getvalue())["objects"]) == 5
+
+    def test_download_after_revoked_token(self):
+        # The refused response must give its connection back, or re-authenticating waits for it forever
+        for transport in ("requests", "urllib3"):
+            session = CentraSession(self.server.address, "user", "password", transport=transport,
+                                    pool_maxsize=1, pool_block=True)
+            self.server.revoke_tokens()
+            buffer = io.BytesIO()
+            download = threading.Thread(target=session.download, args=(session.urljoin_api("assets"), buffer),
+                                        daemon=True)
+            download.start()
+            download.join(timeout=5)
+            assert not download.is_alive()
+            assert len(json.loads(buffer.getvalue())["objects"]) == 50
+
+    def test_upload(self):
+        payload = os.urandom(300 * 1024)
+        path = os.path.join(self.directory, "payload.bin")
+        with open(path, "wb") as f:
+            f.write(payload)
+        for transport in ("requests", "urllib3"):
+            session = CentraSession(self.server.address, "user", "password", transport=transport)
+            uri = session.urljoin_api("uploads")
+            expected = {"size": len(payload), "md5": hashlib.md5(payload).hexdigest()}
+
+            self.server.revoke_tokens()  # the file is rewound and replayed after re-authenticating
+            with open(path, "rb") as f:
+                result = session.upload(uri, data=f)
+            assert {key: result[key] for key in expected} == expected
+
+            chunks = (payload[i:i + 1000] for i in range(0, len(payload), 1000))
+            result = session.upload(uri, data=chunks)
+            assert {key: result[key] for key in expected} == expected
+
+            with open(path, "rb") as f:
+                result = session.upload(uri, files={"report": f, "comment": "nightly"})
+            assert result["content_type"].startswith("multipart/form-data; boundary=")
+            assert result["size"] > len(payload)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+
+"""Tests for the client against `benchmarks.stub_server`."""
+import os
+import re
+import tempfile
+import time
+from unittest import TestCase
+
+from centra_py_client.centra_py_client import CentraClient
+from centra_py_client.centra_session import CentraSession
+from centra_py_client.response_cache import ResponseCache
+from centra_py_client.token_cache import FileTokenCache
+from centra_py_client.transport import Urllib3Transport
+
+from benchmarks.stub_server import StubCentraServer
+
+
+class TestStubServer(TestCase):
+    def setUp(self):
+        self.server = StubCentraServer(asset_count=25).start()
+        self.addCleanup(self.server.stop)
+        self.client = CentraClient(CentraSession(self.server.address, "user", "password"))
+
+    def test_list_assets_pages(self):
+        assets = list(self.client.iter_assets(page_size=10))
+        assert [asset["name"] for asset in assets] == [f"asset-{i:06d}" for i in range(25)]
+
+    def test_labels_round_trip(self):
+        self.client.add_label_to_assets(["a", "b"], "Environment", "Test")
+        assert len(self.client.get_labels_ids("Environment", "Test")) == 1
+        self.client.delete_label_by_key_value("Environment", "Test")
+        assert self.client.get_labels_ids("Environment", "Test") == []
+
+    def test_bulk_delete_labels(self):
+        client = CentraClient(CentraSession(self.server.address, "user", "password"), label_catalog_ttl=60)
+        for key, value in [("App", "legacy-web"), ("App", "legacy-db"), ("App", "billing"), ("Temp", "1"),
+                           ("Temp", "2"), ("Owner", "bob@old.com"), ("Owner", "alice@new.com"), ("Env", "Test")]:
+            client.add_label_to_assets(["a"], key, value)
+        stale_id = client.get_labels_ids("Env", "Test")[0]
+        self.server.labels.pop(stale_id)  # deleted behind the label catalog's back, so its deletion fails
+
+        patterns = ["App: legacy-*", re.compile(r"Owner: .*@old\.com"), ("Te?p", "*")]
+        dry_run = client.bulk_delete_labels(names=["Env:Test"], patterns=patterns, dry_run=True)
+        assert len(dry_run.deletions) == 6 and len(self.server.labels) == 7
+
+        result = client.bulk_delete_labels(names=["Env:Test"], patterns=patterns, max_workers=4)
+        assert not result.ok
+        assert [deletion.label["id"] for deletion in result.failed] == [stale_id]
+        assert sorted(label["name"] for label in result.deleted) == ["App: legacy-db", "App: legacy-web",
+                                                                     "Owner: bob@old.com", "Temp: 1", "Temp: 2"]
+        assert sorted(label["name"] for label in self.server.labels.values()) == ["App: billing",
+                                                                                  "Owner: alice@new.com"]
+        assert sorted(label["name"] for label in client.label_catalog.find()) == ["App: billing", "Env: Test",
+                                                                                  "Owner: alice@new.com"]
+
+    def test_get_assets_by_ids(self):
+        client = CentraClient(CentraSession(self.server.address, "user", "password"), asset_cache_size=15)
+        asset_ids = [asset["id"] for asset in self.server.assets]
+        request_count = self.server.request_count
+
+        assets = client.get_assets_by_ids(asset_ids[:20] + asset_ids[:5] + ["unknown"], batch_size=8)
+        assert list(assets) == asset_ids[:20]
+        assert assets[asset_ids[3]] == self.server.assets[3]
+        assert self.server.request_count == request_count + 3  # 21 distinct ids in batches of 8
+
+        # The cache keeps the 15 most recently resolved assets
+        assets = client.get_assets_by_ids(asset_ids[5:20], fields=["name"], batch_size=8)
+        assert assets[asset_ids[5]] == {"name": "asset-000005"}
+        assert self.server.request_count == request_count + 3
+
+        client.add_label_to_assets(asset_ids[5:7], "App", "Web")
+        assets = client.get_assets_by_ids(asset_ids[5:20])
+        assert self.server.request_count == request_count + 5  # the label and the 2 labeled assets
+        assert assets[asset_ids[5]]["labels"][-1]["name"] == "App: Web"
+
+    def test_get_assets_by_ids_returns_copies(self):
+        asset_id = self.server.assets[0]["id"]
+        for _ in range(2):  # fetched, then cached
+            asset = self.client.get_assets_by_ids([asset_id])[asset_id]
+            asset["name"] = "renamed"
+            asset["labels"].clear()
+
+        assert self.client.get_assets_by_ids([asset_id])[asset_id] == self.server.assets[0]
+
+    def test_get_assets_by_ids_ignores_unrequested_assets(self):
+        self.server.asset_id_filter = False  # the server returns the first assets, whatever the requested ids
+        asset_ids = [asset["id"] for asset in self.server.assets]
+
+        assets = self.client.get_assets_by_ids([asset_ids[1], asset_ids[20]])
+        assert list(assets) == [asset_ids[1]]
+        assert list(self.client._asset_cache) == [asset_ids[1]]
+        assets = self.client.get_assets_by_ids([asset_ids[0]], fields=["name"])
+        assert assets == {asset_ids[0]: {"name": "asset-000000"}}
+
+    def test_reauthenticates_after_revoked_token(self):
+        self.server.revoke_tokens()
+        assert len(self.client.list_assets()) == 25
+
+    def test_token_cache_shared_between_sessions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            token_cache = FileTokenCache(os.path.join(directory, "tokens.json"))
+            first = CentraSession(self.server.address, "user", "password", token_cache=token_cache)
+            second = CentraSession(self.server.address, "user", "password", token_cache=token_cache)
+            assert first.token == second.token
+
+            self.server.revoke_tokens()
+            assert CentraClient(second).is_connected
+            assert CentraClient(first).is_connected
+            assert first.token == second.token
+            assert len(self.server.valid_tokens) == 1
+
+    def test_response_cache(self):
+        response_cache = ResponseCache(ttls={"visibility/labels": 0.05, "assets": 60})
+        client = CentraClient(CentraSession(self.server.address, "user", "password", response_cache=response_cache))
+        client.list_assets()
+        requests_sent = self.server.request_count
+        client.list_assets()
+        assert self.server.request_count == requests_sent
+
+        assert client.get_labels_ids("Environment", "Test") == []
+        client.add_label_to_assets(["a"], "Environment", "Test")
+        assert len(client.get_labels_ids("Environment", "Test")) == 1  # invalidated by the mutation
+
+        time.sleep(0.1)
+        assert len(client.get_labels_ids("Environment", "Test")) == 1  # revalidated with a 304
+        assert response_cache.revalidations == 1
+
+    def test_urllib3_transport(self):
+        session = CentraSession(self.server.address, "user", "password", transport="urllib3", compression=True,
+                                compression_threshold=100)
+        client = CentraClient(session)
+        self.server.revoke_tokens()
+
+        assert len(client.list_assets(page_size=10)) == 25
+        assert len(list(session.json_query_stream(session.urljoin_api("assets"), params={"limit": 5}))) == 5
+        client.add_label_to_assets([f"asset-{i}" for i in range(50)], "Environment", "Test")
+        client.delete_label_by_key_value("Environment", "Test")
+        assert client.get_labels_ids("Environment", "Test") == []
+        assert session.transfer_stats.request_wire_bytes < session.transfer_stats.request_bytes
+
+    def test_urllib3_abandoned_stream(self):
+        server = StubCentraServer(asset_count=200, asset_padding=10000).start()
+        self.addCleanup(server.stop)
+        transport = Urllib3Transport()
+        response = transport.request("POST", server.address + "/api/v3.0/authenticate")
+        token = response.json()["access_token"]
+        response = transport.request("GET", server.address + "/api/v3.0/assets", token=token, stream=True)
+        next(response.iter_content(1024))
+        response.close()  # closes the connection rather than reading the remaining 2MB
+        assert response.raw.tell() < 1024 * 1024
+        assert transport.request("GET", server.address + "/api/v3.0/assets", token=token,
+                                 params={"limit": 1}).json()["objects"]
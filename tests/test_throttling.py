@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.throttling` module."""
+import time
+
+from unittest import TestCase
+
+from centra_py_client.throttling import AdaptiveConcurrencyLimiter, TokenBucket
+
+
+class TestTokenBucket(TestCase):
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=50, burst=5)
+
+        start = time.monotonic()
+        for _ in range(10):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        # The first 5 tokens are available immediately, the other 5 take 1/50 seconds each
+        assert 0.08 <= elapsed < 0.5
+
+    def test_invalid_parameters(self):
+        for rate, burst in ((0, None), (-1, 5), (10, 0), (10, 0.5)):
+            with self.assertRaises(ValueError):
+                TokenBucket(rate=rate, burst=burst)
+        assert TokenBucket(rate=0.5).capacity == 1
+
+
+class TestAdaptiveConcurrencyLimiter(TestCase):
+    def test_additive_increase_multiplicative_decrease(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=1, max_limit=5)
+
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release(overloaded=False)
+        assert 4.9 < limiter.limit <= 5
+
+        limiter.acquire()
+        limiter.release(overloaded=True)
+        assert 2.4 < limiter.limit < 2.6
+        assert limiter.in_flight == 0
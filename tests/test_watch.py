@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+"""Tests for `centra_py_client.watch` module."""
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+from centra_py_client.watch import AssetWatcher, NotificationWatcher
+
+
+class TestWatch(TestCase):
+    def test_asset_watcher(self):
+        assets = {str(i): {"id": str(i), "status": "on"} for i in range(3)}
+        client = Mock()
+        client.iter_assets.side_effect = lambda **filt: list(assets.values())
+        watcher = AssetWatcher(client, min_interval=1, max_interval=8, status="on")
+        received = []
+        watcher.subscribe(received.append)
+
+        assert not watcher.poll()  # the first poll only records the assets
+        assert watcher.interval == 1.5
+        assets["1"] = {"id": "1", "status": "off"}
+        assets["3"] = {"id": "3", "status": "on"}
+        del assets["0"]
+        changes = watcher.poll()
+
+        assert changes.added == [{"id": "3", "status": "on"}]
+        assert changes.changed == [{"id": "1", "status": "off"}]
+        assert changes.removed == ["0"]
+        assert watcher.interval == 1
+        assert received == [changes]
+        assert client.iter_assets.call_args.kwargs["status"] == "on"
+
+    def test_delta_polls(self):
+        client = Mock()
+        client.iter_assets.return_value = [{"id": "1"}]
+        watcher = AssetWatcher(client, delta_filter_param="modified_since", full_poll_every=3, report_initial=True)
+
+        assert watcher.poll().added == [{"id": "1"}]
+        client.iter_assets.return_value = [{"id": "2"}]
+        assert watcher.poll().added == [{"id": "2"}]  # "1" did not change, so it is not fetched
+        assert "modified_since" in client.iter_assets.call_args.kwargs
+
+        client.iter_assets.return_value = []
+        assert not watcher.poll()
+        assert watcher.poll().removed == ["1", "2"]  # a full poll
+        assert "modified_since" not in client.iter_assets.call_args.kwargs
+
+    def test_notification_watcher_in_background(self):
+        client = Mock()
+        client.get_system_notifications.side_effect = [{"items": []}, {"items": [{"text": "disk full"}]},
+                                                       {"items": [{"text": "disk full"}]}]
+        watcher = NotificationWatcher(client, min_interval=0.01, max_interval=0.01)
+        received = threading.Event()
+        watcher.subscribe(lambda changes: received.set())
+
+        watcher.start()
+        assert received.wait(1)
+        watcher.stop()